@@ -0,0 +1,53 @@
+"""
+Benchmark: per-name platform reads vs one bulk Get per tick.
+
+Uses LocalLatencyBackend to emulate a TR-369/TR-069 round trip.
+
+Usage:
+  python bench_bulk_read.py --ticks 50 --latency-ms 5
+"""
+import argparse
+import time
+
+from dae_p1.adapters import platform_access_stub as pas
+from dae_p1.adapters.FWA_adapter import FWAAdapter
+
+
+def per_name_tick():
+    # Equivalent of the pre-bulk FWA mapping: 8 parameters, 8 round trips
+    for n in FWAAdapter.REQUIRED_PARAMS["wan"]:
+        pas.read_wan_metric(n)
+    for n in FWAAdapter.REQUIRED_PARAMS["wifi"]:
+        pas.read_wifi_metric(n)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk read round-trip benchmark")
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--latency-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    backend = pas.LocalLatencyBackend(latency_sec=args.latency_ms / 1000.0)
+    pas.set_backend(backend)
+
+    t0 = time.perf_counter()
+    for _ in range(args.ticks):
+        per_name_tick()
+    per_name_sec = time.perf_counter() - t0
+    per_name_calls = backend.calls
+
+    backend.calls = 0
+    adapter = FWAAdapter()
+    t0 = time.perf_counter()
+    for _ in range(args.ticks):
+        adapter.collect_metric_sample()
+    bulk_sec = time.perf_counter() - t0
+    bulk_calls = backend.calls
+
+    print(f"per-name: {per_name_calls} round trips, {per_name_sec * 1000 / args.ticks:.2f} ms/tick")
+    print(f"bulk:     {bulk_calls} round trips, {bulk_sec * 1000 / args.ticks:.2f} ms/tick")
+    print(f"round trips saved: {per_name_calls - bulk_calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: time-range flag queries via FlagBitmapIndex vs a loop over MetricSample objects.
+
+Builds 7 days of 1 s samples (604,800) and asks e.g. "which samples had
+AIRTIME_HIGH and RETRY_HIGH" over the full range and over the last hour.
+
+Usage:
+  python bench_flag_index.py --samples 604800
+"""
+import argparse
+import random
+import time
+
+from dae_p1.M00_common import MetricSample
+from dae_p1.M07_incident_detector import IncidentDetector
+from dae_p1.M07A_flag_index import FlagBitmapIndex, bits_for
+
+
+def make_samples(n, seed=3):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        hot = rnd.random() < 0.02
+        out.append(MetricSample(ts=float(i), window_ref="Ws:%d" % (i // 10),
+                                airtime_busy_pct=rnd.uniform(70, 95) if hot else rnd.uniform(20, 60),
+                                retry_pct=rnd.uniform(15, 30) if hot else rnd.uniform(0, 10),
+                                latency_p95_ms=rnd.uniform(10, 80)))
+    return out
+
+
+def timed(fn, repeat=20):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        res = fn()
+    return (time.perf_counter() - t0) / repeat * 1000.0, res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Flag bitmap index benchmark")
+    ap.add_argument("--samples", type=int, default=7 * 24 * 3600)
+    args = ap.parse_args()
+
+    samples = make_samples(args.samples)
+    det = IncidentDetector()
+    want = ("AIRTIME_HIGH", "RETRY_HIGH")
+
+    t0 = time.perf_counter()
+    idx = FlagBitmapIndex(maxlen=len(samples), detector=det)
+    idx.extend(samples)
+    print(f"build (batch masks + index): {time.perf_counter() - t0:.2f} s for {len(samples):,} samples")
+
+    mask = bits_for(want)
+    last = samples[-1].ts
+    for label, lo in (("full range", None), ("last hour", last - 3600)):
+        loop_ms, loop_n = timed(lambda: sum(1 for m in samples if (lo is None or m.ts >= lo)
+                                            and set(want) <= set(det.badness_flags(m))), repeat=1)
+        idx_ms, idx_n = timed(lambda: idx.count(lo, None, all_of=mask))
+        assert loop_n == idx_n
+        print(f"{label:10s}: loop {loop_ms:9.1f} ms  index {idx_ms:7.3f} ms  ({idx_n} matches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: batch (fleet) recognition (RecognitionEngine.recognize_batch) vs one
+recognize() call per device.
+
+Builds N devices' Wl window aggregates (M07E WindowStats) with random flag mixes and
+change events, then times building the FleetBatch columns, one stateless batch call,
+and the per-device loop over the same inputs.
+
+Usage:
+  python bench_fleet_recognition.py --devices 10000 --repeat 5
+"""
+import argparse
+import random
+import time
+
+from dae_p1.M00_common import ChangeEventCard, MetricSample, VersionRefs
+from dae_p1.M07_incident_detector import FLAG_NAMES
+from dae_p1.M07E_window_aggregates import WindowStats
+from dae_p1.M16B_fleet_batch import FleetBatch
+from dae_p1.M16_recognition_engine import RecognitionEngine
+
+
+def make_fleet(n, seed=7):
+    rnd = random.Random(seed)
+    windows, events = [], []
+    for i in range(n):
+        samples = 60
+        bad = rnd.choice([0, 0, 0, 10, 40, 60])
+        frac = {f: rnd.random() for f in FLAG_NAMES if rnd.random() < 0.4}
+        windows.append(WindowStats(window_ref="Wl:600", start=600.0, samples=samples, bad=bad,
+                                   flag_frac=frac, bad_flag_frac=frac if bad else {}))
+        events.append(ChangeEventCard(event_time=650.0, event_type="config_change", origin_hint="user",
+                                      change_ref=f"c{i}" if rnd.random() < 0.7 else None,
+                                      version_refs=VersionRefs(fw="1.0")) if rnd.random() < 0.3 else None)
+    return windows, events
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fleet recognition benchmark")
+    ap.add_argument("--devices", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    windows, events = make_fleet(args.devices)
+    ids = [f"dev-{i}" for i in range(args.devices)]
+    eng = RecognitionEngine()
+
+    t0 = time.perf_counter()
+    batch = FleetBatch.from_windows(ids, windows, ["Ws:650"] * args.devices, events)
+    print(f"columns: {(time.perf_counter() - t0) * 1000:.1f} ms for {len(batch):,} devices")
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        recs = eng.recognize_batch(batch)
+    per_call = (time.perf_counter() - t0) / args.repeat
+    print(f"recognize_batch: {per_call * 1000:.1f} ms per call ({per_call / args.devices * 1e6:.1f} us/device)")
+
+    latest = MetricSample(ts=655.0, window_ref="Ws:650")
+    t0 = time.perf_counter()
+    for w, e in zip(windows, events):
+        eng.recognize(latest, [e] if e else [], "Wl:600", window=w)
+    loop = time.perf_counter() - t0
+    print(f"per-device recognize(): {loop * 1000:.1f} ms ({loop / args.devices * 1e6:.1f} us/device)")
+    print(f"speedup: {loop / per_call:.1f}x; verdicts: "
+          f"{sorted({r.primary_verdict for r in recs})}")
+
+
+if __name__ == "__main__":
+    main()
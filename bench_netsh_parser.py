@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: legacy per-field multilingual re.search vs single-pass netsh parser.
+
+Usage:
+  python bench_netsh_parser.py --iters 5000
+"""
+import argparse
+import os
+import re
+import time
+
+from dae_p1.adapters.netsh_parser import parse_netsh_interfaces, decode_netsh
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "tests", "fixtures", "netsh")
+
+
+def legacy_parse(output):
+    # Mirrors the former WindowsWifiAdapter._get_signal_strength pattern lists
+    def find_int(patterns):
+        for p in patterns:
+            m = re.search(p, output)
+            if m: return int(m.group(1))
+        return None
+
+    def find_str(patterns):
+        for p in patterns:
+            m = re.search(p, output)
+            if m: return m.group(1).strip()
+        return None
+
+    signal = find_int([r"Signal\s*:\s*(\d+)%", r"信號\s*:\s*(\d+)%", r"訊號\s*:\s*(\d+)%", r"信号\s*:\s*(\d+)%"]) or 0
+    channel = find_int([r"Channel\s*:\s*(\d+)", r"頻道\s*:\s*(\d+)", r"通道\s*:\s*(\d+)", r"频道\s*:\s*(\d+)"])
+    radio = find_str([r"Radio type\s*:\s*(.+)", r"無線電類型\s*:\s*(.+)", r"無線電波類型\s*:\s*(.+)", r"无线电类型\s*:\s*(.+)"])
+    band = find_str([r"Band\s*:\s*(.+)", r"頻帶\s*:\s*(.+)", r"频带\s*:\s*(.+)"])
+    tx = find_int([r"Transmit rate \(Mbps\)\s*:\s*(\d+)", r"傳輸速率 \(Mbps\)\s*:\s*(\d+)", r"传输速率 \(Mbps\)\s*:\s*(\d+)"])
+    rx = find_int([r"Receive rate \(Mbps\)\s*:\s*(\d+)", r"接收速率 \(Mbps\)\s*:\s*(\d+)", r"接收速率 \(Mbps\)\s*:\s*(\d+)"])
+    return signal, channel, radio, band, tx, rx
+
+
+def bench(fn, arg, iters):
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn(arg)
+    return (time.perf_counter() - t0) * 1e6 / iters
+
+
+def main():
+    ap = argparse.ArgumentParser(description="netsh parser micro-benchmark")
+    ap.add_argument("--iters", type=int, default=5000)
+    args = ap.parse_args()
+
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            text = decode_netsh(f.read())
+        legacy_us = bench(legacy_parse, text, args.iters)
+        new_us = bench(parse_netsh_interfaces, text, args.iters)
+        print(f"{name:12s} legacy {legacy_us:7.1f} us  single-pass {new_us:7.1f} us  x{legacy_us / new_us:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: end-to-end pipeline throughput on a recorded trace via ReplayAdapter.
+
+Usage:
+  python bench_replay.py [recording.ndjson|.csv|bundle.json] --repeat 20 --batch 500
+Without a path, every bundle in bundles/ is replayed.
+"""
+import argparse
+import glob
+import os
+import time
+
+from dae_p1.M00_common import set_clock
+from dae_p1.core_service import OBHCoreService, CoreRuntimeConfig
+from dae_p1.adapters.replay_adapter import ReplayAdapter, load_recording
+
+ROOT = os.path.dirname(__file__)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay throughput benchmark")
+    ap.add_argument("paths", nargs="*")
+    ap.add_argument("--repeat", type=int, default=20, help="loop the trace N times")
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--recognize-every", type=int, default=10)
+    args = ap.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(ROOT, "bundles", "*.json")))
+    records = [r for p in paths for r in load_recording(p)]
+    if not records:
+        print("no records")
+        return
+
+    adapter = ReplayAdapter(records, loop=True)
+    set_clock(adapter.clock)
+    core = OBHCoreService(adapter, CoreRuntimeConfig(sample_interval_sec=1, accelerate=True))
+
+    total = len(records) * args.repeat
+    n = 0
+    t0 = time.perf_counter()
+    while n < total:
+        for rec in adapter.next_batch(min(args.batch, total - n)):
+            core.ingest(rec.sample, rec.events, rec.snaps)
+            n += 1
+            if n % args.recognize_every == 0:
+                core.generate_recognition()
+    dt = time.perf_counter() - t0
+    set_clock(None)
+
+    print(f"records: {len(records)} x {args.repeat} = {n}")
+    print(f"throughput: {n / dt:,.0f} samples/s ({dt * 1e6 / n:.1f} us/sample)")
+
+
+if __name__ == "__main__":
+    main()
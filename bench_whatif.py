@@ -0,0 +1,64 @@
+"""
+Benchmark: what-if threshold sweep (M16A) over a synthetic 7-day history.
+
+Builds 7 days of 10 s samples (60,480) with change events, then evaluates a
+grid of threshold configs inline and across a process pool.
+
+Usage:
+  python bench_whatif.py --days 7 --configs 100 --workers 8
+"""
+import argparse
+import random
+import time
+
+from dae_p1.M00_common import ChangeEventCard, MetricSample, VersionRefs
+from dae_p1.M16A_whatif_replay import ReplayHistory, sweep, threshold_grid
+
+
+def make_history(days, interval=10, seed=7):
+    rnd = random.Random(seed)
+    ms, evs = [], []
+    for i in range(int(days * 86400 / interval)):
+        t = float(i * interval)
+        hot = rnd.random() < 0.03
+        ms.append(MetricSample(ts=t, window_ref="",
+                               airtime_busy_pct=rnd.uniform(65, 95) if hot else rnd.uniform(20, 60),
+                               retry_pct=rnd.uniform(12, 35) if hot else rnd.uniform(0, 10),
+                               latency_p95_ms=rnd.uniform(10, 90),
+                               wan_sinr_db=rnd.uniform(0, 25)))
+        if rnd.random() < 0.002:
+            evs.append(ChangeEventCard(event_time=t, event_type="config_change", origin_hint="user",
+                                       change_ref=f"c{i}", version_refs=VersionRefs(fw="1.0")))
+    return ms, evs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="What-if sweep benchmark")
+    ap.add_argument("--days", type=float, default=7)
+    ap.add_argument("--configs", type=int, default=100)
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    ms, evs = make_history(args.days)
+    t0 = time.perf_counter()
+    history = ReplayHistory.from_samples(ms, evs)
+    print(f"history columns: {time.perf_counter() - t0:.2f} s for {len(history):,} samples, {len(evs)} events")
+
+    side = max(1, round(args.configs ** 0.5))
+    grid = threshold_grid(retry_pct=[10 + 2 * i for i in range(side)],
+                          airtime_busy_pct=[60 + 3 * i for i in range(side)])[:args.configs]
+
+    t0 = time.perf_counter()
+    sweep(history, grid[:10], max_workers=1)
+    inline = (time.perf_counter() - t0) / 10 * len(grid)
+    print(f"inline (extrapolated): {inline:.2f} s for {len(grid)} configs")
+
+    t0 = time.perf_counter()
+    results = sweep(history, grid, max_workers=args.workers)
+    print(f"process pool: {time.perf_counter() - t0:.2f} s for {len(grid)} configs")
+    best = min(results, key=lambda r: r.episodes)
+    print(f"fewest episodes: {best.name} -> {best.episodes} episodes, {best.bad_windows} bad windows")
+
+
+if __name__ == "__main__":
+    main()
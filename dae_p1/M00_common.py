@@ -6,14 +6,21 @@ No remediation, no network control, no optimization.
 """
 from __future__ import annotations
 from dataclasses import dataclass, asdict, field
-from typing import Dict, Any, List, Optional, Literal, Tuple
+from typing import Dict, Any, List, Optional, Literal, Tuple, Callable
 import time
 import json
 import hashlib
 import os
 
+_clock: Callable[[], float] = time.time
+
 def now_ts() -> float:
-    return time.time()
+    return _clock()
+
+def set_clock(clock: Optional[Callable[[], float]] = None) -> None:
+    """Inject a clock for now_ts() (e.g. replay time). None restores wall-clock time."""
+    global _clock
+    _clock = clock or time.time
 
 def iso(ts: Optional[float]=None) -> str:
     if ts is None: ts = now_ts()
@@ -60,6 +67,15 @@ class MetricSample:
     radio_type: Optional[str] = None
     band: Optional[str] = None
     dns_status: Optional[str] = None # OK / FAIL
+    # Access-layer counters (per-sample deltas from device counters)
+    fec_corrected: Optional[int] = None # DOCSIS/PON corrected codewords
+    fec_uncorrected: Optional[int] = None # DOCSIS uncorrectable codewords
+    t3_t4_count: Optional[int] = None # DOCSIS T3/T4 timeouts
+    # Oscillation counts over the trailing Wl (M07C OscillationAnalyzer)
+    retry_burst_count: Optional[int] = None # retry redline crossings
+    airtime_burst_count: Optional[int] = None # airtime redline crossings
+    mlo_switch_count: Optional[int] = None # link (band/channel/BSSID) switches
+    retry_osc_period_sec: Optional[float] = None # dominant retry oscillation period (FFT, NumPy only)
 
 @dataclass
 class ChangeEventCard:
@@ -71,6 +87,7 @@ class ChangeEventCard:
     change_ref: Optional[str] = None
     version_refs: VersionRefs = field(default_factory=VersionRefs)
     window_ref: Optional[str] = None
+    count: int = 1 # identical consecutive occurrences coalesced into this card
 
     def __post_init__(self):
         if isinstance(self.version_refs, dict):
@@ -101,6 +118,12 @@ class EpisodeRecognition:
     confidence: float
     evidence_refs: List[str]
     observability: ObservabilityResult
+    # Ws window where a change-point detector placed the degradation onset (if any)
+    onset_window_ref: Optional[str] = None
+    # Worst Wl windows by severity, worst first: [{"window_ref", "severity"}]
+    worst_windows: List[Dict[str, Any]] = field(default_factory=list)
+    # Window aggregate the verdict was judged on (M07E WindowStats.to_dict()), if any
+    window_stats: Optional[Dict[str, Any]] = None
 
 def to_json(obj: Any) -> str:
     def default(o):
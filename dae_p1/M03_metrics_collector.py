@@ -34,7 +34,11 @@ class MetricsCollector:
                 band: Optional[str]=None,
                 phy_rate_mbps: Optional[int]=None,
                 phy_rx_rate_mbps: Optional[int]=None,
-                dns_status: Optional[str]=None) -> MetricSample:
+                dns_status: Optional[str]=None,
+                # Access-layer counter deltas
+                fec_corrected: Optional[int]=None,
+                fec_uncorrected: Optional[int]=None,
+                t3_t4_count: Optional[int]=None) -> MetricSample:
         ts = now_ts()
         ws = self.windowing.window_ref(ts, "Ws")
         return MetricSample(
@@ -51,5 +55,7 @@ class MetricsCollector:
             # Extended
             channel=channel, bssid=bssid, radio_type=radio_type, band=band,
             phy_rate_mbps=phy_rate_mbps, phy_rx_rate_mbps=phy_rx_rate_mbps,
-            dns_status=dns_status
+            dns_status=dns_status,
+            fec_corrected=fec_corrected, fec_uncorrected=fec_uncorrected,
+            t3_t4_count=t3_t4_count
         )
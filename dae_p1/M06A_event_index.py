@@ -0,0 +1,99 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+from .M01_windowing import Windowing
+
+T = TypeVar("T")
+
+# Change events up to this long before a bad window are candidates to explain it
+DEFAULT_LOOKBACK_SEC = 300.0
+
+class IntervalIndex(Generic[T]):
+    """
+    Time-sorted index over change events or snapshots, mirroring a RingBuffer (same maxlen).
+
+    Items are kept ordered by key(item) (event_time / capture_time) in an array('d') plus a
+    parallel list, so "which items fall in [t0, t1]" is two bisects: O(log n + k).
+    In-order appends are O(1); late items are inserted in place. The oldest items are
+    evicted in batches once the index exceeds maxlen.
+    """
+    def __init__(self, maxlen: int, key: Callable[[T], float], windowing: Optional[Windowing] = None):
+        self.maxlen = maxlen
+        self.key = key
+        self.windowing = windowing or Windowing()
+        self._ts = array("d")
+        self._items: List[T] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: T) -> None:
+        t = float(self.key(item))
+        if not self._ts or t >= self._ts[-1]:
+            self._ts.append(t)
+            self._items.append(item)
+        else:
+            i = bisect_right(self._ts, t)
+            self._ts.insert(i, t)
+            self._items.insert(i, item)
+        excess = len(self._items) - self.maxlen
+        if excess > 0 and excess >= max(1, self.maxlen // 8):
+            del self._ts[:excess]
+            del self._items[:excess]
+
+    def last(self) -> Optional[T]:
+        """Latest item by time (O(1))."""
+        return self._items[-1] if len(self._items) > self._live() else None
+
+    def _live(self) -> int:
+        # Items past maxlen but not yet batch-evicted are not visible
+        return max(0, len(self._items) - self.maxlen)
+
+    def range(self, t0: Optional[float] = None, t1: Optional[float] = None) -> List[T]:
+        """Items with t0 <= key <= t1, in time order."""
+        lo = self._live() if t0 is None else max(self._live(), bisect_left(self._ts, t0))
+        hi = len(self._ts) if t1 is None else bisect_right(self._ts, t1)
+        return self._items[lo:hi]
+
+    def lookback(self, ts: float, lookback_sec: float = DEFAULT_LOOKBACK_SEC) -> List[T]:
+        """Items in [ts - lookback_sec, ts]."""
+        return self.range(ts - lookback_sec, ts)
+
+    def _half_open(self, t0: float, t1: float) -> List[T]:
+        lo = max(self._live(), bisect_left(self._ts, t0))
+        return self._items[lo:max(lo, bisect_left(self._ts, t1))]
+
+    def _step(self, kind: str) -> int:
+        p = self.windowing.policy
+        return p.ws_sec if kind == "Ws" else p.wl_sec
+
+    def in_window(self, window_ref: str) -> List[T]:
+        """Items inside a Ws/Wl window [start, start + step), e.g. "Ws:1200"."""
+        kind, _, start = window_ref.partition(":")
+        t0 = float(start)
+        return self._half_open(t0, t0 + self._step(kind))
+
+    def for_window(self, ts: float, lookback_sec: float = DEFAULT_LOOKBACK_SEC, kind: str = "Ws") -> List[T]:
+        """Items in [window start - lookback_sec, window end) for the Ws/Wl window containing ts."""
+        step = self._step(kind)
+        start = (ts // step) * step
+        return self._half_open(start - lookback_sec, start + step)
+
+    def join(self, ts: Sequence[float], lookback_sec: float = DEFAULT_LOOKBACK_SEC) -> List[Tuple[float, List[T]]]:
+        """
+        Sort-merge join: for each time in `ts` (ascending, e.g. bad-sample timestamps from the
+        flag bitmap index) the items in [t - lookback_sec, t]. Both sides are scanned once:
+        O(n + m + k) for the whole history.
+        """
+        out: List[Tuple[float, List[T]]] = []
+        times, items = self._ts, self._items
+        lo = hi = self._live()
+        n = len(times)
+        for t in ts:
+            while hi < n and times[hi] <= t:
+                hi += 1
+            while lo < hi and times[lo] < t - lookback_sec:
+                lo += 1
+            out.append((t, items[lo:hi]))
+        return out
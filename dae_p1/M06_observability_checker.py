@@ -10,11 +10,15 @@ class ObservabilityChecker:
     MIN_REFS = ["origin_hint", "change_ref", "version_refs"]
 
     def check_event(self, ev: ChangeEventCard) -> ObservabilityResult:
-        missing: List[str] = []
+        return self.from_missing_mask(self.missing_mask(ev), ev.origin_hint or "unknown")
+
+    def missing_mask(self, ev: ChangeEventCard) -> int:
+        """Missing MIN_REFS as a bitmask (bit i = MIN_REFS[i]); 0 = sufficient."""
+        mask = 0
         if not ev.origin_hint or ev.origin_hint == "unknown":
-            missing.append("origin_hint")
+            mask |= 1
         if not ev.change_ref:
-            missing.append("change_ref")
+            mask |= 2
         # Safe access helper
         def get_ver(vrefs, attr):
             if isinstance(vrefs, dict):
@@ -25,14 +29,17 @@ class ObservabilityChecker:
         v_driver = get_ver(ev.version_refs, "driver")
 
         if not ev.version_refs or (v_fw == "unknown" and v_driver == "unknown"):
-            missing.append("version_refs")
+            mask |= 4
+        return mask
 
+    def from_missing_mask(self, mask: int, origin_hint: str = "unknown") -> ObservabilityResult:
+        missing: List[str] = [ref for i, ref in enumerate(self.MIN_REFS) if mask & (1 << i)]
         insufficient = len(missing) > 0
         return ObservabilityResult(
             observability_status="INSUFFICIENT" if insufficient else "SUFFICIENT",
             opaque_risk=insufficient,
             missing_refs=missing,
-            origin_hint=ev.origin_hint or "unknown"
+            origin_hint=origin_hint
         )
 
     def check_no_change_event(self) -> ObservabilityResult:
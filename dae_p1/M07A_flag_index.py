@@ -0,0 +1,167 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .M00_common import MetricSample
+from .M07_incident_detector import FLAG_BITS, FLAG_NAMES, IncidentDetector
+
+# Pseudo-flag set on samples IncidentDetector.is_bad_mask() considers bad (2+ flags)
+BAD_BIT = 1 << len(FLAG_NAMES)
+INDEX_BITS: Dict[str, int] = {**FLAG_BITS, "BAD": BAD_BIT}
+
+CHUNK_BITS = 4096
+
+class FlagBitmapIndex:
+    """
+    Per-flag bitmap index over the metric stream, for time-range flag queries.
+
+    Samples get a monotonically increasing sequence number; each flag keeps a sparse
+    chunked bitmap: {chunk_no: int bitset of CHUNK_BITS samples}. All-zero chunks are
+    not stored, so rarely-set flags cost almost nothing, and AND/OR across flags runs
+    on whole chunks at once. Timestamps are kept in an array('d') for bisecting ranges.
+
+    maxlen mirrors the metrics RingBuffer: older samples are evicted chunk-wise.
+    Samples must be appended in time order.
+    """
+    def __init__(self, maxlen: int, detector: Optional[IncidentDetector] = None):
+        self.maxlen = maxlen
+        self.detector = detector or IncidentDetector()
+        self._bitmaps: Dict[int, Dict[int, int]] = {bit: {} for bit in INDEX_BITS.values()}
+        self._ts = array("d")
+        self._masks = array("B")
+        self._base = 0  # sequence number of _ts[0]
+
+    def __len__(self) -> int:
+        return min(len(self._ts), self.maxlen)
+
+    @property
+    def next_seq(self) -> int:
+        return self._base + len(self._ts)
+
+    # --- maintenance ---
+
+    def append(self, m: MetricSample) -> int:
+        """Index one sample; returns its flag mask (incl. BAD_BIT)."""
+        return self.append_mask(m.ts, self.detector.flag_mask(m))
+
+    def append_mask(self, ts: float, mask: int) -> int:
+        if self.detector.is_bad_mask(mask):
+            mask |= BAD_BIT
+        seq = self.next_seq
+        if mask:
+            chunk, off = divmod(seq, CHUNK_BITS)
+            for bit, bm in self._bitmaps.items():
+                if mask & bit:
+                    bm[chunk] = bm.get(chunk, 0) | (1 << off)
+        self._ts.append(ts)
+        self._masks.append(mask)
+        self._evict()
+        return mask
+
+    def extend(self, samples: Sequence[MetricSample]) -> None:
+        """Bulk load (e.g. rebuilding from metrics_buf) using the column-wise detector."""
+        masks = self.detector.flag_masks(samples)
+        for m, mask in zip(samples, masks):
+            self.append_mask(m.ts, mask)
+
+    def _evict(self) -> None:
+        # Drop whole chunks once the live window has moved past them
+        excess = len(self._ts) - self.maxlen
+        if excess < CHUNK_BITS:
+            return
+        first_live = self._base + excess
+        drop_to = (first_live // CHUNK_BITS) * CHUNK_BITS
+        n = drop_to - self._base
+        if n <= 0:
+            return
+        for bm in self._bitmaps.values():
+            for c in [c for c in bm if c < drop_to // CHUNK_BITS]:
+                del bm[c]
+        del self._ts[:n]
+        del self._masks[:n]
+        self._base = drop_to
+
+    # --- queries ---
+
+    def _seq_range(self, t0: Optional[float], t1: Optional[float]) -> Tuple[int, int]:
+        """[lo, hi) sequence range for t0 <= ts <= t1 within the live window."""
+        ts = self._ts
+        live = max(0, len(ts) - self.maxlen)
+        lo = live if t0 is None else max(live, bisect_left(ts, t0))
+        hi = len(ts) if t1 is None else bisect_right(ts, t1)
+        return self._base + lo, self._base + max(lo, hi)
+
+    def _match_chunks(self, lo: int, hi: int, all_of: int, any_of: int) -> Iterable[Tuple[int, int]]:
+        all_bits = [self._bitmaps[b] for b in INDEX_BITS.values() if all_of & b]
+        any_bits = [self._bitmaps[b] for b in INDEX_BITS.values() if any_of & b]
+        if not all_bits and not any_bits:
+            raise ValueError("query needs all_of and/or any_of")
+        return self._iter_chunks(lo, hi, all_bits, any_bits) if lo < hi else iter(())
+
+    def _iter_chunks(self, lo: int, hi: int, all_bits: List[Dict[int, int]],
+                     any_bits: List[Dict[int, int]]) -> Iterable[Tuple[int, int]]:
+        # Candidate chunks: the sparsest required bitmap bounds the work
+        if all_bits:
+            cands = set(min(all_bits, key=len))
+        else:
+            cands = set().union(*any_bits)
+        c_lo, c_hi = lo // CHUNK_BITS, (hi - 1) // CHUNK_BITS
+        full = (1 << CHUNK_BITS) - 1
+        for c in sorted(x for x in cands if c_lo <= x <= c_hi):
+            bits = full
+            for bm in all_bits:
+                bits &= bm.get(c, 0)
+                if not bits:
+                    break
+            if bits and any_bits:
+                bits &= _or_chunk(any_bits, c)
+            if not bits:
+                continue
+            if c == c_lo:
+                bits &= full ^ ((1 << (lo - c * CHUNK_BITS)) - 1)
+            if c == c_hi:
+                bits &= (1 << (hi - c * CHUNK_BITS)) - 1
+            if bits:
+                yield c, bits
+
+    def count(self, t0: Optional[float] = None, t1: Optional[float] = None,
+              all_of: int = 0, any_of: int = 0) -> int:
+        """Number of samples in [t0, t1] having all flags of `all_of` and at least one of `any_of`."""
+        lo, hi = self._seq_range(t0, t1)
+        return sum(bits.bit_count() for _, bits in self._match_chunks(lo, hi, all_of, any_of))
+
+    def query(self, t0: Optional[float] = None, t1: Optional[float] = None,
+              all_of: int = 0, any_of: int = 0) -> List[float]:
+        """Timestamps of matching samples, in time order."""
+        lo, hi = self._seq_range(t0, t1)
+        ts, base = self._ts, self._base
+        out: List[float] = []
+        for c, bits in self._match_chunks(lo, hi, all_of, any_of):
+            start = c * CHUNK_BITS - base
+            while bits:
+                low = bits & -bits
+                out.append(ts[start + low.bit_length() - 1])
+                bits ^= low
+        return out
+
+    def masks(self, t0: Optional[float] = None, t1: Optional[float] = None) -> Tuple[array, array]:
+        """(timestamps, flag masks) for [t0, t1] as compact arrays (for batch consumers)."""
+        lo, hi = self._seq_range(t0, t1)
+        a, b = lo - self._base, hi - self._base
+        return self._ts[a:b], self._masks[a:b]
+
+    def last_mask(self) -> int:
+        return self._masks[-1] if self._masks else 0
+
+def _or_chunk(bitmaps: List[Dict[int, int]], c: int) -> int:
+    bits = 0
+    for bm in bitmaps:
+        bits |= bm.get(c, 0)
+    return bits
+
+def bits_for(flags: Iterable[str]) -> int:
+    """Flag names (incl. "BAD") -> query bitmask."""
+    mask = 0
+    for f in flags:
+        mask |= INDEX_BITS[f]
+    return mask
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from .M00_common import MetricSample
+from .M01_windowing import Windowing
+
+# (MetricSample field, bad direction: +1 = rising is bad, -1 = falling is bad, min_sigma)
+CHANGE_POINT_FIELDS: Tuple[Tuple[str, int, float], ...] = (
+    ("airtime_busy_pct", +1, 1.0),
+    ("retry_pct", +1, 0.5),
+    ("latency_p95_ms", +1, 2.0),
+    ("wan_sinr_db", -1, 0.5),
+)
+
+@dataclass
+class ChangePoint:
+    field: str
+    direction: int
+    onset_ts: float
+    onset_window_ref: str
+    detected_ts: float
+
+class _Cusum:
+    """
+    One-sided CUSUM for one metric, in units of the in-control std dev:
+      S = min(2h, max(0, S + dir * (x - mean) / sigma - k)); alarm when S > h.
+    Capping S at 2h bounds how long an alarm outlives the recovery.
+    The onset is the last sample at which S left zero. mean/sigma are learned
+    (Welford) from the first `warmup` samples and then only while S == 0, so a
+    drift does not drag the reference along with it. O(1) state: one array('d').
+    """
+    __slots__ = ("s",)
+    # n, mean, m2, S, onset_ts, alarm
+    N, MEAN, M2, S, ONSET, ALARM = range(6)
+
+    def __init__(self):
+        self.s = array("d", bytes(8 * 6))
+
+    def update(self, x: float, ts: float, direction: int, min_sigma: float,
+               k: float, h: float, warmup: int) -> Optional[str]:
+        """Returns "fire" on a new alarm, "clear" when an alarm ends, else None."""
+        s = self.s
+        n = s[self.N]
+        if n < warmup or s[self.S] == 0.0:
+            n += 1
+            s[self.N] = n
+            d = x - s[self.MEAN]
+            s[self.MEAN] += d / n
+            s[self.M2] += d * (x - s[self.MEAN])
+            if n <= warmup:
+                return None
+        sigma = max(min_sigma, (s[self.M2] / max(1.0, n - 1)) ** 0.5)
+        prev = s[self.S]
+        cur = min(2 * h, max(0.0, prev + direction * (x - s[self.MEAN]) / sigma - k))
+        if prev == 0.0 and cur > 0.0:
+            s[self.ONSET] = ts
+        s[self.S] = cur
+        if cur > h and not s[self.ALARM]:
+            s[self.ALARM] = 1.0
+            return "fire"
+        if cur == 0.0 and s[self.ALARM]:
+            s[self.ALARM] = 0.0
+            return "clear"
+        return None
+
+class ChangePointDetector:
+    """
+    Streaming change-point detection per device and metric (CUSUM), alongside IncidentDetector.
+    update() is O(1) per sample and metric; no history is rescanned. Active change points
+    keep their onset (ts + Ws window_ref) until the metric returns to its reference level.
+    k / h are in std-dev units: k = allowed slack per sample, h = alarm threshold.
+    """
+    DEFAULT_DEVICE = "local"
+
+    def __init__(self, fields: Sequence[Tuple[str, int, float]] = CHANGE_POINT_FIELDS,
+                 k: float = 0.5, h: float = 8.0, warmup: int = 30,
+                 windowing: Optional[Windowing] = None):
+        self.fields = tuple(fields)
+        self.k = k
+        self.h = h
+        self.warmup = warmup
+        self.windowing = windowing or Windowing()
+        self._state: Dict[str, List[_Cusum]] = {}
+        self._active: Dict[str, Dict[str, ChangePoint]] = {}
+
+    def update(self, m: MetricSample, device_id: Optional[str] = None) -> List[ChangePoint]:
+        """Feed one sample; returns change points that fired on it."""
+        dev = device_id or self.DEFAULT_DEVICE
+        states = self._state.get(dev)
+        if states is None:
+            states = self._state[dev] = [_Cusum() for _ in self.fields]
+            self._active[dev] = {}
+        active = self._active[dev]
+        fired: List[ChangePoint] = []
+        for st, (field, direction, min_sigma) in zip(states, self.fields):
+            v = getattr(m, field)
+            if v is None:
+                continue
+            ev = st.update(float(v), m.ts, direction, min_sigma, self.k, self.h, self.warmup)
+            if ev == "fire":
+                onset = st.s[_Cusum.ONSET]
+                cp = ChangePoint(field=field, direction=direction, onset_ts=onset,
+                                 onset_window_ref=self.windowing.window_ref(onset, "Ws"),
+                                 detected_ts=m.ts)
+                active[field] = cp
+                fired.append(cp)
+            elif ev == "clear":
+                active.pop(field, None)
+        return fired
+
+    def active(self, device_id: Optional[str] = None) -> List[ChangePoint]:
+        return list(self._active.get(device_id or self.DEFAULT_DEVICE, {}).values())
+
+    def earliest_onset(self, device_id: Optional[str] = None) -> Optional[ChangePoint]:
+        cps = self.active(device_id)
+        return min(cps, key=lambda c: c.onset_ts) if cps else None
+
+    def reset(self, device_id: Optional[str] = None) -> None:
+        dev = device_id or self.DEFAULT_DEVICE
+        self._state.pop(dev, None)
+        self._active.pop(dev, None)
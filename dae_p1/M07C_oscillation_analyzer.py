@@ -0,0 +1,132 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+from .M00_common import MetricSample
+from .M01_windowing import Windowing
+
+try:
+    import numpy as np  # optional: short-window FFT for the dominant oscillation period
+except ImportError:
+    np = None
+
+@dataclass(frozen=True)
+class OscillationSeries:
+    """
+    source: MetricSample field to watch; out: MetricSample field receiving the burst count.
+    A crossing is counted when the value leaves the hysteresis band on the other side
+    of the redline (above redline + hysteresis, or below redline - hysteresis).
+    """
+    source: str
+    out: str
+    redline: float
+    hysteresis: float
+
+DEFAULT_SERIES = (
+    OscillationSeries("retry_pct", "retry_burst_count", redline=25.0, hysteresis=2.0),
+    OscillationSeries("airtime_busy_pct", "airtime_burst_count", redline=70.0, hysteresis=3.0),
+)
+
+class _WindowCounter:
+    """Event counts per Ws bucket over the trailing Wl; O(1) amortized per add/advance."""
+    __slots__ = ("buckets", "total", "bucket")
+
+    def __init__(self, n: int):
+        self.buckets: Deque[int] = deque([0] * n, maxlen=n)
+        self.total = 0
+        self.bucket: Optional[int] = None
+
+    def advance(self, bucket: int) -> None:
+        if self.bucket is None:
+            self.bucket = bucket
+            return
+        steps = min(bucket - self.bucket, len(self.buckets))
+        for _ in range(max(0, steps)):
+            self.total -= self.buckets[0]
+            self.buckets.append(0)
+        if bucket > self.bucket:
+            self.bucket = bucket
+
+    def add(self, n: int = 1) -> None:
+        self.buckets[-1] += n
+        self.total += n
+
+class OscillationAnalyzer:
+    """
+    Incremental oscillation analysis on the sample stream.
+    - Redline crossings (with hysteresis) of each OscillationSeries, counted per Ws bucket and
+      summed over the trailing Wl, are written into the sample (retry_burst_count, ...).
+    - mlo_switch_count: link switches (band/channel/bssid changes) over the trailing Wl.
+    - With NumPy, a short FFT over the last fft_len values runs once per Ws; the retry series'
+      dominant period is written into the sample (retry_osc_period_sec) for the oscillation guard.
+    annotate() is O(1) amortized per sample; fields already set on the sample are kept.
+    """
+    def __init__(self, series: Sequence[OscillationSeries] = DEFAULT_SERIES,
+                 windowing: Optional[Windowing] = None, fft_len: int = 64):
+        self.series = tuple(series)
+        self.windowing = windowing or Windowing()
+        ws, wl = self.windowing.policy.ws_sec, self.windowing.policy.wl_sec
+        self._ws = ws
+        n = max(1, wl // ws)
+        self._counters = [_WindowCounter(n) for _ in self.series]
+        self._side: List[int] = [0] * len(self.series)  # +1 above band, -1 below, 0 unknown
+        self._switches = _WindowCounter(n)
+        self._link: Optional[Tuple] = None
+        self.fft_len = fft_len
+        # Per series: last fft_len values and their sample ts (a series can skip samples)
+        self._recent: List[Deque[float]] = [deque(maxlen=fft_len) for _ in self.series]
+        self._recent_ts: List[Deque[float]] = [deque(maxlen=fft_len) for _ in self.series]
+        self._periods: Dict[str, Optional[float]] = {}
+        self._fft_bucket: Optional[int] = None
+
+    def annotate(self, m: MetricSample) -> MetricSample:
+        bucket = int(m.ts // self._ws)
+        for i, spec in enumerate(self.series):
+            c = self._counters[i]
+            c.advance(bucket)
+            v = getattr(m, spec.source)
+            if v is not None:
+                side = 1 if v > spec.redline + spec.hysteresis else -1 if v < spec.redline - spec.hysteresis else 0
+                if side and side != self._side[i]:
+                    if self._side[i]:
+                        c.add()
+                    self._side[i] = side
+                if np is not None:
+                    self._recent[i].append(float(v))
+                    self._recent_ts[i].append(m.ts)
+            if getattr(m, spec.out, None) is None:
+                setattr(m, spec.out, c.total)
+
+        self._switches.advance(bucket)
+        link = (m.band, m.channel, m.bssid)
+        if any(x is not None for x in link):
+            if self._link is not None and link != self._link:
+                self._switches.add()
+            self._link = link
+            if m.mlo_switch_count is None:
+                m.mlo_switch_count = self._switches.total
+
+        if np is not None:
+            if bucket != self._fft_bucket:
+                self._fft_bucket = bucket
+                self._update_spectrum()
+            if m.retry_osc_period_sec is None:
+                m.retry_osc_period_sec = self._periods.get("retry_pct")
+        return m
+
+    def _update_spectrum(self) -> None:
+        for i, spec in enumerate(self.series):
+            ts = self._recent_ts[i]
+            if len(ts) < 16 or ts[-1] <= ts[0]:
+                continue
+            x = np.asarray(self._recent[i], dtype=float)
+            dt = (ts[-1] - ts[0]) / (len(ts) - 1)
+            power = np.abs(np.fft.rfft(x - x.mean())) ** 2
+            freqs = np.fft.rfftfreq(len(x), d=dt)
+            k = int(np.argmax(power[1:])) + 1 if len(power) > 1 else 0
+            # Only report a period when one frequency clearly dominates
+            self._periods[spec.source] = (1.0 / freqs[k]) if k and power[k] > 0.3 * power[1:].sum() else None
+
+    def dominant_period(self, source: str) -> Optional[float]:
+        """Dominant oscillation period (s) of a series, or None (no NumPy / no clear peak)."""
+        return self._periods.get(source)
@@ -0,0 +1,261 @@
+"""
+Config-driven detection / verdict rules compiled into flat decision tables.
+
+A rule section has
+- flag rules: a named flag is raised when all of its conditions hold
+  (field op value; `default` stands in for a missing field, else the condition is false);
+- outcome rules: first match wins, on required (all_of), alternative (any_of) and excluded
+  (none_of) flags plus an optional opaque (no explaining change event) condition.
+
+compile() evaluates the outcome rules once for every (flag mask, opaque) combination, so
+deciding is a single list index at runtime. Flags are evaluated per sample (mask());
+IncidentDetector evaluates the detector flags column-wise from detector_rules().
+
+Sections: "detector" (M07 flags, M08 verdicts) and "install_verify" (M20).
+Rules load from YAML (configs/rules_v1.yaml; PyYAML is a requirement). Without PyYAML
+or the file, default_rules() warns and uses DEFAULT_RULES, which mirrors that file; an
+explicitly configured file (load_rules) that cannot be read raises.
+"""
+from __future__ import annotations
+import operator
+import os
+import warnings
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "configs", "rules_v1.yaml")
+
+OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    op: str
+    value: Any
+    default: Any = None  # value used when the field is missing (None: condition is false)
+
+@dataclass(frozen=True)
+class FlagRule:
+    name: str
+    conditions: Tuple[Condition, ...]
+    label: Optional[str] = None  # threshold display key (e.g. "latency_max_ms")
+    display: Any = None  # threshold display value (default: last condition's value)
+
+@dataclass(frozen=True)
+class OutcomeRule:
+    name: str
+    outcome: str
+    confidence: float
+    all_of: Tuple[str, ...] = ()
+    any_of: Tuple[str, ...] = ()
+    none_of: Tuple[str, ...] = ()
+    opaque: Optional[bool] = None
+    attrs: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @property
+    def is_catch_all(self) -> bool:
+        return not (self.all_of or self.any_of or self.none_of) and self.opaque is None
+
+class DecisionTable:
+    """One compiled rule section."""
+    def __init__(self, flags: Sequence[FlagRule], outcomes: Sequence[OutcomeRule],
+                 bits: Optional[Dict[str, int]] = None, width: Optional[int] = None):
+        self.flags = tuple(flags)
+        self.outcomes = tuple(outcomes)
+        # Bit per flag: given (e.g. M07 FLAG_BITS, so masks stay compatible) or by position
+        self.bits = dict(bits) if bits is not None else {f.name: 1 << i for i, f in enumerate(self.flags)}
+        for f in self.flags:
+            if f.name not in self.bits:
+                raise ValueError(f"flag {f.name!r} has no bit")
+        # Mask width; the opaque bit sits just above it in table indexes
+        self.width = width or max(self.bits.values(), default=1).bit_length()
+        self._checks = [(self.bits[f.name], [(c.field, OPS[c.op], c.value, c.default) for c in f.conditions])
+                        for f in self.flags]
+        self.table = self._compile()
+
+    def _mask_of(self, names: Sequence[str]) -> int:
+        m = 0
+        for n in names:
+            if n not in self.bits:
+                raise ValueError(f"unknown flag {n!r} in outcome rule")
+            m |= self.bits[n]
+        return m
+
+    def _compile(self) -> List[OutcomeRule]:
+        rules = [(r, self._mask_of(r.all_of), self._mask_of(r.any_of), self._mask_of(r.none_of))
+                 for r in self.outcomes]
+        if not rules or not rules[-1][0].is_catch_all:
+            raise ValueError("outcome rules must end with a catch-all rule")
+        table: List[OutcomeRule] = []
+        for idx in range(2 << self.width):
+            mask, opaque = idx & ((1 << self.width) - 1), bool(idx >> self.width)
+            for r, all_m, any_m, none_m in rules:
+                if ((mask & all_m) == all_m and (not any_m or mask & any_m) and not (mask & none_m)
+                        and (r.opaque is None or r.opaque == opaque)):
+                    table.append(r)
+                    break
+        return table
+
+    # --- evaluation ---
+
+    def mask(self, obj: Any) -> int:
+        """Flag mask of one sample (dataclass or dict)."""
+        get = obj.get if isinstance(obj, dict) else lambda k: getattr(obj, k, None)
+        out = 0
+        for bit, conds in self._checks:
+            for fld, op, value, default in conds:
+                v = get(fld)
+                if v is None:
+                    v = default
+                if v is None or not op(v, value):
+                    break
+            else:
+                out |= bit
+        return out
+
+    def decide(self, mask: int, opaque: bool = False) -> OutcomeRule:
+        return self.table[mask | (opaque << self.width)]
+
+    def names(self, mask: int) -> List[str]:
+        return [f.name for f in self.flags if mask & self.bits[f.name]]
+
+    def thresholds(self) -> Dict[str, Any]:
+        """{label: display value} for labelled flag rules."""
+        return {f.label: f.display if f.display is not None else f.conditions[-1].value
+                for f in self.flags if f.label}
+
+    def detector_rules(self) -> List[Tuple[str, float, bool, int]]:
+        """
+        (field, threshold, is_upper_bound, bit) per flag, the form IncidentDetector evaluates.
+        Detector flags must be single >= / <= conditions.
+        """
+        out = []
+        for f in self.flags:
+            if len(f.conditions) != 1 or f.conditions[0].op not in (">=", "<="):
+                raise ValueError(f"detector flag {f.name!r} must be one >= or <= condition")
+            c = f.conditions[0]
+            out.append((c.field, float(c.value), c.op == ">=", self.bits[f.name]))
+        return out
+
+@dataclass
+class RuleSet:
+    detector: DecisionTable
+    install_verify: DecisionTable
+    bad_min_flags: int = 2
+
+# --- loading ------------------------------------------------------------------
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "detector": {
+        "bad_min_flags": 2,
+        "flags": [
+            {"name": "AIRTIME_HIGH", "when": [["airtime_busy_pct", ">=", 75.0]]},
+            {"name": "RETRY_HIGH", "when": [["retry_pct", ">=", 18.0]]},
+            {"name": "LAT_SPIKE", "when": [["latency_p95_ms", ">=", 60.0]]},
+            {"name": "MESH_FLAP", "when": [["mesh_flap_count", ">=", 2]]},
+            {"name": "WAN_LOW_SINR", "when": [["wan_sinr_db", "<=", 5.0]]},
+        ],
+        "verdicts": [
+            {"name": "OPAQUE_RISK", "verdict": "OPAQUE_RISK", "confidence": 0.7, "opaque": True},
+            {"name": "WAN_UNSTABLE", "verdict": "WAN_UNSTABLE", "confidence": 0.7, "all": ["WAN_LOW_SINR"]},
+            {"name": "MESH_FLAP", "verdict": "MESH_FLAP", "confidence": 0.7, "all": ["MESH_FLAP"]},
+            {"name": "WIFI_CONGESTION", "verdict": "WIFI_CONGESTION", "confidence": 0.7,
+             "all": ["AIRTIME_HIGH", "RETRY_HIGH"]},
+            {"name": "WIFI_CONGESTION_LAT", "verdict": "WIFI_CONGESTION", "confidence": 0.6,
+             "all": ["LAT_SPIKE"], "any": ["RETRY_HIGH", "AIRTIME_HIGH"]},
+            {"name": "UNKNOWN", "verdict": "UNKNOWN", "confidence": 0.4},
+        ],
+    },
+    "install_verify": {
+        "flags": [
+            {"name": "WAN_LOW_SINR", "when": [["wan_sinr_db", "<", 5.0]]},
+            {"name": "DNS_FAIL", "when": [["dns_status", "==", "FAIL"]], "label": "dns_must_be", "display": "OK"},
+            {"name": "MESH_FLAP", "when": [["mesh_flap_count", ">=", 2, 0.0]], "label": "mesh_flap_max"},
+            {"name": "AIRTIME_HIGH", "when": [["airtime_busy_pct", ">=", 75.0, 0.0]], "label": "airtime_max_pct"},
+            {"name": "RETRY_HIGH", "when": [["retry_pct", ">=", 12.0, 0.0]], "label": "retry_max_pct"},
+            {"name": "SIGNAL_LOW", "when": [["signal_strength_pct", "<", 80, 0.0]], "label": "signal_min_pct"},
+            {"name": "LINK_SLOW", "when": [["phy_rate_mbps", ">", 0], ["phy_rate_mbps", "<", 100]],
+             "label": "link_rate_min_mbps"},
+            {"name": "LOSS_HIGH", "when": [["loss_pct", ">", 1.0, 0.0]], "label": "loss_max_pct"},
+            {"name": "LATENCY_HIGH", "when": [["latency_p95_ms", ">", 60.0, 0.0]], "label": "latency_max_ms"},
+        ],
+        "verdicts": [
+            {"name": "WAN", "verdict": "FAIL", "confidence": 0.8, "all": ["WAN_LOW_SINR"], "dominant": "WAN"},
+            {"name": "DNS", "verdict": "FAIL", "confidence": 0.8, "all": ["DNS_FAIL"], "dominant": "WAN (DNS)"},
+            {"name": "MESH", "verdict": "FAIL", "confidence": 0.8, "all": ["MESH_FLAP"], "dominant": "MESH"},
+            {"name": "CONGESTION", "verdict": "FAIL", "confidence": 0.8, "all": ["AIRTIME_HIGH"],
+             "dominant": "WIFI (Congestion)"},
+            {"name": "NOISE", "verdict": "FAIL", "confidence": 0.8, "all": ["RETRY_HIGH"], "dominant": "WIFI (Noise)"},
+            {"name": "COVERAGE", "verdict": "FAIL", "confidence": 0.8, "all": ["SIGNAL_LOW"],
+             "dominant": "WIFI (Coverage)"},
+            {"name": "LINK_SPEED", "verdict": "FAIL", "confidence": 0.8, "all": ["LINK_SLOW"],
+             "dominant": "WIFI (Link Speed)"},
+            {"name": "LOSS", "verdict": "FAIL", "confidence": 0.8, "all": ["LOSS_HIGH"], "dominant": "OPAQUE (Loss)"},
+            {"name": "LATENCY", "verdict": "FAIL", "confidence": 0.8, "all": ["LATENCY_HIGH"],
+             "dominant": "OPAQUE (Latency)"},
+            {"name": "PASS", "verdict": "PASS", "confidence": 0.85, "dominant": "UNKNOWN"},
+        ],
+    },
+}
+
+def _parse_flags(raw: List[Dict[str, Any]]) -> List[FlagRule]:
+    out = []
+    for f in raw:
+        conds = []
+        for c in f["when"]:
+            fld, op, value = c[0], c[1], c[2]
+            if op not in OPS:
+                raise ValueError(f"unknown operator {op!r} in flag {f['name']!r}")
+            conds.append(Condition(fld, op, value, c[3] if len(c) > 3 else None))
+        out.append(FlagRule(f["name"], tuple(conds), f.get("label"), f.get("display")))
+    return out
+
+_OUTCOME_KEYS = {"name", "verdict", "confidence", "all", "any", "none", "opaque"}
+
+def _parse_outcomes(raw: List[Dict[str, Any]]) -> List[OutcomeRule]:
+    return [OutcomeRule(name=r.get("name", r["verdict"]), outcome=r["verdict"], confidence=float(r["confidence"]),
+                        all_of=tuple(r.get("all", ())), any_of=tuple(r.get("any", ())),
+                        none_of=tuple(r.get("none", ())), opaque=r.get("opaque"),
+                        attrs={k: v for k, v in r.items() if k not in _OUTCOME_KEYS})
+            for r in raw]
+
+def parse_rules(raw: Dict[str, Any]) -> RuleSet:
+    """Build a RuleSet from a loaded YAML/dict; sections missing from raw use DEFAULT_RULES."""
+    from .M07_incident_detector import FLAG_BITS, FLAG_NAMES
+    det = raw.get("detector") or DEFAULT_RULES["detector"]
+    unknown = [f["name"] for f in det["flags"] if f["name"] not in FLAG_BITS]
+    if unknown:
+        raise ValueError(f"detector flags must be among {FLAG_NAMES}: {unknown}")
+    iv = raw.get("install_verify") or DEFAULT_RULES["install_verify"]
+    return RuleSet(
+        detector=DecisionTable(_parse_flags(det["flags"]), _parse_outcomes(det["verdicts"]),
+                               bits=FLAG_BITS, width=len(FLAG_NAMES)),
+        install_verify=DecisionTable(_parse_flags(iv["flags"]), _parse_outcomes(iv["verdicts"])),
+        bad_min_flags=int(det.get("bad_min_flags", 2)),
+    )
+
+def load_rules(config_path: str) -> RuleSet:
+    """
+    Load rules from a YAML file. A missing file (FileNotFoundError), missing PyYAML
+    (ImportError) or invalid file (ValueError) raises instead of silently using defaults.
+    """
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError(f"PyYAML is required to load rules from {config_path}") from e
+    with open(config_path, "r", encoding="utf-8") as f:
+        return parse_rules(yaml.safe_load(f) or {})
+
+@lru_cache(maxsize=1)
+def default_rules() -> RuleSet:
+    """Rules from configs/rules_v1.yaml, loaded once; DEFAULT_RULES (with a warning) if unreadable."""
+    try:
+        return load_rules(DEFAULT_RULES_PATH)
+    except (ImportError, OSError) as e:
+        warnings.warn(f"{e}; using built-in DEFAULT_RULES", RuntimeWarning, stacklevel=2)
+        return parse_rules(DEFAULT_RULES)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+from bisect import insort
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+from .M00_common import MetricSample
+from .M01_windowing import Windowing
+from .M07_incident_detector import BASELINE_FIELDS, FLAG_BITS, FLAG_NAMES, Flag, as_flag, flags_from_mask
+
+# MetricSample fields aggregated per window
+AGG_FIELDS: Tuple[str, ...] = BASELINE_FIELDS + ("loss_pct",)
+
+# A flag / badness holds for a window when raised on at least this fraction of its samples
+DEFAULT_QUORUM = 0.5
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Aggregate of one Ws / Wl window (or of a window merged with its predecessor)."""
+    window_ref: str
+    start: float
+    samples: int
+    bad: int  # samples the detector judged bad
+    mean: Dict[str, float] = field(default_factory=dict)
+    p95: Dict[str, float] = field(default_factory=dict)
+    flag_frac: Dict[str, float] = field(default_factory=dict)  # of all samples
+    bad_flag_frac: Dict[str, float] = field(default_factory=dict)  # of the bad samples
+
+    @property
+    def bad_frac(self) -> float:
+        return self.bad / self.samples if self.samples else 0.0
+
+    def judge_mask(self, quorum: float = DEFAULT_QUORUM) -> Tuple[bool, Flag]:
+        """
+        (is_bad, flags): bad when at least `quorum` of the samples were bad; flags are those
+        raised on at least `quorum` of the bad samples (of all samples if none was bad).
+        """
+        is_bad = self.samples > 0 and self.bad >= quorum * self.samples
+        frac = self.bad_flag_frac if self.bad else self.flag_frac
+        mask = 0
+        for f, v in frac.items():
+            if v >= quorum:
+                mask |= FLAG_BITS[f]
+        return is_bad, as_flag(mask)
+
+    def judge(self, quorum: float = DEFAULT_QUORUM) -> Tuple[bool, List[str]]:
+        """judge_mask() with flag names."""
+        is_bad, mask = self.judge_mask(quorum)
+        return is_bad, flags_from_mask(mask)
+
+    def to_dict(self) -> Dict:
+        return {"window_ref": self.window_ref, "start": self.start, "samples": self.samples, "bad": self.bad,
+                "mean": dict(self.mean), "p95": dict(self.p95), "flag_frac": dict(self.flag_frac),
+                "bad_flag_frac": dict(self.bad_flag_frac), "bad_frac": self.bad_frac}
+
+class _Acc:
+    """
+    Running sums for the open window. The window's values are kept sorted for an exact
+    p95: insort is O(log n) to find the slot but O(n) to shift the list, n being the
+    samples in the window so far (at most wl_sec / sample interval, 60 for Wl at 1 s).
+    """
+    __slots__ = ("ref", "start", "n", "bad", "sums", "values", "flags", "bad_flags", "_stats")
+
+    def __init__(self, ref: str, start: float):
+        self.ref, self.start, self.n, self.bad = ref, start, 0, 0
+        self.sums = [0.0] * len(AGG_FIELDS)
+        self.values: List[List[float]] = [[] for _ in AGG_FIELDS]
+        self.flags = [0] * len(FLAG_NAMES)
+        self.bad_flags = [0] * len(FLAG_NAMES)
+        self._stats: Optional[WindowStats] = None  # cached until the next add()
+
+    def add(self, m: MetricSample, mask: int, is_bad: bool) -> None:
+        self._stats = None
+        self.n += 1
+        self.bad += is_bad
+        for i, f in enumerate(AGG_FIELDS):
+            v = getattr(m, f)
+            if v is not None:
+                self.sums[i] += v
+                insort(self.values[i], float(v))
+        for i, name in enumerate(FLAG_NAMES):
+            if mask & FLAG_BITS[name]:
+                self.flags[i] += 1
+                self.bad_flags[i] += is_bad
+
+    def stats(self) -> WindowStats:
+        if self._stats is None:
+            self._stats = self._compute()
+        return self._stats
+
+    def _compute(self) -> WindowStats:
+        mean, p95 = {}, {}
+        for i, f in enumerate(AGG_FIELDS):
+            vals = self.values[i]
+            if vals:
+                mean[f] = self.sums[i] / len(vals)
+                p95[f] = vals[min(len(vals) - 1, int(0.95 * len(vals)))]
+        n, bad = self.n, self.bad
+        return WindowStats(
+            window_ref=self.ref, start=self.start, samples=n, bad=bad, mean=mean, p95=p95,
+            flag_frac={name: c / n for name, c in zip(FLAG_NAMES, self.flags) if c},
+            bad_flag_frac={name: c / bad for name, c in zip(FLAG_NAMES, self.bad_flags) if c and bad})
+
+def merge(a: WindowStats, b: WindowStats) -> WindowStats:
+    """
+    Two window aggregates as one (ref/start of b). Means and fractions are sample-weighted;
+    p95 takes the larger of the two (an upper bound, the exact value needs the samples).
+    """
+    n, bad = a.samples + b.samples, a.bad + b.bad
+    def wavg(x: Dict[str, float], wx: int, y: Dict[str, float], wy: int) -> Dict[str, float]:
+        out = {}
+        for k in set(x) | set(y):
+            out[k] = (x.get(k, 0.0) * wx + y.get(k, 0.0) * wy) / max(1, wx + wy)
+        return out
+    mean = {}
+    for k in set(a.mean) | set(b.mean):
+        if k not in a.mean or k not in b.mean:
+            mean[k] = a.mean.get(k, b.mean.get(k))
+        else:
+            mean[k] = (a.mean[k] * a.samples + b.mean[k] * b.samples) / n
+    return WindowStats(
+        window_ref=b.window_ref, start=b.start, samples=n, bad=bad, mean=mean,
+        p95={k: max(a.p95.get(k, float("-inf")), b.p95.get(k, float("-inf"))) for k in set(a.p95) | set(b.p95)},
+        flag_frac=wavg(a.flag_frac, a.samples, b.flag_frac, b.samples),
+        bad_flag_frac=wavg(a.bad_flag_frac, a.bad, b.bad_flag_frac, b.bad))
+
+class WindowAggregator:
+    """
+    Per-Ws and per-Wl aggregates (means, p95s, flag fractions), maintained incrementally
+    as samples are ingested: O(1) per sample for sums and flag counts, plus a sorted insert
+    per field for the open window's p95 (O(n) in its sample count, see _Acc). Only the open
+    window holds raw values; closed windows are frozen into WindowStats and kept in a
+    bounded history per kind. Samples must arrive in time order.
+    """
+    KINDS = ("Ws", "Wl")
+
+    def __init__(self, windowing: Optional[Windowing] = None, history: int = 360):
+        self.windowing = windowing or Windowing()
+        self._open: Dict[str, Optional[_Acc]] = {k: None for k in self.KINDS}
+        self._closed: Dict[str, Deque[WindowStats]] = {k: deque(maxlen=history) for k in self.KINDS}
+
+    def add(self, m: MetricSample, mask: int, is_bad: bool) -> None:
+        for kind in self.KINDS:
+            ref = self.windowing.window_ref(m.ts, kind)
+            acc = self._open[kind]
+            if acc is None or acc.ref != ref:
+                if acc is not None:
+                    self._closed[kind].append(acc.stats())
+                step = self.windowing.policy.ws_sec if kind == "Ws" else self.windowing.policy.wl_sec
+                acc = self._open[kind] = _Acc(ref, (m.ts // step) * step)
+            acc.add(m, mask, is_bad)
+
+    def current(self, kind: str = "Ws") -> Optional[WindowStats]:
+        acc = self._open[kind]
+        return acc.stats() if acc is not None else None
+
+    def closed(self, kind: str = "Ws", last: Optional[int] = None) -> List[WindowStats]:
+        """Closed windows, oldest first (the `last` most recent if given)."""
+        items = list(self._closed[kind])
+        return items[-last:] if last else items
+
+    def get(self, window_ref: str) -> Optional[WindowStats]:
+        kind = window_ref.split(":", 1)[0]
+        acc = self._open.get(kind)
+        if acc is not None and acc.ref == window_ref:
+            return acc.stats()
+        for w in reversed(self._closed.get(kind, ())):
+            if w.window_ref == window_ref:
+                return w
+        return None
+
+    def context(self, kind: str = "Wl", min_samples: int = 3) -> Optional[WindowStats]:
+        """
+        The open window, merged with the preceding closed window while it has fewer than
+        min_samples samples, so a window that just started is not judged on one sample.
+        """
+        cur = self.current(kind)
+        if cur is None or cur.samples >= min_samples:
+            return cur
+        prev = self._closed[kind][-1] if self._closed[kind] else None
+        step = self.windowing.policy.ws_sec if kind == "Ws" else self.windowing.policy.wl_sec
+        if prev is None or cur.start - prev.start > step:
+            return cur
+        return merge(prev, cur)
@@ -1,8 +1,61 @@
 
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from enum import IntFlag
+from itertools import compress
+from typing import Dict, List, Tuple, Optional, Sequence
 from .M00_common import MetricSample
+from .M07D_rule_engine import RuleSet, default_rules
+
+try:
+    import numpy as np  # optional: vectorized batch detection
+except ImportError:
+    np = None
+
+class Flag(IntFlag):
+    """
+    Badness flags as a bitmask, the representation used end-to-end (detector, classifier,
+    recognition, flag index). Names are rendered only at API / bundle boundaries.
+    """
+    AIRTIME_HIGH = 1
+    RETRY_HIGH = 2
+    LAT_SPIKE = 4
+    MESH_FLAP = 8
+    WAN_LOW_SINR = 16
+
+# Flag bits for per-sample bitmasks (order matches badness_flags output)
+FLAG_NAMES = tuple(f.name for f in Flag)
+FLAG_BITS: Dict[str, int] = {f.name: int(f) for f in Flag}
+
+# Severity: weighted count of raised flags plus normalized exceedance (IncidentDetector.severity)
+FLAG_WEIGHTS: Dict[str, float] = {name: 1.0 for name in FLAG_NAMES}
+SEVERITY_EXCEEDANCE_CAP = 2.0
+
+FLAG_ALL = (1 << len(FLAG_NAMES)) - 1
+
+# Per-mask lookup tables: Flag value, flag names, rendered label (masks of FLAG_ALL bits only;
+# indexing, unlike Flag & int, stays a plain list lookup)
+_FLAG_OF = [Flag(i) for i in range(1 << len(FLAG_NAMES))]
+_NAMES_OF = [tuple(name for name in FLAG_NAMES if i & FLAG_BITS[name]) for i in range(1 << len(FLAG_NAMES))]
+_LABEL_OF = [",".join(names) or "no_flags" for names in _NAMES_OF]
+
+def as_flag(mask: int) -> Flag:
+    """Flag value of a mask (table lookup; cheaper than Flag(mask))."""
+    return _FLAG_OF[mask]
+
+def flags_from_mask(mask: int) -> List[str]:
+    return list(_NAMES_OF[mask])
+
+def flag_label(mask: int) -> str:
+    """Flag names joined with "," ("no_flags" for none), as used in evidence refs."""
+    return _LABEL_OF[mask]
+
+def mask_from_flags(flags: Sequence[str]) -> Flag:
+    mask = 0
+    for f in flags:
+        mask |= FLAG_BITS[f]
+    return _FLAG_OF[mask]
 
 @dataclass
 class DetectorThresholds:
@@ -12,28 +65,258 @@ class DetectorThresholds:
     mesh_flap_per_min: int = 2
     wan_sinr_low_db: float = 5.0
 
+# DetectorThresholds attribute per rule field
+THRESHOLD_FIELDS: Dict[str, str] = {
+    "airtime_busy_pct": "airtime_busy_pct", "retry_pct": "retry_pct", "latency_p95_ms": "latency_p95_ms",
+    "mesh_flap_count": "mesh_flap_per_min", "wan_sinr_db": "wan_sinr_low_db",
+}
+
 class IncidentDetector:
     """
     Detects 'bad windows' using metadata-only signals.
+    Flag rules and the bad-window minimum come from the "detector" section of the rule
+    set (M07D; configs/rules_v1.yaml by default), compiled once to (field, limit, upper, bit).
+    th, when given, overrides the rule limits per field (what-if sweeps, tests).
     """
-    def __init__(self, th: DetectorThresholds = DetectorThresholds()):
+    def __init__(self, th: Optional[DetectorThresholds] = None, rules: Optional[RuleSet] = None):
+        rules = rules or default_rules()
+        compiled = rules.detector.detector_rules()
+        if th is not None:
+            compiled = [(f, float(getattr(th, THRESHOLD_FIELDS[f])) if f in THRESHOLD_FIELDS else limit, upper, bit)
+                        for f, limit, upper, bit in compiled]
+        else:
+            th = DetectorThresholds(**{THRESHOLD_FIELDS[f]: limit for f, limit, _, _ in compiled
+                                       if f in THRESHOLD_FIELDS})
         self.th = th
+        self.min_flags = rules.bad_min_flags
+        self._compiled = compiled
+
+    def badness_flags(self, m: MetricSample, device_id: Optional[str] = None) -> List[str]:
+        return flags_from_mask(self.flag_mask(m, device_id))
+
+    def _rules(self, device_id: Optional[str] = None) -> List[Tuple[str, float, bool, int]]:
+        """(MetricSample field, threshold, is_upper_bound, bit) for each flag."""
+        return self._compiled
+
+    def flag_mask(self, m: MetricSample, device_id: Optional[str] = None) -> Flag:
+        """Raised flags of one sample as a Flag bitmask."""
+        mask = 0
+        for field, limit, upper, bit in self._rules(device_id):
+            v = getattr(m, field)
+            if v is not None and (v >= limit if upper else v <= limit):
+                mask |= bit
+        return _FLAG_OF[mask]
+
+    def flag_masks(self, samples: Sequence[MetricSample], device_id: Optional[str] = None) -> array:
+        """Per-sample flag bitmasks for a whole buffer (column-wise)."""
+        cols = {field: [getattr(m, field) for m in samples] for field, _, _, _ in self._rules(device_id)}
+        return self.flag_masks_columns(cols, len(samples), device_id)
+
+    def flag_masks_columns(self, cols: Dict[str, Sequence[Optional[float]]], n: int,
+                           device_id: Optional[str] = None) -> array:
+        """
+        Evaluate the thresholds over whole columns (None = missing).
+        NumPy when available, else one pass per column over array('d') (NaN for None).
+        """
+        if np is not None:
+            acc = np.zeros(n, dtype=np.uint8)
+            with np.errstate(invalid="ignore"):
+                for field, limit, upper, bit in self._rules(device_id):
+                    col = cols.get(field)
+                    if col is None:
+                        continue
+                    v = np.asarray(col, dtype=float)
+                    acc |= np.where(v >= limit if upper else v <= limit, bit, 0).astype(np.uint8)
+            return array("B", acc.tobytes())
+        out = array("B", bytes(n))
+        nan = float("nan")
+        for field, limit, upper, bit in self._rules(device_id):
+            col = cols.get(field)
+            if col is None:
+                continue
+            v = col if isinstance(col, array) else array("d", (nan if x is None else x for x in col))
+            # NaN compares False on both sides, so missing values never flag
+            for i in compress(range(n), map(float(limit).__le__ if upper else float(limit).__ge__, v)):
+                out[i] |= bit
+        return out
+
+    def severity(self, m: MetricSample, device_id: Optional[str] = None) -> float:
+        """
+        Per-sample severity: for each raised flag, its FLAG_WEIGHTS weight plus how far the value
+        is past the threshold, relative to the threshold (capped at SEVERITY_EXCEEDANCE_CAP).
+        0.0 when no flag is raised.
+        """
+        score = 0.0
+        for field, limit, upper, bit in self._rules(device_id):
+            v = getattr(m, field)
+            if v is None:
+                continue
+            over = v - limit if upper else limit - v
+            if over >= 0:
+                weight = FLAG_WEIGHTS[FLAG_NAMES[bit.bit_length() - 1]]
+                score += weight + min(SEVERITY_EXCEEDANCE_CAP, over / max(abs(limit), 1.0))
+        return score
+
+    def is_bad_mask(self, mask: int) -> bool:
+        # Same rule as is_bad_window: min_flags+ signals
+        return mask.bit_count() >= self.min_flags
+
+    def observe(self, m: MetricSample, device_id: Optional[str] = None) -> None:
+        """Feed one sample to per-device state (no-op for fixed thresholds)."""
+
+    def judge(self, m: MetricSample, device_id: Optional[str] = None) -> Tuple[bool, Flag]:
+        """(is_bad, flags) of one sample, flags as a bitmask."""
+        mask = self.flag_mask(m, device_id)
+        # Require min_flags (default 2) signals to reduce false positives
+        return mask.bit_count() >= self.min_flags, mask
+
+    def is_bad_window(self, m: MetricSample, device_id: Optional[str] = None) -> Tuple[bool, List[str]]:
+        """judge() with flag names."""
+        is_bad, mask = self.judge(m, device_id)
+        return is_bad, flags_from_mask(mask)
+
+# --- Adaptive per-device baselines ---------------------------------------------
+
+# MetricSample field per flag, in FLAG_NAMES order
+BASELINE_FIELDS = ("airtime_busy_pct", "retry_pct", "latency_p95_ms", "mesh_flap_count", "wan_sinr_db")
+_BASELINE_INDEX = {f: i for i, f in enumerate(BASELINE_FIELDS)}
+
+@dataclass
+class AdaptivePolicy:
+    """
+    k_sigma: a value is bad when it deviates more than k_sigma std devs from the device baseline
+             (above it; below it for wan_sinr_db).
+    alpha: EWMA weight once warmed up (Welford exact mean/variance for the first min_samples).
+    bounds: per-field [floor, ceiling] clamp for the adaptive threshold. None derives it from
+            DetectorThresholds (see bounds_for), so the fixed thresholds stay the anchor:
+            before warm-up they apply unchanged, afterwards the threshold moves only within the band.
+    """
+    k_sigma: float = 3.0
+    alpha: float = 0.01
+    min_samples: int = 30
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None
+
+def bounds_for(th: DetectorThresholds) -> Dict[str, Tuple[float, float]]:
+    # Upper-bound metrics: from half to twice the fixed threshold (pct capped at 100);
+    # SINR (lower bound): +-5 dB around it.
+    return {
+        "airtime_busy_pct": (th.airtime_busy_pct * 0.5, min(100.0, th.airtime_busy_pct * 2)),
+        "retry_pct": (th.retry_pct * 0.5, min(100.0, th.retry_pct * 2)),
+        "latency_p95_ms": (th.latency_p95_ms * 0.5, th.latency_p95_ms * 2),
+        "mesh_flap_count": (float(th.mesh_flap_per_min), th.mesh_flap_per_min * 2.0),
+        "wan_sinr_db": (th.wan_sinr_low_db - 5.0, th.wan_sinr_low_db + 5.0),
+    }
+
+class DeviceBaseline:
+    """
+    Online mean/variance per metric for one device: 3 doubles per metric (n, mean, var)
+    in one flat array('d'). O(1) per update; to_list()/from_list() for persistence.
+    """
+    __slots__ = ("_s",)
+    WIDTH = 3
+
+    def __init__(self, state: Optional[Sequence[float]] = None):
+        self._s = array("d", state if state is not None else bytes(8 * self.WIDTH * len(BASELINE_FIELDS)))
+
+    def update(self, i: int, x: float, alpha: float, min_samples: int) -> None:
+        s, o = self._s, i * self.WIDTH
+        n = s[o] + 1
+        s[o] = n
+        mean = s[o + 1]
+        diff = x - mean
+        if n <= min_samples:
+            # Welford: exact running mean; var holds the population variance
+            mean += diff / n
+            s[o + 2] += (diff * (x - mean) - s[o + 2]) / n
+        else:
+            incr = alpha * diff
+            mean += incr
+            s[o + 2] = (1 - alpha) * (s[o + 2] + diff * incr)
+        s[o + 1] = mean
+
+    def stats(self, i: int) -> Tuple[int, float, float]:
+        """(n, mean, std) for metric i."""
+        o = i * self.WIDTH
+        return int(self._s[o]), self._s[o + 1], max(0.0, self._s[o + 2]) ** 0.5
+
+    def to_list(self) -> List[float]:
+        return self._s.tolist()
+
+    @classmethod
+    def from_list(cls, state: Sequence[float]) -> "DeviceBaseline":
+        return cls(state)
+
+class AdaptiveIncidentDetector(IncidentDetector):
+    """
+    IncidentDetector with per-device online baselines.
+    Thresholds per device/metric = baseline mean +- k_sigma * std, clamped to the policy bounds;
+    the fixed DetectorThresholds apply until a metric has min_samples observations.
+    Call observe() once per collected sample (OBHCoreService.ingest does this).
+    """
+    DEFAULT_DEVICE = "local"
+
+    def __init__(self, th: Optional[DetectorThresholds] = None, policy: AdaptivePolicy = AdaptivePolicy(),
+                 rules: Optional[RuleSet] = None):
+        super().__init__(th, rules)
+        self.policy = policy
+        self.bounds = policy.bounds or bounds_for(self.th)
+        self.baselines: Dict[str, DeviceBaseline] = {}
+
+    def baseline(self, device_id: Optional[str] = None) -> DeviceBaseline:
+        key = device_id or self.DEFAULT_DEVICE
+        b = self.baselines.get(key)
+        if b is None:
+            b = self.baselines[key] = DeviceBaseline()
+        return b
+
+    def observe(self, m: MetricSample, device_id: Optional[str] = None) -> None:
+        b = self.baseline(device_id)
+        alpha, min_samples = self.policy.alpha, self.policy.min_samples
+        for i, field in enumerate(BASELINE_FIELDS):
+            v = getattr(m, field)
+            if v is not None:
+                b.update(i, float(v), alpha, min_samples)
+
+    def _rules(self, device_id: Optional[str] = None) -> List[Tuple[str, float, bool, int]]:
+        fixed = super()._rules()
+        b = self.baselines.get(device_id or self.DEFAULT_DEVICE)
+        if b is None:
+            return fixed
+        k, min_samples = self.policy.k_sigma, self.policy.min_samples
+        out = []
+        for field, limit, upper, bit in fixed:
+            i, band = _BASELINE_INDEX.get(field), self.bounds.get(field)
+            if i is None or band is None:  # field without a baseline: fixed rule
+                out.append((field, limit, upper, bit))
+                continue
+            n, mean, std = b.stats(i)
+            if n >= min_samples:
+                lo, hi = band
+                limit = min(hi, max(lo, mean + k * std if upper else mean - k * std))
+            out.append((field, limit, upper, bit))
+        return out
+
+    def thresholds(self, device_id: Optional[str] = None) -> Dict[str, float]:
+        """Effective threshold per MetricSample field for a device."""
+        return {field: limit for field, limit, _, _ in self._rules(device_id)}
+
+    def deviations(self, m: MetricSample, device_id: Optional[str] = None) -> Dict[str, Optional[float]]:
+        """z-score of each metric vs the device baseline (None if missing or not warmed up)."""
+        b = self.baselines.get(device_id or self.DEFAULT_DEVICE)
+        out: Dict[str, Optional[float]] = {}
+        for i, field in enumerate(BASELINE_FIELDS):
+            v = getattr(m, field)
+            z = None
+            if b is not None and v is not None:
+                n, mean, std = b.stats(i)
+                if n >= self.policy.min_samples and std > 0:
+                    z = (v - mean) / std
+            out[field] = z
+        return out
+
+    def state(self) -> Dict[str, List[float]]:
+        """JSON-serializable state for all devices."""
+        return {dev: b.to_list() for dev, b in self.baselines.items()}
 
-    def badness_flags(self, m: MetricSample) -> List[str]:
-        flags: List[str] = []
-        if m.airtime_busy_pct is not None and m.airtime_busy_pct >= self.th.airtime_busy_pct:
-            flags.append("AIRTIME_HIGH")
-        if m.retry_pct is not None and m.retry_pct >= self.th.retry_pct:
-            flags.append("RETRY_HIGH")
-        if m.latency_p95_ms is not None and m.latency_p95_ms >= self.th.latency_p95_ms:
-            flags.append("LAT_SPIKE")
-        if m.mesh_flap_count is not None and m.mesh_flap_count >= self.th.mesh_flap_per_min:
-            flags.append("MESH_FLAP")
-        if m.wan_sinr_db is not None and m.wan_sinr_db <= self.th.wan_sinr_low_db:
-            flags.append("WAN_LOW_SINR")
-        return flags
-
-    def is_bad_window(self, m: MetricSample) -> Tuple[bool, List[str]]:
-        flags = self.badness_flags(m)
-        # Require 2+ signals to reduce false positives
-        return (len(flags) >= 2), flags
+    def load_state(self, state: Dict[str, Sequence[float]]) -> None:
+        self.baselines = {dev: DeviceBaseline.from_list(v) for dev, v in state.items()}
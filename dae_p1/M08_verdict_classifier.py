@@ -1,21 +1,50 @@
-
 from __future__ import annotations
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from .M00_common import Verdict
+from .M07_incident_detector import mask_from_flags
+from .M07D_rule_engine import RuleSet, default_rules
+
+@dataclass
+class ClassifierConfig:
+    """
+    opaque_overrides: OPAQUE_RISK wins over flag-based verdicts (default behavior);
+        when False it only replaces the catch-all verdict.
+    confidence: per-rule confidence overrides, by verdict rule name (e.g. "WIFI_CONGESTION_LAT",
+        latency + one Wi-Fi signal); rules not listed keep the confidence from the rule set.
+    """
+    opaque_overrides: bool = True
+    confidence: Dict[str, float] = field(default_factory=dict)
 
 class VerdictClassifier:
     """
     Produces a minimal verdict from badness flags.
+    The "detector" verdict rules (M07D) are compiled at construction into one
+    (verdict, confidence) entry per (flag mask, opaque) combination; classify() is a lookup.
     """
-    def classify(self, flags: List[str], opaque_risk: bool=False) -> Tuple[Verdict, float]:
-        if opaque_risk:
-            return "OPAQUE_RISK", 0.7
-        if "WAN_LOW_SINR" in flags:
-            return "WAN_UNSTABLE", 0.7
-        if "MESH_FLAP" in flags:
-            return "MESH_FLAP", 0.7
-        if "AIRTIME_HIGH" in flags and "RETRY_HIGH" in flags:
-            return "WIFI_CONGESTION", 0.7
-        if "LAT_SPIKE" in flags and ("RETRY_HIGH" in flags or "AIRTIME_HIGH" in flags):
-            return "WIFI_CONGESTION", 0.6
-        return "UNKNOWN", 0.4
+    def __init__(self, config: ClassifierConfig = ClassifierConfig(), rules: Optional[RuleSet] = None):
+        self.config = config
+        self.rules = rules or default_rules()
+        dt = self.rules.detector
+        self._shift = dt.width
+        self._table: List[Tuple[Verdict, float]] = []
+        for i in range(2 << dt.width):
+            mask, opaque = i & ((1 << dt.width) - 1), i >> dt.width
+            r = dt.decide(mask, bool(opaque))
+            if opaque and not config.opaque_overrides:
+                flag_rule = dt.decide(mask, False)
+                if not flag_rule.is_catch_all:
+                    r = flag_rule
+            self._table.append((r.outcome, config.confidence.get(r.name, r.confidence)))
+
+    def classify(self, flags: Union[int, Sequence[str]], opaque_risk: bool=False) -> Tuple[Verdict, float]:
+        """flags: Flag bitmask (M07), or flag names at API boundaries."""
+        mask = flags if isinstance(flags, int) else mask_from_flags(flags)
+        return self._table[int(mask) | (bool(opaque_risk) << self._shift)]
+
+    def table(self) -> List[Tuple[Verdict, float]]:
+        """
+        classify() for every (flag mask, opaque) combination, indexed by
+        mask | (opaque << len(FLAG_NAMES)), for batch classification of mask columns.
+        """
+        return list(self._table)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from .M09_episode_manager import ClosedEpisode
+
+_COLUMNS = ("episode_id", "device_id", "verdict", "confidence", "start_ts", "end_ts",
+            "worst_window_ref", "bad_windows", "change_ref", "evidence_refs")
+
+class EpisodeStore:
+    """
+    Closed-episode archive in an embedded SQLite table.
+
+    B-tree indexes on (verdict, start_ts), (device_id, start_ts), (change_ref), start_ts
+    and end_ts keep lookups O(log n + k). Writes are buffered and flushed in one
+    transaction once `batch_size` records are pending or `flush_interval_sec` has passed
+    (checked on add() and on flush_if_due(), which the core calls every tick); queries
+    flush first, so they always see every added episode.
+    db_path=":memory:" keeps the store in-process (tests, demos).
+    """
+    def __init__(self, db_path: str = ":memory:", batch_size: int = 32, flush_interval_sec: float = 5.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # One connection shared by the tick thread and API handlers, serialized by _lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._last_flush = time.monotonic()
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS episodes (
+                    episode_id TEXT PRIMARY KEY,
+                    device_id TEXT NOT NULL,
+                    verdict TEXT NOT NULL,
+                    confidence REAL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    worst_window_ref TEXT,
+                    bad_windows INTEGER,
+                    change_ref TEXT,
+                    evidence_refs TEXT
+                )
+            """)
+            for name, cols in (("verdict_start", "verdict, start_ts"),
+                               ("device_start", "device_id, start_ts"),
+                               ("change_ref", "change_ref"),
+                               ("start", "start_ts"),
+                               ("end", "end_ts")):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_episodes_{name} ON episodes ({cols})")
+
+    # --- writes ---
+
+    def add(self, ep: ClosedEpisode) -> None:
+        row = (ep.episode_id, ep.device_id, ep.verdict, ep.confidence, ep.start_ts, ep.end_ts,
+               ep.worst_window_ref, ep.bad_windows, ep.change_ref, json.dumps(list(ep.evidence_refs)))
+        with self._lock:
+            self._pending.append(row)
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval_sec)
+            if due:
+                self._flush_locked()
+
+    def flush_if_due(self) -> None:
+        """Flush pending records once flush_interval_sec has passed since the last flush."""
+        if not self._pending:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_flush >= self.flush_interval_sec:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO episodes ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})", self._pending)
+        self._pending.clear()
+
+    # --- queries ---
+
+    def query(self, verdict: Optional[str] = None, device_id: Optional[str] = None,
+              change_ref: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, min_confidence: Optional[float] = None,
+              limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Closed episodes matching every given filter, newest first.
+        since/until select episodes overlapping [since, until] (epoch seconds).
+        """
+        where, args = [], []
+        for col, val in (("verdict", verdict), ("device_id", device_id), ("change_ref", change_ref)):
+            if val is not None:
+                where.append(f"{col} = ?")
+                args.append(val)
+        if until is not None:
+            where.append("start_ts <= ?")
+            args.append(until)
+        if since is not None:
+            where.append("end_ts >= ?")
+            args.append(since)
+        if min_confidence is not None:
+            where.append("confidence > ?")
+            args.append(min_confidence)
+        sql = "SELECT * FROM episodes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY start_ts DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(sql, args).fetchall()
+        return [_row(r) for r in rows]
+
+    def get(self, episode_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._flush_locked()
+            r = self._conn.execute("SELECT * FROM episodes WHERE episode_id = ?", (episode_id,)).fetchone()
+        return _row(r) if r is not None else None
+
+    def count(self) -> int:
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    def explain(self, **filters) -> str:
+        """SQLite query plan for equality filters, e.g. explain(verdict="WAN_UNSTABLE")."""
+        sql_filters = {k: v for k, v in filters.items() if v is not None}
+        cols = " AND ".join(f"{k} = ?" for k in sql_filters)
+        sql = "EXPLAIN QUERY PLAN SELECT * FROM episodes" + (f" WHERE {cols}" if cols else "")
+        with self._lock:
+            return " | ".join(r[-1] for r in self._conn.execute(sql, list(sql_filters.values())))
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+def _row(r: sqlite3.Row) -> Dict[str, Any]:
+    d = dict(r)
+    d["evidence_refs"] = json.loads(d["evidence_refs"] or "[]")
+    return d
@@ -1,36 +1,251 @@
-
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional, List
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple, Union
 from .M00_common import sha256_str, now_ts
+from .M07_incident_detector import flag_label
+
+# Evidence: a ref string, or (Ws window_ref, Flag mask) rendered as "<ref>:<flag names>" on read
+EvidenceRef = Union[str, Tuple[str, int]]
+
+def render_evidence(ref: EvidenceRef) -> str:
+    return ref if isinstance(ref, str) else f"{ref[0]}:{flag_label(ref[1])}"
+
+class EvidenceRing:
+    """
+    Fixed-size evidence ref ring with run-length compression: a ref repeated on
+    consecutive observations (e.g. /recognition polled within one Ws) is one entry.
+    Entries stay as added (EvidenceRef); refs() renders them.
+    """
+    __slots__ = ("_runs", "total")
+
+    def __init__(self, maxlen: int = 32):
+        self._runs: Deque[List] = deque(maxlen=maxlen)  # [ref, count]
+        self.total = 0
+
+    def add(self, ref: EvidenceRef) -> None:
+        self.total += 1
+        if self._runs and self._runs[-1][0] == ref:
+            self._runs[-1][1] += 1
+        else:
+            self._runs.append([ref, 1])
+
+    def runs(self) -> List[Tuple[EvidenceRef, int]]:
+        return [(r, n) for r, n in self._runs]
+
+    def refs(self, last: Optional[int] = None) -> List[str]:
+        """Refs in order; repeated runs render as "<ref> x<count>"."""
+        runs = list(self._runs)[-last:] if last else self._runs
+        return [render_evidence(r) if n == 1 else f"{render_evidence(r)} x{n}" for r, n in runs]
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+class WorstWindows:
+    """
+    Severity per Wl window with a bounded top-K of the worst ones.
+    Samples add to the score of their (current) Wl window; when the window rolls over
+    its final score enters a K-sized min-heap (O(log K)). Windows scoring 0 are not kept.
+    """
+    __slots__ = ("k", "_heap", "_cur")
+
+    def __init__(self, k: int = 5):
+        self.k = k
+        self._heap: List[Tuple[float, str, float]] = []  # (score, window_ref, last_ts)
+        self._cur: Optional[List] = None  # [score, window_ref, last_ts]
+
+    def add(self, window_ref: str, ts: float, score: float) -> None:
+        cur = self._cur
+        if cur is not None and cur[1] == window_ref:
+            cur[0] += score
+            cur[2] = ts
+            return
+        if cur is not None:
+            self._push(cur[0], cur[1], cur[2])
+        self._cur = [score, window_ref, ts]
+
+    def _push(self, score: float, window_ref: str, ts: float) -> None:
+        if score <= 0:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (score, window_ref, ts))
+        elif score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (score, window_ref, ts))
+
+    def ranked(self) -> List[Tuple[str, float]]:
+        """[(window_ref, score)] worst first, including the window still in progress."""
+        entries = list(self._heap)
+        if self._cur is not None and self._cur[0] > 0:
+            entries.append(tuple(self._cur))
+        entries.sort(reverse=True)
+        return [(ref, round(score, 3)) for score, ref, _ in entries[:self.k]]
+
+    def worst_ref(self) -> Optional[str]:
+        r = self.ranked()
+        return r[0][0] if r else None
+
+    def merge_from(self, other: "WorstWindows", since: float) -> None:
+        """Take over other's windows that were still active at or after `since`."""
+        for score, ref, ts in other._heap:
+            if ts >= since:
+                self._push(score, ref, ts)
+        if other._cur is not None and other._cur[2] >= since and self._cur is None:
+            self._cur = list(other._cur)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap) or (self._cur is not None and self._cur[0] > 0)
 
 @dataclass
 class Episode:
     episode_id: str
     start_ts: float
     worst_window_ref: str
-    evidence_refs: List[str]
+    verdict: str = "UNKNOWN"
+    evidence: EvidenceRing = field(default_factory=EvidenceRing)
+    last_bad_ts: float = 0.0
+    bad_windows: int = 0
+    good_streak: int = 0
+    last_window_ref: Optional[str] = None
+    confidence: float = 0.0  # highest classifier confidence seen
+    change_ref: Optional[str] = None  # change event the episode was attributed to
+    worst: WorstWindows = field(default_factory=WorstWindows)
+
+    @property
+    def evidence_refs(self) -> List[str]:
+        return self.evidence.refs()
+
+@dataclass(frozen=True)
+class ClosedEpisode:
+    """Compact archive record of a closed episode."""
+    episode_id: str
+    verdict: str
+    start_ts: float
+    end_ts: float
+    worst_window_ref: str
+    bad_windows: int
+    evidence_refs: Tuple[str, ...]
+    device_id: str = "local"
+    confidence: float = 0.0
+    change_ref: Optional[str] = None
 
 class EpisodeManager:
     """
-    Tracks a current episode based on bad windows. Free v1 keeps this simple.
+    Episode lifecycle per verdict class, fed once per observed Ws window.
+    - open: `open_after` bad windows of a verdict class open an episode for that class;
+      episodes of different classes can be open at the same time.
+    - close: an open episode closes after `close_after` consecutive windows that are not
+      bad for its class, and is archived to a bounded history (and to `store`, if given).
+    Repeated observations of the same window_ref do not advance the hysteresis counters.
+    track() feeds per-sample severity into each open episode's worst-window top-K; a new
+    episode starts from the device-level top-K windows of the degradation run it belongs to
+    (since the last zero-severity sample, or its start_ts if earlier).
     """
-    def __init__(self):
-        self.current: Optional[Episode] = None
-
-    def start_or_update(self, worst_window_ref: str, evidence_ref: str) -> Episode:
-        if self.current is None:
-            eid = f"ep-{sha256_str(str(now_ts()))[:12]}"
-            self.current = Episode(episode_id=eid, start_ts=now_ts(),
-                                   worst_window_ref=worst_window_ref,
-                                   evidence_refs=[evidence_ref])
-        else:
-            self.current.worst_window_ref = worst_window_ref
-            self.current.evidence_refs.append(evidence_ref)
-        return self.current
+    def __init__(self, open_after: int = 1, close_after: int = 3,
+                 evidence_len: int = 32, history_len: int = 200,
+                 store=None, device_id: str = "local", top_k: int = 5):
+        self.open_after = open_after
+        self.close_after = close_after
+        self.evidence_len = evidence_len
+        self.store = store  # M09A EpisodeStore (duck-typed: add(ClosedEpisode))
+        self.device_id = device_id
+        self.open: Dict[str, Episode] = {}
+        self.history: Deque[ClosedEpisode] = deque(maxlen=history_len)
+        self._pending: Dict[str, Tuple[int, Optional[str]]] = {}  # verdict -> (bad windows, last window_ref)
+        self._last: Optional[Episode] = None
+        self.top_k = top_k
+        self.windows = WorstWindows(top_k)
+        self._calm_ts: Optional[float] = None  # last sample with zero severity
+
+    def track(self, wl_ref: str, ts: float, severity: float) -> None:
+        """Add one sample's severity to its Wl window (device-level and every open episode)."""
+        self.windows.add(wl_ref, ts, severity)
+        if severity <= 0:
+            self._calm_ts = ts
+        for ep in self.open.values():
+            ep.worst.add(wl_ref, ts, severity)
+
+    def observe(self, window_ref: str, is_bad: bool, verdict: str, evidence_ref: EvidenceRef,
+                worst_window_ref: str, start_ts: Optional[float] = None,
+                confidence: float = 0.0, change_ref: Optional[str] = None) -> Optional[Episode]:
+        """
+        Feed one recognition result. Returns the episode of `verdict` if one is open
+        after this window, else None. start_ts: onset to back-date a new episode to.
+        """
+        now = now_ts()
+        # Close-side hysteresis for every other open episode
+        for v, ep in list(self.open.items()):
+            if is_bad and v == verdict:
+                continue
+            if ep.last_window_ref != window_ref:
+                ep.last_window_ref = window_ref
+                ep.good_streak += 1
+                if ep.good_streak >= self.close_after:
+                    self._close(v, now)
+        for v in [v for v in self._pending if not (is_bad and v == verdict)]:
+            del self._pending[v]
+
+        if not is_bad:
+            return None
+
+        ep = self.open.get(verdict)
+        if ep is None:
+            n, last_ref = self._pending.get(verdict, (0, None))
+            if last_ref != window_ref:
+                n += 1
+            if n < self.open_after:
+                self._pending[verdict] = (n, window_ref)
+                return None
+            self._pending.pop(verdict, None)
+            ep = Episode(episode_id=f"ep-{sha256_str(f'{verdict}:{now}')[:12]}",
+                         start_ts=now if start_ts is None else start_ts,
+                         worst_window_ref=worst_window_ref, verdict=verdict,
+                         evidence=EvidenceRing(self.evidence_len), worst=WorstWindows(self.top_k))
+            calm = self._calm_ts if self._calm_ts is not None else float("-inf")
+            ep.worst.merge_from(self.windows, since=min(ep.start_ts, calm))
+            self.open[verdict] = ep
+        if ep.last_window_ref != window_ref:
+            ep.bad_windows += 1
+        ep.last_window_ref = window_ref
+        ep.good_streak = 0
+        ep.last_bad_ts = now
+        ep.worst_window_ref = ep.worst.worst_ref() or worst_window_ref
+        ep.evidence.add(evidence_ref)
+        ep.confidence = max(ep.confidence, confidence)
+        if change_ref:
+            ep.change_ref = change_ref
+        self._last = ep
+        return ep
+
+    def _close(self, verdict: str, end_ts: float) -> None:
+        ep = self.open.pop(verdict)
+        closed = ClosedEpisode(
+            episode_id=ep.episode_id, verdict=ep.verdict, start_ts=ep.start_ts,
+            end_ts=ep.last_bad_ts or end_ts, worst_window_ref=ep.worst.worst_ref() or ep.worst_window_ref,
+            bad_windows=ep.bad_windows, evidence_refs=tuple(ep.evidence.refs(10)),
+            device_id=self.device_id, confidence=ep.confidence, change_ref=ep.change_ref)
+        self.history.append(closed)
+        if self.store is not None:
+            self.store.add(closed)
+        if self._last is ep:
+            self._last = None
+
+    @property
+    def current(self) -> Optional[Episode]:
+        """Most recently updated open episode (None when nothing is open)."""
+        if self._last is not None:
+            return self._last
+        return max(self.open.values(), key=lambda e: e.last_bad_ts, default=None)
 
     def get(self) -> Optional[Episode]:
         return self.current
 
+    def open_episodes(self) -> List[Episode]:
+        return list(self.open.values())
+
     def clear(self) -> None:
-        self.current = None
+        """Close every open episode (archived) and drop pending opens."""
+        now = now_ts()
+        for v in list(self.open):
+            self._close(v, now)
+        self._pending.clear()
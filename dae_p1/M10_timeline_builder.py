@@ -31,7 +31,8 @@ class TimelineBuilder:
                     "origin_hint": e.origin_hint,
                     "target_scope": e.target_scope,
                     "change_ref": e.change_ref,
-                    "window_ref": e.window_ref
+                    "window_ref": e.window_ref,
+                    "count": e.count
                 } for e in events
             ],
             "pre_change_snapshots": [
@@ -30,6 +30,8 @@ class OBHController:
             "episode_id": recognition.episode_id,
             "episode_start": iso(recognition.episode_start),
             "worst_window_ref": recognition.worst_window_ref,
+            "worst_windows": recognition.worst_windows,
+            "window_stats": recognition.window_stats,
             "primary_verdict": recognition.primary_verdict,
             "confidence": recognition.confidence,
             "evidence_refs": recognition.evidence_refs,
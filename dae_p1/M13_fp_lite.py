@@ -1,6 +1,6 @@
 
 from __future__ import annotations
-from typing import Dict, Any, List, Optional, Tuple, NamedTuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple, NamedTuple
 import statistics
 import math
 import time
@@ -87,14 +87,16 @@ class Wifi78OscillationGuard(ProfileBase):
 
     def check(self, p50, p95, p5) -> List[str]:
         reasons = []
-        if p95.get("retry_burst_count", 0) > 5:
+        if p95.get("retry_burst_count", 0) > 5 or p95.get("airtime_burst_count", 0) > 5:
             reasons.append("WIFI_SIDE_OSCILLATION")
         return reasons
         
     def get_outcome_facets(self, p50, p95, p5):
         return [
             {"name": "retry_burst_p95", "value": p95.get("retry_burst_count", 0), "unit": "count"},
-            {"name": "mlo_switch_burst_p95", "value": p95.get("mlo_switch_count", 0), "unit": "count"}
+            {"name": "airtime_burst_p95", "value": p95.get("airtime_burst_count", 0), "unit": "count"},
+            {"name": "mlo_switch_burst_p95", "value": p95.get("mlo_switch_count", 0), "unit": "count"},
+            {"name": "retry_oscillation_period_p50", "value": p50.get("retry_osc_period_sec", 0), "unit": "s"}
         ]
 
 # 7.2 FWA Profiles
@@ -263,7 +265,12 @@ class ProofCardGenerator:
                  window_data: List[Dict[str, Any]], 
                  profile_ref: str, 
                  window_ref_str: str,
-                 manifest_ref_str: str = "TBD") -> Dict[str, Any]:
+                 manifest_ref_str: str = "TBD",
+                 columns: Optional[Dict[str, Sequence[float]]] = None) -> Dict[str, Any]:
+        """
+        columns: precomputed feature columns keyed by vector name (OBHCoreService.features.window());
+        when given, window_data is not scanned and NaN/None entries count as missing.
+        """
         
         # 0. Prep
         # Use a consistent ID generation (in real app, use UUID)
@@ -271,7 +278,7 @@ class ProofCardGenerator:
         profile = ProfileManager.get(profile_ref)
         
         # 1. Sample Count Check
-        n = len(window_data)
+        n = len(next(iter(columns.values()), ())) if columns is not None else len(window_data)
         if n < profile.MIN_SAMPLES:
             return self._build_card(card_id, profile.REF, "INSUFFICIENT_EVIDENCE", 
                                     window_ref_str, ["INSUFFICIENT_SAMPLES"], 
@@ -300,24 +307,29 @@ class ProofCardGenerator:
             return vals
 
         # Map to standard vectors
-        vectors = {
-            "rtt_ms": extract("rtt", ["latency_ms", "latency", "latency_p95_ms"]),
-            "loss_pct": extract("loss", ["loss_percent", "loss_pct"]),
-            "us_rtt_ms": extract("us_rtt", ["us_latency"]), 
-            "us_loss_pct": extract("us_loss", ["us_loss_pct"]),
-            "throughput_mbps": extract("throughput", ["in_rate", "out_rate"]), # Approximate?
-            "wifi_retry_pct": extract("wifi_retry", ["retry_pct"]),
-            "backhaul_rssi": extract("backhaul_rssi", ["signal_strength_pct"]), # Hack: map pct to rssi slot if missing? No, values differ.
-            "access_retry_pct": extract("access_retry"),
-            "rsrp": extract("rsrp", ["wan_rsrp_dbm"]),
-            "sinr": extract("sinr", ["wan_sinr_db"]),
-            "ofdm_mer": extract("ofdm_mer"),
-            "fec_corrected": extract("fec_corrected"),
-            "retrans_count": extract("retrans"),
-            "retry_burst_count": extract("retry_burst"),
-            "mlo_switch_count": extract("mlo_switches"),
-            "phy_rate_mbps": extract("phy_rate", ["phy_rate_mbps"])
-        }
+        if columns is not None:
+            vectors = {k: [v for v in col if v is not None and v == v] for k, col in columns.items()}
+        else:
+            vectors = {
+                "rtt_ms": extract("rtt", ["latency_ms", "latency", "latency_p95_ms"]),
+                "loss_pct": extract("loss", ["loss_percent", "loss_pct"]),
+                "us_rtt_ms": extract("us_rtt", ["us_latency"]), 
+                "us_loss_pct": extract("us_loss", ["us_loss_pct"]),
+                "throughput_mbps": extract("throughput", ["in_rate", "out_rate"]), # Approximate?
+                "wifi_retry_pct": extract("wifi_retry", ["retry_pct"]),
+                "backhaul_rssi": extract("backhaul_rssi", ["signal_strength_pct"]), # Hack: map pct to rssi slot if missing? No, values differ.
+                "access_retry_pct": extract("access_retry"),
+                "rsrp": extract("rsrp", ["wan_rsrp_dbm"]),
+                "sinr": extract("sinr", ["wan_sinr_db"]),
+                "ofdm_mer": extract("ofdm_mer"),
+                "fec_corrected": extract("fec_corrected"),
+                "retrans_count": extract("retrans"),
+                "retry_burst_count": extract("retry_burst", ["retry_burst_count"]),
+                "airtime_burst_count": extract("airtime_burst", ["airtime_burst_count"]),
+                "retry_osc_period_sec": extract("retry_osc_period", ["retry_osc_period_sec"]),
+                "mlo_switch_count": extract("mlo_switches", ["mlo_switch_count"]),
+                "phy_rate_mbps": extract("phy_rate", ["phy_rate_mbps"])
+            }
         
         # 3. Compute p50 / p95 / p5
         p50_map = {}
@@ -420,6 +432,7 @@ class ProofCardGeneratorV14:
         window_ref_str: str,
         manifest_ref_str: str = "TBD",
         ctx_overrides: Optional[Dict[str, Any]] = None,
+        columns: Optional[Dict[str, Sequence[float]]] = None,
     ) -> Dict[str, Any]:
         """
         Full V1.4 pipeline:
@@ -435,7 +448,7 @@ class ProofCardGeneratorV14:
 
         # 1) V1.3 base card
         v13_card = self._v13.generate(
-            window_data, profile_ref, window_ref_str, manifest_ref_str
+            window_data, profile_ref, window_ref_str, manifest_ref_str, columns=columns
         )
 
         # 2) Build context
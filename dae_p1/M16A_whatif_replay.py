@@ -0,0 +1,275 @@
+"""
+What-if replay: re-run detection, classification and episode segmentation over a stored
+history for many candidate configs (DetectorThresholds + ClassifierConfig + hysteresis).
+
+The history is turned into columns once (ReplayHistory): metric columns as array('d'),
+observed-window ordinals, the Wl context of each Ws window, and a per-sample "opaque" bit
+from the change-event lookback join, none of which depends on the config. Each config is
+then one columnar pass:
+  flag masks (IncidentDetector.flag_masks_columns) -> bad samples -> each Ws window judged
+  by quorum over its Wl context, as the live engine judges WindowAggregator.context("Wl")
+  (M07E) -> verdicts via the classifier's 64-entry (mask, opaque) table -> per-verdict
+  episode runs.
+sweep() spreads configs over a process pool; the history is shipped to each worker once.
+
+CLI:
+  python -m dae_p1.M16A_whatif_replay recording.ndjson --configs configs.json --workers 8
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import accumulate, compress
+from operator import le, sub
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .M00_common import ChangeEventCard, MetricSample
+from .M01_windowing import Windowing
+from .M06_observability_checker import ObservabilityChecker
+from .M06A_event_index import DEFAULT_LOOKBACK_SEC
+from .M07_incident_detector import BASELINE_FIELDS, FLAG_NAMES, DetectorThresholds, IncidentDetector
+from .M07E_window_aggregates import DEFAULT_QUORUM
+from .M08_verdict_classifier import ClassifierConfig, VerdictClassifier
+
+try:
+    import numpy as np  # optional: vectorized bad-sample selection
+except ImportError:
+    np = None
+
+@dataclass
+class WhatIfConfig:
+    name: str
+    thresholds: DetectorThresholds = field(default_factory=DetectorThresholds)
+    classifier: ClassifierConfig = field(default_factory=ClassifierConfig)
+    open_after: int = 1
+    close_after: int = 3
+    quorum: float = DEFAULT_QUORUM  # RecognitionEngine.window_quorum
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "WhatIfConfig":
+        # Partial confidence maps override the rule set's confidences per verdict rule
+        return cls(name=d["name"],
+                   thresholds=DetectorThresholds(**d.get("thresholds", {})),
+                   classifier=ClassifierConfig(**d.get("classifier", {})),
+                   open_after=d.get("open_after", 1), close_after=d.get("close_after", 3),
+                   quorum=d.get("quorum", DEFAULT_QUORUM))
+
+@dataclass
+class WhatIfResult:
+    name: str
+    samples: int
+    bad_samples: int
+    bad_windows: int  # Ws windows whose Wl context was judged bad
+    episodes: int
+    episodes_by_verdict: Dict[str, int]
+    verdicts: Dict[str, int]  # verdict of each bad window
+    flag_counts: Dict[str, int]  # samples raising each flag
+
+@dataclass
+class ReplayHistory:
+    ts: array
+    cols: Dict[str, array]  # BASELINE_FIELDS columns, NaN = missing
+    wid: array  # ordinal of the observed Ws window each sample belongs to
+    # Per Ws window: its first sample (where the live engine recognizes) and the first sample
+    # of that sample's Wl context (WindowAggregator.context("Wl"))
+    judge_at: array
+    ctx_start: array
+    opaque: array  # 1 = no referenced change event explains the sample's window
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_samples(cls, metrics: Sequence[MetricSample], events: Iterable[ChangeEventCard] = (),
+                     lookback_sec: float = DEFAULT_LOOKBACK_SEC,
+                     windowing: Optional[Windowing] = None) -> "ReplayHistory":
+        ms = sorted(metrics, key=lambda m: m.ts)
+        nan = float("nan")
+        ts = array("d", (m.ts for m in ms))
+        cols = {f: array("d", (nan if getattr(m, f) is None else float(getattr(m, f)) for m in ms))
+                for f in BASELINE_FIELDS}
+        policy = (windowing or Windowing()).policy
+        step = policy.ws_sec
+        wid, last, n = array("l"), None, -1
+        for t in ts:
+            b = int(t // step)
+            if b != last:
+                last, n = b, n + 1
+            wid.append(n)
+        judge_at, ctx_start = cls._contexts(ts, policy.ws_sec, policy.wl_sec)
+        # Sort-merge: latest change event in [window start - lookback, window end) per sample
+        obs = ObservabilityChecker()
+        evs = sorted(events, key=lambda e: e.event_time)
+        ev_opaque = [obs.check_event(e).opaque_risk for e in evs]
+        opaque = array("B", bytes(len(ts)))
+        hi = 0
+        for i, t in enumerate(ts):
+            start = (t // step) * step
+            while hi < len(evs) and evs[hi].event_time < start + step:
+                hi += 1
+            if hi and evs[hi - 1].event_time >= start - lookback_sec:
+                opaque[i] = ev_opaque[hi - 1]
+            else:
+                opaque[i] = 1
+        return cls(ts=ts, cols=cols, wid=wid, judge_at=judge_at, ctx_start=ctx_start, opaque=opaque)
+
+    @staticmethod
+    def _contexts(ts: array, ws_sec: float, wl_sec: float, min_samples: int = 3):
+        # The open Wl window, merged with the preceding one while it has < min_samples samples
+        judge_at, ctx_start = array("l"), array("l")
+        ws = wl = None
+        wl_start = prev_start = -1
+        for i, t in enumerate(ts):
+            b = int(t // wl_sec)
+            if b != wl:
+                prev_start = wl_start if wl is not None and b - wl == 1 else -1
+                wl, wl_start = b, i
+            if int(t // ws_sec) != ws:
+                ws = int(t // ws_sec)
+                judge_at.append(i)
+                merged = i - wl_start + 1 < min_samples and prev_start >= 0
+                ctx_start.append(prev_start if merged else wl_start)
+        return judge_at, ctx_start
+
+    @classmethod
+    def from_records(cls, records, **kw) -> "ReplayHistory":
+        """From replay_adapter records (load_recording())."""
+        return cls.from_samples([r.sample for r in records], [e for r in records for e in r.events], **kw)
+
+_POPCOUNT = [bin(i).count("1") for i in range(256)]
+_POPCOUNT_NP = np.array(_POPCOUNT, dtype=np.uint8) if np is not None else None
+
+def _bad_indices(masks: array, min_flags: int = 2) -> List[int]:
+    # min_flags+ flags, as IncidentDetector.is_bad_mask
+    if np is not None:
+        m = np.frombuffer(masks, dtype=np.uint8)
+        return np.flatnonzero(_POPCOUNT_NP[m] >= min_flags).tolist()
+    return list(compress(range(len(masks)), map(min_flags.__le__, map(_POPCOUNT.__getitem__, masks))))
+
+_FLAG_BIT_TABLES = [bytes(m >> k & 1 for m in range(256)) for k in range(len(FLAG_NAMES))]
+
+def _bad_windows(history: ReplayHistory, masks: array, min_flags: int,
+                 quorum: float) -> Iterator[Tuple[int, int]]:
+    """
+    (sample index, flag mask) of each Ws window whose Wl context WindowStats.judge_mask(quorum)
+    judges bad. The bad count per context is a difference of prefix sums, screened with
+    map / compress; flags are counted (bytes.translate / count) only in the bad contexts.
+    """
+    raw = masks.tobytes()
+    bad_table = bytes(_POPCOUNT[m] >= min_flags for m in range(256))
+    bad = list(accumulate(raw.translate(bad_table), initial=0))
+    judge_at, ctx_start = history.judge_at, history.ctx_start
+    ends = list(map((1).__add__, judge_at))
+    nbads = list(map(sub, map(bad.__getitem__, ends), map(bad.__getitem__, ctx_start)))
+    ns = map(sub, ends, ctx_start)
+    for j in compress(range(len(nbads)), map(le, map(float(quorum).__mul__, ns), nbads)):
+        i, s, nbad = judge_at[j], ctx_start[j], nbads[j]
+        n = i + 1 - s
+        # Flags raised on at least `quorum` of the context's bad samples (of all if none is bad)
+        seg, den = raw[s:i + 1], n
+        if nbad:
+            seg, den = bytes(compress(seg, seg.translate(bad_table))), nbad
+        mask = 0
+        for k, table in enumerate(_FLAG_BIT_TABLES):
+            c = seg.translate(table).count(1)
+            if c and c / den >= quorum:
+                mask |= 1 << k
+        yield i, mask
+
+def evaluate(history: ReplayHistory, cfg: WhatIfConfig) -> WhatIfResult:
+    """One config over the whole history."""
+    det = IncidentDetector(cfg.thresholds)
+    masks = det.flag_masks_columns(history.cols, len(history))
+    table = VerdictClassifier(cfg.classifier).table()
+    shift = len(FLAG_NAMES)
+    opaque, wid = history.opaque, history.wid
+
+    verdicts: Dict[str, int] = {}
+    episodes: Dict[str, int] = {}
+    # Per verdict: (last bad window ordinal, consecutive bad windows, episode open)
+    state: Dict[str, List] = {}
+    bad = _bad_indices(masks, det.min_flags)
+    bad_windows = 0
+    for i, mask in _bad_windows(history, masks, det.min_flags, cfg.quorum):
+        bad_windows += 1
+        v = table[mask | (opaque[i] << shift)][0]
+        verdicts[v] = verdicts.get(v, 0) + 1
+        w = wid[i]
+        st = state.get(v)
+        if st is None:
+            st = state[v] = [w, 1, False]
+        elif w != st[0]:
+            gap = w - st[0] - 1  # windows in between that were not bad for v
+            if gap >= cfg.close_after:
+                st[2] = False
+            st[1] = st[1] + 1 if gap == 0 else 1
+            st[0] = w
+        if not st[2] and st[1] >= cfg.open_after:
+            st[2] = True
+            episodes[v] = episodes.get(v, 0) + 1
+
+    hist = Counter(masks)  # mask -> samples
+    flag_counts = {name: sum(c for mask, c in hist.items() if mask & (1 << b)) for b, name in enumerate(FLAG_NAMES)}
+    return WhatIfResult(name=cfg.name, samples=len(history), bad_samples=len(bad), bad_windows=bad_windows,
+                        episodes=sum(episodes.values()), episodes_by_verdict=episodes,
+                        verdicts=verdicts, flag_counts=flag_counts)
+
+# Worker-side copy of the history, set once per process by the pool initializer
+_WORKER_HISTORY: Optional[ReplayHistory] = None
+
+def _init_worker(history: ReplayHistory) -> None:
+    global _WORKER_HISTORY
+    _WORKER_HISTORY = history
+
+def _evaluate_in_worker(cfg: WhatIfConfig) -> WhatIfResult:
+    return evaluate(_WORKER_HISTORY, cfg)
+
+def sweep(history: ReplayHistory, configs: Sequence[WhatIfConfig],
+          max_workers: Optional[int] = None) -> List[WhatIfResult]:
+    """
+    Evaluate every config; results in config order. max_workers=1 runs inline
+    (no pool), None uses one process per CPU.
+    """
+    if max_workers == 1 or len(configs) <= 1:
+        return [evaluate(history, c) for c in configs]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(history,)) as pool:
+        return list(pool.map(_evaluate_in_worker, configs, chunksize=max(1, len(configs) // 32)))
+
+def threshold_grid(base: DetectorThresholds = DetectorThresholds(), **ranges: Sequence[float]) -> List[WhatIfConfig]:
+    """Cartesian product of threshold values, e.g. threshold_grid(retry_pct=[12, 18, 24], latency_p95_ms=[40, 60])."""
+    keys = list(ranges)
+    out = []
+    for values in itertools.product(*(ranges[k] for k in keys)):
+        th = DetectorThresholds(**{**asdict(base), **dict(zip(keys, values))})
+        name = ",".join(f"{k}={v}" for k, v in zip(keys, values)) or "baseline"
+        out.append(WhatIfConfig(name=name, thresholds=th))
+    return out
+
+def main():
+    from .adapters.replay_adapter import load_recording
+    ap = argparse.ArgumentParser(description="DAE P1 what-if replay over a recorded history")
+    ap.add_argument("recording", help="ndjson / csv / bundle JSON (see adapters.replay_adapter)")
+    ap.add_argument("--configs", help="JSON list of WhatIfConfig dicts (default: baseline only)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", help="Output JSON path (optional)")
+    args = ap.parse_args()
+    history = ReplayHistory.from_records(load_recording(args.recording))
+    if args.configs:
+        with open(args.configs, "r", encoding="utf-8") as f:
+            configs = [WhatIfConfig.from_dict(d) for d in json.load(f)]
+    else:
+        configs = [WhatIfConfig(name="baseline")]
+    out = [asdict(r) for r in sweep(history, configs, args.workers)]
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(out, f, ensure_ascii=False, indent=2)
+        print(args.out)
+    else:
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
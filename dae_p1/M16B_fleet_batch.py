@@ -0,0 +1,154 @@
+"""
+Fleet batch: the latest recognition inputs of N devices as columns, for
+RecognitionEngine.recognize_batch().
+
+Per device: the judged Wl window aggregate (M07E WindowStats: ref, start, sample / bad
+counts and per-flag fractions; means and p95s are not carried), the Ws ref of its latest sample, the observability of its latest
+in-lookback change event as a missing-refs bitmask (M06 missing_mask; -1 = no event),
+and the change-point onset if any. Built from hosted OBHCoreService instances
+(from_cores), from WindowStats objects (from_windows), or from the JSON column form
+agents post to the fleet endpoint (from_dict / to_dict).
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from .M00_common import ChangeEventCard
+from .M06_observability_checker import ObservabilityChecker
+from .M07_incident_detector import FLAG_NAMES
+from .M07E_window_aggregates import WindowStats
+
+NO_EVENT = -1
+
+def _flag_cols() -> Dict[str, array]:
+    return {f: array("d") for f in FLAG_NAMES}
+
+def _ref_start(window_ref: str) -> float:
+    """Window start from an M01 window ref ("Wl:600" -> 600.0); 0.0 if it has none."""
+    try:
+        return float(window_ref.split(":", 1)[1])
+    except (IndexError, ValueError):
+        return 0.0
+
+@dataclass
+class FleetBatch:
+    device_id: List[str] = field(default_factory=list)
+    window_ref: List[str] = field(default_factory=list)  # judged Wl window
+    start: array = field(default_factory=lambda: array("d"))  # its start ts
+    ws_ref: List[str] = field(default_factory=list)  # Ws window of the latest sample
+    samples: array = field(default_factory=lambda: array("q"))
+    bad: array = field(default_factory=lambda: array("q"))
+    flag_frac: Dict[str, array] = field(default_factory=_flag_cols)  # of all samples
+    bad_flag_frac: Dict[str, array] = field(default_factory=_flag_cols)  # of the bad samples
+    obs_mask: array = field(default_factory=lambda: array("b"))  # missing refs; NO_EVENT = none
+    origin_hint: List[str] = field(default_factory=list)
+    change_ref: List[Optional[str]] = field(default_factory=list)
+    onset_ts: array = field(default_factory=lambda: array("d"))  # NaN = no onset
+    onset_ref: List[Optional[str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.device_id)
+
+    def append(self, device_id: str, window: WindowStats, ws_ref: str,
+               event: Optional[ChangeEventCard] = None, onset: Optional[Tuple[float, str]] = None,
+               checker: ObservabilityChecker = ObservabilityChecker()) -> None:
+        self.device_id.append(device_id)
+        self.window_ref.append(window.window_ref)
+        self.start.append(window.start)
+        self.ws_ref.append(ws_ref)
+        self.samples.append(window.samples)
+        self.bad.append(window.bad)
+        for f in FLAG_NAMES:
+            self.flag_frac[f].append(window.flag_frac.get(f, 0.0))
+            self.bad_flag_frac[f].append(window.bad_flag_frac.get(f, 0.0))
+        if event is None:
+            self.obs_mask.append(NO_EVENT)
+            self.origin_hint.append("unknown")
+            self.change_ref.append(None)
+        else:
+            self.obs_mask.append(checker.missing_mask(event))
+            self.origin_hint.append(event.origin_hint or "unknown")
+            self.change_ref.append(event.change_ref)
+        self.onset_ts.append(onset[0] if onset else float("nan"))
+        self.onset_ref.append(onset[1] if onset else None)
+
+    def window_stats(self) -> List[Dict[str, Any]]:
+        """WindowStats.to_dict() of every row's window (empty mean / p95), built column-wise."""
+        n = len(self)
+        fracs: List[Dict[str, float]] = [{} for _ in range(n)]
+        bad_fracs: List[Dict[str, float]] = [{} for _ in range(n)]
+        for f in FLAG_NAMES:
+            for out, col in ((fracs, self.flag_frac[f]), (bad_fracs, self.bad_flag_frac[f])):
+                for i, v in enumerate(col):
+                    if v:
+                        out[i][f] = v
+        return [{"window_ref": ref, "start": st, "samples": n_, "bad": b, "mean": {}, "p95": {},
+                 "flag_frac": fr, "bad_flag_frac": bfr, "bad_frac": b / n_ if n_ else 0.0}
+                for ref, st, n_, b, fr, bfr in zip(self.window_ref, self.start, self.samples, self.bad,
+                                                   fracs, bad_fracs)]
+
+    @classmethod
+    def from_windows(cls, device_ids: Sequence[str], windows: Sequence[WindowStats], ws_refs: Sequence[str],
+                     events: Optional[Sequence[Optional[ChangeEventCard]]] = None) -> "FleetBatch":
+        b = cls()
+        for i, (dev, w, ref) in enumerate(zip(device_ids, windows, ws_refs)):
+            b.append(dev, w, ref, events[i] if events is not None else None)
+        return b
+
+    @classmethod
+    def from_cores(cls, cores: Mapping[str, Any]) -> "FleetBatch":
+        """From hosted OBHCoreService instances (device_id -> core); devices without samples are skipped."""
+        b = cls()
+        for dev, core in cores.items():
+            latest = core.metrics_buf.last()
+            window = core.aggregates.context("Wl")
+            if latest is None or window is None:
+                continue
+            evs = core.event_index.for_window(latest.ts, core.recognition.event_lookback_sec)
+            onset = core.recognition.changepoints.earliest_onset()
+            b.append(dev, window, latest.window_ref, evs[-1] if evs else None,
+                     (onset.onset_ts, onset.onset_window_ref) if onset else None)
+        return b
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "device_id": self.device_id, "window_ref": self.window_ref, "start": self.start.tolist(),
+            "ws_ref": self.ws_ref,
+            "samples": self.samples.tolist(), "bad": self.bad.tolist(),
+            "flag_frac": {f: c.tolist() for f, c in self.flag_frac.items()},
+            "bad_flag_frac": {f: c.tolist() for f, c in self.bad_flag_frac.items()},
+            "obs_mask": self.obs_mask.tolist(), "origin_hint": self.origin_hint, "change_ref": self.change_ref,
+            "onset_ts": [None if t != t else t for t in self.onset_ts], "onset_ref": self.onset_ref,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "FleetBatch":
+        """
+        Inverse of to_dict(). device_id, window_ref, samples and bad are required;
+        missing flag columns are 0, missing observability means no change event,
+        a missing start is read from the window ref.
+        """
+        for k in ("device_id", "window_ref", "samples", "bad"):
+            if k not in d:
+                raise ValueError(f"missing column {k!r}")
+        n = len(d["device_id"])
+        nan = float("nan")
+        def col(name, default, src=d):
+            v = src.get(name)
+            if v is not None and len(v) != n:
+                raise ValueError(f"column {name!r} has {len(v)} rows, expected {n}")
+            return v if v is not None else [default] * n
+        flags, bad_flags = d.get("flag_frac") or {}, d.get("bad_flag_frac") or {}
+        refs = list(col("window_ref", ""))
+        return cls(
+            device_id=list(d["device_id"]), window_ref=refs,
+            start=array("d", (_ref_start(r) if t is None else t for r, t in zip(refs, col("start", None)))),
+            ws_ref=list(col("ws_ref", "")),
+            samples=array("q", col("samples", 0)), bad=array("q", col("bad", 0)),
+            flag_frac={f: array("d", col(f, 0.0, flags)) for f in FLAG_NAMES},
+            bad_flag_frac={f: array("d", col(f, 0.0, bad_flags)) for f in FLAG_NAMES},
+            obs_mask=array("b", col("obs_mask", NO_EVENT)), origin_hint=list(col("origin_hint", "unknown")),
+            change_ref=list(col("change_ref", None)),
+            onset_ts=array("d", (nan if t is None else t for t in col("onset_ts", None))),
+            onset_ref=list(col("onset_ref", None)),
+        )
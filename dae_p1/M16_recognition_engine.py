@@ -1,45 +1,170 @@
 
-from __future__ import annotations
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+from typing import List, Optional, Sequence
 from .M00_common import MetricSample, EpisodeRecognition, ObservabilityResult
-from .M07_incident_detector import IncidentDetector
+from .M07_incident_detector import FLAG_BITS, FLAG_NAMES, IncidentDetector, as_flag
+from .M07B_change_point import ChangePointDetector
+from .M07E_window_aggregates import DEFAULT_QUORUM, WindowStats
 from .M08_verdict_classifier import VerdictClassifier
-from .M09_episode_manager import EpisodeManager
+from .M09_episode_manager import EpisodeManager, EvidenceRef, render_evidence
 from .M06_observability_checker import ObservabilityChecker
-from .M00_common import iso
+from .M06A_event_index import DEFAULT_LOOKBACK_SEC
+from .M16B_fleet_batch import NO_EVENT, FleetBatch
+from .M00_common import iso, now_ts, sha256_str
+
+try:
+    import numpy as np  # optional: vectorized batch recognition
+except ImportError:
+    np = None
 
 class RecognitionEngine:
     """
     Produces incident recognition: episode id, verdict, confidence, evidence refs, and observability status.
     """
-    def __init__(self):
-        self.detector = IncidentDetector()
-        self.classifier = VerdictClassifier()
-        self.episodes = EpisodeManager()
+    def __init__(self, detector: Optional[IncidentDetector] = None, store=None,
+                 classifier: Optional[VerdictClassifier] = None):
+        self.detector = detector or IncidentDetector()
+        self.classifier = classifier or VerdictClassifier()
+        # Closed episodes are archived to `store` (M09A EpisodeStore) when given
+        self.episodes = EpisodeManager(store=store)
         self.obs = ObservabilityChecker()
+        # Callers pass only change events from this long before the sample's Ws window (M06A)
+        self.event_lookback_sec = DEFAULT_LOOKBACK_SEC
+        # Fed once per sample by OBHCoreService.ingest(); marks degradation onsets
+        self.changepoints = ChangePointDetector()
+        # Share of a window's samples a flag / badness needs to count for the window (M07E)
+        self.window_quorum = DEFAULT_QUORUM
+
+    def track(self, m: MetricSample, wl_ref: str) -> float:
+        """Per-sample worst-window bookkeeping (called from ingest); returns the sample's severity."""
+        sev = self.detector.severity(m)
+        self.episodes.track(wl_ref, m.ts, sev)
+        return sev
 
     def recognize(self, latest_metric: MetricSample,
                   recent_change_events: List,
-                  worst_window_ref: str) -> EpisodeRecognition:
-        is_bad, flags = self.detector.is_bad_window(latest_metric)
+                  worst_window_ref: str, window: Optional[WindowStats] = None) -> EpisodeRecognition:
+        """
+        Judges `window` (the core passes its incrementally kept Wl aggregate, M07E) when given:
+        bad / flags by quorum over the window's samples, so one noisy sample cannot flip
+        the verdict. Without it, falls back to judging latest_metric alone.
+        """
+        if window is not None and window.samples:
+            is_bad, flags = window.judge_mask(self.window_quorum)
+        else:
+            is_bad, flags = self.detector.judge(latest_metric)
 
+        change_ref = None
         if recent_change_events:
             obs_res = self.obs.check_event(recent_change_events[-1])
             opaque = obs_res.opaque_risk
+            change_ref = recent_change_events[-1].change_ref
         else:
             obs_res = self.obs.check_no_change_event()
             opaque = True
 
         verdict, conf = self.classifier.classify(flags, opaque_risk=opaque)
-        evidence_ref = f"{latest_metric.window_ref}:{','.join(flags) if flags else 'no_flags'}"
-        ep = self.episodes.start_or_update(worst_window_ref=worst_window_ref, evidence_ref=evidence_ref)
+        evidence_ref = (latest_metric.window_ref, flags)  # rendered by the episode's EvidenceRing
+        onset = self.changepoints.earliest_onset()
+        t = now_ts()
+        return self._assemble(self.episodes, latest_metric.window_ref, is_bad, verdict, conf, evidence_ref,
+                              worst_window_ref, obs_res, change_ref,
+                              onset.onset_ts if onset else None, onset.onset_window_ref if onset else None,
+                              f"ep-{sha256_str(str(t))[:12]}", t,
+                              window.to_dict() if window is not None else None)
+
+    def _assemble(self, episodes: Optional[EpisodeManager], ws_ref: str, is_bad: bool, verdict: str,
+                  conf: float, evidence_ref: EvidenceRef, worst_window_ref: str, obs_res: ObservabilityResult,
+                  change_ref: Optional[str], onset_ts: Optional[float], onset_ref: Optional[str],
+                  adhoc_id: str, now: float, window_stats=None) -> EpisodeRecognition:
+        """Episode bookkeeping (when an EpisodeManager is given) and the EpisodeRecognition."""
+        ep = None
+        if episodes is not None:
+            ep = episodes.observe(ws_ref, is_bad, verdict, evidence_ref, worst_window_ref, start_ts=onset_ts,
+                                  confidence=conf, change_ref=change_ref)
+            if ep is None:
+                # Not bad for this verdict: report the episode still closing, if any
+                ep = episodes.current
+        if ep is not None:
+            episode_id, episode_start = ep.episode_id, ep.start_ts
+            worst, evidence_refs = ep.worst.worst_ref() or ep.worst_window_ref, ep.evidence.refs(10)
+            worst_windows = ep.worst.ranked()
+        else:
+            # No open episode: ad-hoc id so OBH exports still have one
+            episode_id, episode_start = adhoc_id, now if onset_ts is None else onset_ts
+            worst_windows = episodes.windows.ranked() if episodes is not None else []
+            worst = worst_windows[0][0] if worst_windows else worst_window_ref
+            evidence_refs = [render_evidence(evidence_ref)]
 
         return EpisodeRecognition(
-            episode_id=ep.episode_id,
-            episode_start=ep.start_ts,
-            worst_window_ref=ep.worst_window_ref,
+            episode_id=episode_id,
+            episode_start=episode_start,
+            worst_window_ref=worst,
             primary_verdict=verdict,
             confidence=conf,
-            evidence_refs=ep.evidence_refs[-10:],  # cap
-            observability=obs_res
+            evidence_refs=evidence_refs,
+            observability=obs_res,
+            onset_window_ref=onset_ref,
+            worst_windows=[{"window_ref": ref, "severity": sc} for ref, sc in worst_windows],
+            window_stats=window_stats
         )
+
+    def recognize_batch(self, batch: FleetBatch,
+                        episodes: Optional[Sequence[Optional[EpisodeManager]]] = None,
+                        window_stats: bool = False) -> List[EpisodeRecognition]:
+        """
+        Recognition for N devices in one call, one result per batch row (M16B FleetBatch).
+        Window judgement (quorum over each device's Wl aggregate, as recognize()), flag masks,
+        opaque bits and the verdict table lookup are computed column-wise; NumPy when available.
+        episodes: per-device EpisodeManager (e.g. each hosted core's) to update; without it the
+        call is stateless and episode ids are derived from device id + window ref.
+        window_stats: attach each row's window aggregate (FleetBatch.window_stats(), a dict per
+        row) as recognize() does; off by default, it costs more than the recognition itself.
+        Rows with the same (obs mask, origin) share one ObservabilityResult.
+        """
+        n = len(batch)
+        q, shift = self.window_quorum, len(FLAG_NAMES)
+        if np is not None and n:
+            samples = np.frombuffer(batch.samples, dtype=np.int64)
+            bad = np.frombuffer(batch.bad, dtype=np.int64)
+            is_bad_col = (samples > 0) & (bad >= q * samples)
+            has_bad = bad > 0
+            masks = np.zeros(n, dtype=np.int64)
+            for f in FLAG_NAMES:
+                frac = np.where(has_bad, np.frombuffer(batch.bad_flag_frac[f]), np.frombuffer(batch.flag_frac[f]))
+                masks |= np.where(frac >= q, FLAG_BITS[f], 0)
+            opaque = np.frombuffer(batch.obs_mask, dtype=np.int8) != 0  # NO_EVENT or missing refs
+            idx = (masks | (opaque.astype(np.int64) << shift)).tolist()
+            masks = masks.tolist()
+            is_bad_col = is_bad_col.tolist()
+        else:
+            is_bad_col = [s > 0 and b >= q * s for s, b in zip(batch.samples, batch.bad)]
+            masks = [0] * n
+            for f in FLAG_NAMES:
+                bit = FLAG_BITS[f]
+                for i, (b, bf, af) in enumerate(zip(batch.bad, batch.bad_flag_frac[f], batch.flag_frac[f])):
+                    if (bf if b else af) >= q:
+                        masks[i] |= bit
+            idx = [m | ((o != 0) << shift) for m, o in zip(masks, batch.obs_mask)]
+
+        table = self.classifier.table()
+        stats = batch.window_stats() if window_stats else None
+        obs_cache: Dict[Tuple[int, str], ObservabilityResult] = {}
+        t = now_ts()
+        out: List[EpisodeRecognition] = []
+        for i in range(n):
+            k = idx[i]
+            verdict, conf = table[k]
+            om, origin = batch.obs_mask[i], batch.origin_hint[i]
+            obs_res = obs_cache.get((om, origin))
+            if obs_res is None:
+                obs_res = obs_cache[om, origin] = (self.obs.check_no_change_event() if om == NO_EVENT
+                                                   else self.obs.from_missing_mask(om, origin))
+            ws_ref, wl_ref, dev = batch.ws_ref[i], batch.window_ref[i], batch.device_id[i]
+            onset_ts = batch.onset_ts[i]
+            out.append(self._assemble(
+                episodes[i] if episodes is not None else None, ws_ref, is_bad_col[i], verdict, conf,
+                (ws_ref, as_flag(masks[i])), wl_ref, obs_res, batch.change_ref[i],
+                None if onset_ts != onset_ts else onset_ts, batch.onset_ref[i],
+                f"ep-{sha256_str(dev + ':' + wl_ref)[:12]}", t, stats[i] if stats is not None else None))
+        return out
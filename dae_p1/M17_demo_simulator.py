@@ -1,6 +1,6 @@
 
 from __future__ import annotations
-import random, time
+import random, time, zlib
 from typing import Tuple, List, Dict
 from .M01_windowing import Windowing
 from .M03_metrics_collector import MetricsCollector
@@ -12,7 +12,8 @@ def _clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
 
 def generate_scenario(name: str, seconds: int = 900, seed: int = 7) -> List[Dict]:
-    random.seed(seed + hash(name) % 1000)
+    # crc32, not hash(): str hashes are salted per process, which made scenarios differ run to run
+    random.seed(seed + zlib.crc32(name.encode()) % 1000)
     out: List[Dict] = []
 
     # Baselines
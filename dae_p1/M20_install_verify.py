@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
 import statistics
 from .M00_common import MetricSample
+from .M07D_rule_engine import RuleSet, default_rules
 
 @dataclass
 class InstallVerificationResult:
@@ -26,20 +27,8 @@ class InstallVerificationResult:
 
 DEFAULT_VERIFY_WINDOW_SEC = 180  # 3 minutes
 
-# Define Criteria
-THRESHOLDS = {
-    # Performance
-    "latency_max_ms": 60.0,
-    "loss_max_pct": 1.0,
-    "retry_max_pct": 12.0,
-    "airtime_max_pct": 75.0,
-    "mesh_flap_max": 2,
-    "signal_min_pct": 80,
-    
-    # Connectivity
-    "dns_must_be": "OK",
-    "link_rate_min_mbps": 100
-}
+# Criteria, from the "install_verify" rule section (M07D; configs/rules_v1.yaml)
+THRESHOLDS = default_rules().install_verify.thresholds()
 
 def _mean(vals: List[float]) -> Optional[float]:
     if not vals:
@@ -64,13 +53,17 @@ def _vec(samples: List[MetricSample]) -> Dict[str, float]:
 def verify_install(samples: List[MetricSample],
                    verify_window_sec: int = DEFAULT_VERIFY_WINDOW_SEC,
                    window_refs: Optional[Dict[str, str]] = None,
-                   buffer_stats: Optional[Dict[str, int]] = None) -> InstallVerificationResult:
+                   buffer_stats: Optional[Dict[str, int]] = None,
+                   rules: Optional[RuleSet] = None) -> InstallVerificationResult:
     """
     Installation Verification (fp_recognition):
     - Uses the last verify_window_sec worth of MetricSample items.
     - Outputs PASS/MARGINAL/FAIL without prescribing remediation.
     - INCLUDES: Thresholds, System Info (DNS/Wifi), and Internals (C01/C06).
+    - Verdict: first matching "install_verify" rule (rules, default: default_rules()).
     """
+    table = (rules or default_rules()).install_verify
+    thresholds = table.thresholds()
     
     # Default Internals if not provided
     internals = {
@@ -81,7 +74,7 @@ def verify_install(samples: List[MetricSample],
     if not samples:
         return InstallVerificationResult(
             verify_window_sec, 0, "FAIL", "not_ready", "UNKNOWN", 0.0, {},
-            thresholds=THRESHOLDS,
+            thresholds=thresholds,
             system_info={},
             internal_health=internals
         )
@@ -102,14 +95,6 @@ def verify_install(samples: List[MetricSample],
     # 1. Performance Vector
     v = _vec(window)
 
-    latency = v.get("latency_p95_ms", 0.0)
-    loss = v.get("loss_pct", 0.0)
-    retry = v.get("retry_pct", 0.0)
-    airtime = v.get("airtime_busy_pct", 0.0)
-    flap = v.get("mesh_flap_count", 0.0)
-    sinr = v.get("wan_sinr_db", None)
-    signal = v.get("signal_strength_pct", 0.0)
-
     # 2. Extract System Info (from latest sample)
     last = samples[-1]
     
@@ -127,63 +112,13 @@ def verify_install(samples: List[MetricSample],
         "phy_rx_rate_mbps": get_last("phy_rx_rate_mbps", 0)
     }
 
-    # 3. Verdict Logic
-    dominant = "UNKNOWN"
-    verdict = "MARGINAL" # Start neutral
-
-    # Check Hard Failures
-    is_fail = False
-    
-    # WAN
-    if sinr is not None and sinr < 5:
-        dominant = "WAN"
-        is_fail = True
-    elif sys_info["dns_status"] == "FAIL":
-        dominant = "WAN (DNS)"
-        is_fail = True
-        
-    # MESH
-    elif flap >= THRESHOLDS["mesh_flap_max"]:
-        dominant = "MESH"
-        is_fail = True
-        
-    # WIFI
-    elif airtime >= THRESHOLDS["airtime_max_pct"]:
-        dominant = "WIFI (Congestion)"
-        is_fail = True
-    elif retry >= THRESHOLDS["retry_max_pct"]:
-        dominant = "WIFI (Noise)"
-        is_fail = True
-    elif signal < THRESHOLDS["signal_min_pct"]:
-        dominant = "WIFI (Coverage)"
-        is_fail = True
-    elif sys_info["phy_rate_mbps"] > 0 and sys_info["phy_rate_mbps"] < THRESHOLDS["link_rate_min_mbps"]:
-         dominant = "WIFI (Link Speed)"
-         is_fail = True
-    
-    # LATENCY/LOSS (Could be any)
-    elif loss > THRESHOLDS["loss_max_pct"]:
-        dominant = "OPAQUE (Loss)"
-        is_fail = True
-    elif latency > THRESHOLDS["latency_max_ms"]:
-        dominant = "OPAQUE (Latency)"
-        is_fail = True
-
-    # Assign Verdict
-    if is_fail:
-        verdict = "FAIL"
-        conf = 0.8
-    else:
-        # Check Pass Criteria (Strict)
-        if (loss <= THRESHOLDS["loss_max_pct"] and 
-            latency <= THRESHOLDS["latency_max_ms"] and 
-            retry <= THRESHOLDS["retry_max_pct"] and 
-            flap < THRESHOLDS["mesh_flap_max"]):
-            verdict = "PASS"
-            conf = 0.85
-        else:
-            verdict = "MARGINAL"
-            conf = 0.6
+    # 3. Verdict Logic: flags over the mean vector plus the latest DNS status / PHY rate
+    # (missing means default per rule: 0 for performance metrics, no check for WAN SINR)
+    rule = table.decide(table.mask({**v, "dns_status": sys_info["dns_status"],
+                                    "phy_rate_mbps": sys_info["phy_rate_mbps"]}))
+    verdict = rule.outcome
+    dominant = rule.attrs.get("dominant", "UNKNOWN")
+    conf = rule.confidence
 
     # Boost confidence with more data
     if len(window) >= 18:
@@ -197,7 +132,7 @@ def verify_install(samples: List[MetricSample],
         dominant_factor=dominant,
         confidence=conf,
         fp_vector=v,
-        thresholds=THRESHOLDS,
+        thresholds=thresholds,
         system_info=sys_info,
         internal_health=internals
     )
@@ -2,8 +2,11 @@
 from __future__ import annotations
 from typing import List, Tuple
 from .base_adapter import DomainAdapter
-from .platform_access_stub import read_wifi_metric, read_wan_metric, read_docsis_metric, read_event_stream
-from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, VersionRefs
+from .platform_access_stub import BulkMetricReader, read_event_stream
+from .event_ingest import EventClassTable, EventIngestor
+from .probe_runner import ProbeRunner
+from .rate_engine import CounterRateEngine
+from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, VersionRefs, now_ts
 from ..M01_windowing import Windowing
 from ..M04_change_event_logger import ChangeEventLogger
 from ..M05_snapshot_manager import SnapshotManager
@@ -18,35 +21,54 @@ class DOCSISAdapter(DomainAdapter):
       - wan rtt/loss to CMTS/edge
       - wifi retry/airtime for in-home symptoms
     """
+    REQUIRED_PARAMS = {
+        "wan": ("rtt_p95_ms", "loss_pct"),
+        "wifi": ("retry_pct", "airtime_busy_pct", "mesh_flap_count"),
+        "docsis": ("rx_mer_db", "corrected_codewords", "uncorrectable_codewords", "t3_timeouts", "t4_timeouts"),
+    }
+    # Event types that get a scoped pre-change snapshot reference
+    EVENT_TABLE = EventClassTable("docsis", ("cm_reset", "partial_service", "profile_change", "rf_param_change", "policy_update", "config_change"))
+    # Derived features (core_service.DERIVED_FEATURES) sourced from fields this adapter fills:
+    # wan rtt/loss are measured to the CMTS, and wan_sinr_db carries the downstream MER
+    FEATURE_ALIASES = {"us_rtt_ms": "latency_p95_ms", "us_loss_pct": "loss_pct", "ofdm_mer": "wan_sinr_db"}
+    # DOCS-IF-MIB codeword/timeout counters are Counter32
+    COUNTERS = ("corrected_codewords", "uncorrectable_codewords", "t3_timeouts", "t4_timeouts")
+
     def __init__(self, version_refs: VersionRefs = VersionRefs(fw="unknown", driver="unknown", agent="dae_p1")):
         self.windowing = Windowing()
         self.collector = MetricsCollector(self.windowing)
         self.event_logger = ChangeEventLogger(self.windowing, version_refs)
         self.snap = SnapshotManager()
+        self.ingestor = EventIngestor(self.EVENT_TABLE, self.windowing, version_refs, self.snap)
+        self.probes = ProbeRunner()
+        self.reader = BulkMetricReader(self.REQUIRED_PARAMS, probes=self.probes)
+        self.rates = CounterRateEngine(default_width=32)
+        for c in self.COUNTERS:
+            self.rates.add_series(c)
 
     def collect_metric_sample(self) -> MetricSample:
         # Map cable access metrics into existing fields without changing core schema.
         # Use wan_sinr_db as a generic "access quality" indicator if desired.
-        access_q = read_docsis_metric("rx_mer_db")
+        v = self.reader.refresh()
+        wan, wifi = v["wan"], v["wifi"]
+        docsis = v["docsis"]
+        access_q = docsis["rx_mer_db"]
+        self.rates.update_many(now_ts(), [docsis[c] for c in self.COUNTERS])
+        t3, t4 = self.rates.delta("t3_timeouts"), self.rates.delta("t4_timeouts")
         return self.collector.collect(
-            latency_p95_ms=read_wan_metric("rtt_p95_ms"),
-            loss_pct=read_wan_metric("loss_pct"),
-            retry_pct=read_wifi_metric("retry_pct"),
-            airtime_busy_pct=read_wifi_metric("airtime_busy_pct"),
-            mesh_flap_count=read_wifi_metric("mesh_flap_count"),
-            wan_sinr_db=access_q  # generic access quality mapping (optional)
+            latency_p95_ms=wan["rtt_p95_ms"],
+            loss_pct=wan["loss_pct"],
+            retry_pct=wifi["retry_pct"],
+            airtime_busy_pct=wifi["airtime_busy_pct"],
+            mesh_flap_count=wifi["mesh_flap_count"],
+            wan_sinr_db=access_q,  # generic access quality mapping (optional)
+            fec_corrected=self.rates.delta("corrected_codewords"),
+            fec_uncorrected=self.rates.delta("uncorrectable_codewords"),
+            t3_t4_count=None if t3 is None and t4 is None else (t3 or 0) + (t4 or 0)
         )
 
     def collect_change_events_and_snapshots(self) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
-        events: List[ChangeEventCard] = []
-        snaps: List[PreChangeSnapshot] = []
-        for e in read_event_stream():
-            etype = e.get("event_type", "unknown")
-            origin = e.get("origin_hint", "unknown")
-            scope = e.get("target_scope", "wan")
-            change_ref = e.get("change_ref")
-            if etype in ("cm_reset", "partial_service", "profile_change", "rf_param_change", "policy_update", "config_change"):
-                snap = self.snap.create_pre_change(scope, e.get("readable_fields", {}))
-                snaps.append(snap)
-            events.append(self.event_logger.record(etype, origin_hint=origin, target_scope=scope, change_ref=change_ref))
-        return events, snaps
+        # Batched: coalesce repeats, classify via EVENT_TABLE, bounded cards per tick
+        # Event reads are not replayed on failure (stale_ok=False)
+        raw = self.probes.run("event_stream", read_event_stream, default=[], stale_ok=False).value
+        return self.ingestor.ingest(raw)
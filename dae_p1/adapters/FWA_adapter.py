@@ -2,7 +2,9 @@
 from __future__ import annotations
 from typing import List, Tuple
 from .base_adapter import DomainAdapter
-from .platform_access_stub import read_wifi_metric, read_wan_metric, read_event_stream
+from .platform_access_stub import BulkMetricReader, read_event_stream
+from .event_ingest import EventClassTable, EventIngestor
+from .probe_runner import ProbeRunner
 from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, VersionRefs
 from ..M01_windowing import Windowing
 from ..M04_change_event_logger import ChangeEventLogger
@@ -17,38 +19,41 @@ class FWAAdapter(DomainAdapter):
       - wan_rtt_p95_ms (map to latency_p95_ms if that's your chosen RTT target)
       - wifi retry/airtime, mesh flap/roam (optional)
     """
+    REQUIRED_PARAMS = {
+        "wan": ("rtt_p95_ms", "loss_pct", "sinr_db", "rsrp_dbm", "reattach_count"),
+        "wifi": ("retry_pct", "airtime_busy_pct", "mesh_flap_count"),
+    }
+    # Event types that get a scoped pre-change snapshot reference
+    EVENT_TABLE = EventClassTable("fwa", ("policy_update", "config_change", "apn_change", "radio_param_change"))
+
     def __init__(self, version_refs: VersionRefs = VersionRefs(fw="unknown", driver="unknown", agent="dae_p1")):
         self.windowing = Windowing()
         self.collector = MetricsCollector(self.windowing)
         self.event_logger = ChangeEventLogger(self.windowing, version_refs)
         self.snap = SnapshotManager()
+        self.ingestor = EventIngestor(self.EVENT_TABLE, self.windowing, version_refs, self.snap)
+        self.probes = ProbeRunner()
+        self.reader = BulkMetricReader(self.REQUIRED_PARAMS, probes=self.probes)
 
     def collect_metric_sample(self) -> MetricSample:
         # Map platform metrics to MetricSample (metadata-only).
+        # One bulk Get per tick for the whole parameter set.
+        v = self.reader.refresh()
+        wan, wifi = v["wan"], v["wifi"]
         return self.collector.collect(
-            latency_p95_ms=read_wan_metric("rtt_p95_ms"),
-            loss_pct=read_wan_metric("loss_pct"),
-            retry_pct=read_wifi_metric("retry_pct"),
-            airtime_busy_pct=read_wifi_metric("airtime_busy_pct"),
+            latency_p95_ms=wan["rtt_p95_ms"],
+            loss_pct=wan["loss_pct"],
+            retry_pct=wifi["retry_pct"],
+            airtime_busy_pct=wifi["airtime_busy_pct"],
             roam_count=None,
-            mesh_flap_count=read_wifi_metric("mesh_flap_count"),
-            wan_sinr_db=read_wan_metric("sinr_db"),
-            wan_rsrp_dbm=read_wan_metric("rsrp_dbm"),
-            wan_reattach_count=read_wan_metric("reattach_count")
+            mesh_flap_count=wifi["mesh_flap_count"],
+            wan_sinr_db=wan["sinr_db"],
+            wan_rsrp_dbm=wan["rsrp_dbm"],
+            wan_reattach_count=wan["reattach_count"]
         )
 
     def collect_change_events_and_snapshots(self) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
-        events: List[ChangeEventCard] = []
-        snaps: List[PreChangeSnapshot] = []
-        for e in read_event_stream():
-            # Example mapping; keep it open-set
-            etype = e.get("event_type", "unknown")
-            origin = e.get("origin_hint", "unknown")
-            scope = e.get("target_scope", "wan")
-            change_ref = e.get("change_ref")
-            # Optional: attach a scoped pre-change snapshot reference for known change types
-            if etype in ("policy_update", "config_change", "apn_change", "radio_param_change"):
-                snap = self.snap.create_pre_change(scope, e.get("readable_fields", {}))
-                snaps.append(snap)
-            events.append(self.event_logger.record(etype, origin_hint=origin, target_scope=scope, change_ref=change_ref))
-        return events, snaps
+        # Batched: coalesce repeats, classify via EVENT_TABLE, bounded cards per tick
+        # Event reads are not replayed on failure (stale_ok=False)
+        raw = self.probes.run("event_stream", read_event_stream, default=[], stale_ok=False).value
+        return self.ingestor.ingest(raw)
@@ -2,8 +2,11 @@
 from __future__ import annotations
 from typing import List, Tuple
 from .base_adapter import DomainAdapter
-from .platform_access_stub import read_wifi_metric, read_wan_metric, read_pon_metric, read_event_stream
-from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, VersionRefs
+from .platform_access_stub import BulkMetricReader, read_event_stream
+from .event_ingest import EventClassTable, EventIngestor
+from .probe_runner import ProbeRunner
+from .rate_engine import CounterRateEngine
+from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, VersionRefs, now_ts
 from ..M01_windowing import Windowing
 from ..M04_change_event_logger import ChangeEventLogger
 from ..M05_snapshot_manager import SnapshotManager
@@ -19,34 +22,48 @@ class PONAdapter(DomainAdapter):
       - wan rtt/loss to BNG/edge
       - wifi retry/airtime for in-home symptoms
     """
+    REQUIRED_PARAMS = {
+        "wan": ("rtt_p95_ms", "loss_pct"),
+        "wifi": ("retry_pct", "airtime_busy_pct", "mesh_flap_count"),
+        "pon": ("optical_rx_power_dbm", "fec_corrected_codewords", "re_register_count"),
+    }
+    # Event types that get a scoped pre-change snapshot reference
+    EVENT_TABLE = EventClassTable("pon", ("los", "lof", "dying_gasp", "re_register", "re_range", "policy_update", "config_change"))
+    COUNTERS = ("fec_corrected_codewords", "re_register_count")
+
     def __init__(self, version_refs: VersionRefs = VersionRefs(fw="unknown", driver="unknown", agent="dae_p1")):
         self.windowing = Windowing()
         self.collector = MetricsCollector(self.windowing)
         self.event_logger = ChangeEventLogger(self.windowing, version_refs)
         self.snap = SnapshotManager()
+        self.ingestor = EventIngestor(self.EVENT_TABLE, self.windowing, version_refs, self.snap)
+        self.probes = ProbeRunner()
+        self.reader = BulkMetricReader(self.REQUIRED_PARAMS, probes=self.probes)
+        self.rates = CounterRateEngine(default_width=64)
+        for c in self.COUNTERS:
+            self.rates.add_series(c)
 
     def collect_metric_sample(self) -> MetricSample:
         # Use wan_sinr_db as generic "access quality" indicator if you want a single boundary axis.
-        access_q = read_pon_metric("optical_rx_power_dbm")
+        v = self.reader.refresh()
+        wan, wifi = v["wan"], v["wifi"]
+        pon = v["pon"]
+        access_q = pon["optical_rx_power_dbm"]
+        self.rates.update_many(now_ts(), [pon[c] for c in self.COUNTERS])
         return self.collector.collect(
-            latency_p95_ms=read_wan_metric("rtt_p95_ms"),
-            loss_pct=read_wan_metric("loss_pct"),
-            retry_pct=read_wifi_metric("retry_pct"),
-            airtime_busy_pct=read_wifi_metric("airtime_busy_pct"),
-            mesh_flap_count=read_wifi_metric("mesh_flap_count"),
-            wan_sinr_db=access_q  # optional generic access quality mapping
+            latency_p95_ms=wan["rtt_p95_ms"],
+            loss_pct=wan["loss_pct"],
+            retry_pct=wifi["retry_pct"],
+            airtime_busy_pct=wifi["airtime_busy_pct"],
+            mesh_flap_count=wifi["mesh_flap_count"],
+            wan_sinr_db=access_q,  # optional generic access quality mapping
+            # re-register/re-range is the PON equivalent of a WAN re-attach
+            wan_reattach_count=self.rates.delta("re_register_count"),
+            fec_corrected=self.rates.delta("fec_corrected_codewords")
         )
 
     def collect_change_events_and_snapshots(self) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
-        events: List[ChangeEventCard] = []
-        snaps: List[PreChangeSnapshot] = []
-        for e in read_event_stream():
-            etype = e.get("event_type", "unknown")
-            origin = e.get("origin_hint", "unknown")
-            scope = e.get("target_scope", "wan")
-            change_ref = e.get("change_ref")
-            if etype in ("los", "lof", "dying_gasp", "re_register", "re_range", "policy_update", "config_change"):
-                snap = self.snap.create_pre_change(scope, e.get("readable_fields", {}))
-                snaps.append(snap)
-            events.append(self.event_logger.record(etype, origin_hint=origin, target_scope=scope, change_ref=change_ref))
-        return events, snaps
+        # Batched: coalesce repeats, classify via EVENT_TABLE, bounded cards per tick
+        # Event reads are not replayed on failure (stale_ok=False)
+        raw = self.probes.run("event_stream", read_event_stream, default=[], stale_ok=False).value
+        return self.ingestor.ingest(raw)
@@ -0,0 +1,107 @@
+"""
+Batched change-event ingestion for high-rate platform event streams.
+
+Per tick, the raw event dicts from read_event_stream() are:
+1. coalesced: identical consecutive events (same type/origin/scope/change_ref)
+   become one ChangeEventCard with `count`;
+2. classified through a per-domain table compiled once (event_type -> needs snapshot);
+3. built in bulk, stamped with the time each run was first seen (not the tick that emits
+   it, so deferred events keep their place for the change-event lookback join);
+4. rate-limited: at most max_cards_per_tick cards leave per tick, the rest wait in a
+   bounded pending queue; overflow is dropped and reported as one "event_overflow" card,
+   so a LOS storm or T3/T4 burst cannot flush the core's events_buf history.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from ..M00_common import ChangeEventCard, PreChangeSnapshot, VersionRefs, now_ts
+from ..M01_windowing import Windowing
+from ..M05_snapshot_manager import SnapshotManager
+
+class EventClassTable:
+    """Compiled event_type classification for one domain."""
+    def __init__(self, domain: str, snapshot_types: Iterable[str], default_scope: str = "wan"):
+        self.domain = domain
+        self.snapshot_types = frozenset(snapshot_types)
+        self.default_scope = default_scope
+
+    def needs_snapshot(self, event_type: str) -> bool:
+        return event_type in self.snapshot_types
+
+# [(event_type, origin_hint, target_scope, change_ref), readable_fields, count, first-seen ts]
+_Run = List[Any]
+
+class EventIngestor:
+    """
+    Turns raw platform event dicts into ChangeEventCards + PreChangeSnapshots in batches.
+    """
+    def __init__(self, table: EventClassTable, windowing: Windowing, version_refs: VersionRefs,
+                 snap: Optional[SnapshotManager] = None, coalesce: bool = True,
+                 max_cards_per_tick: int = 50, max_pending: int = 5000):
+        self.table = table
+        self.windowing = windowing
+        self.version_refs = version_refs
+        self.snap = snap or SnapshotManager()
+        self.coalesce = coalesce
+        self.max_cards_per_tick = max_cards_per_tick
+        self.max_pending = max_pending
+        self._pending: Deque[_Run] = deque()
+        self.stats = {"raw": 0, "cards": 0, "coalesced": 0, "deferred": 0, "dropped": 0}
+        self._dropped_unreported = 0
+
+    def _runs(self, raw: Iterable[Dict[str, Any]], ts: float) -> None:
+        """Append raw events seen at `ts` to the pending queue, merging identical consecutive ones."""
+        pending = self._pending
+        default_scope = self.table.default_scope
+        n = 0
+        for e in raw:
+            n += 1
+            key = (e.get("event_type", "unknown"), e.get("origin_hint", "unknown"),
+                   e.get("target_scope", default_scope), e.get("change_ref"))
+            if self.coalesce and pending and pending[-1][0] == key:
+                pending[-1][2] += 1
+                self.stats["coalesced"] += 1
+                continue
+            if len(pending) >= self.max_pending:
+                self._dropped_unreported += 1
+                self.stats["dropped"] += 1
+                continue
+            pending.append([key, e.get("readable_fields", {}), 1, ts])
+        self.stats["raw"] += n
+
+    def ingest(self, raw: Iterable[Dict[str, Any]]) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
+        ts = now_ts()
+        self._runs(raw, ts)
+        ws = self.windowing.window_ref(ts, "Ws")
+        refs = {ts: ws}
+        vrefs = self.version_refs
+        needs_snapshot = self.table.snapshot_types.__contains__
+        create_snap = self.snap.create_pre_change
+
+        events: List[ChangeEventCard] = []
+        snaps: List[PreChangeSnapshot] = []
+        budget = self.max_cards_per_tick
+        if self._dropped_unreported:
+            budget -= 1
+        pending = self._pending
+        while pending and len(events) < budget:
+            (etype, origin, scope, change_ref), fields, count, seen = pending.popleft()
+            if needs_snapshot(etype):
+                snaps.append(create_snap(scope, fields))
+            ref = refs.get(seen)
+            if ref is None:
+                ref = refs[seen] = self.windowing.window_ref(seen, "Ws")
+            events.append(ChangeEventCard(
+                event_time=seen, event_type=etype, origin_hint=origin, target_scope=scope,
+                change_ref=change_ref, version_refs=vrefs, window_ref=ref, count=count
+            ))
+        if self._dropped_unreported:
+            events.append(ChangeEventCard(
+                event_time=ts, event_type="event_overflow", origin_hint="local",
+                trigger="watchdog", target_scope=self.table.default_scope,
+                version_refs=vrefs, window_ref=ws, count=self._dropped_unreported
+            ))
+            self._dropped_unreported = 0
+        self.stats["cards"] += len(events)
+        self.stats["deferred"] = len(pending)
+        return events, snaps
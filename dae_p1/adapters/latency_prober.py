@@ -0,0 +1,184 @@
+"""
+Concurrent latency prober (TCP connect or UDP echo RTT) for adapters.
+
+Replaces per-tick `ping` subprocesses: every round probes all targets at once on an
+asyncio loop with a per-probe timeout, and keeps a rolling window of RTTs per target.
+Summary statistics map directly onto MetricSample:
+  latency_p95_ms <- p95 RTT, jitter_ms <- mean |delta RTT|, loss_pct <- failed probes.
+
+Run start() to probe on a background thread (adapters then only read the latest stats),
+or run_round() to probe synchronously outside a running event loop (tests, CLI).
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence
+from ..M13_fp_lite import QuantileCalculator
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    host: str
+    port: int
+    proto: str = "tcp"  # "tcp" (connect RTT) | "udp" (echo RTT)
+    name: str = ""
+
+    @property
+    def key(self) -> str:
+        return self.name or f"{self.proto}://{self.host}:{self.port}"
+
+@dataclass
+class LatencyStats:
+    samples: int = 0
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    loss_pct: Optional[float] = None
+
+class _UdpEcho(asyncio.DatagramProtocol):
+    def __init__(self, fut: asyncio.Future):
+        self.fut = fut
+
+    def datagram_received(self, data, addr):
+        if not self.fut.done():
+            self.fut.set_result(data)
+
+    def error_received(self, exc):
+        if not self.fut.done():
+            self.fut.set_exception(exc)
+
+def _stats(rtts: Sequence[Optional[float]]) -> LatencyStats:
+    ok = [r for r in rtts if r is not None]
+    st = LatencyStats(samples=len(rtts))
+    if not rtts:
+        return st
+    st.loss_pct = 100.0 * (len(rtts) - len(ok)) / len(rtts)
+    if ok:
+        st.p50_ms = QuantileCalculator.calculate(ok, 50)
+        st.p95_ms = QuantileCalculator.calculate(ok, 95)
+        st.jitter_ms = (sum(abs(b - a) for a, b in zip(ok, ok[1:])) / (len(ok) - 1)) if len(ok) > 1 else 0.0
+    return st
+
+class LatencyProber:
+    """
+    window: RTT samples kept per target (None entries record lost probes).
+    timeout_sec: per-probe deadline; a timeout or refused/unreachable counts as loss.
+    """
+    def __init__(self, targets: Sequence[ProbeTarget], window: int = 30,
+                 timeout_sec: float = 1.0, interval_sec: float = 1.0):
+        self.targets = list(targets)
+        self.window = window
+        self.timeout_sec = timeout_sec
+        self.interval_sec = interval_sec
+        self._rtts: Dict[str, Deque[Optional[float]]] = {t.key: deque(maxlen=window) for t in self.targets}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- probing ---
+
+    async def _tcp_rtt(self, t: ProbeTarget) -> float:
+        t0 = time.perf_counter()
+        _, writer = await asyncio.open_connection(t.host, t.port)
+        rtt = (time.perf_counter() - t0) * 1000.0
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return rtt
+
+    async def _udp_rtt(self, t: ProbeTarget) -> float:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(lambda: _UdpEcho(fut), remote_addr=(t.host, t.port))
+        try:
+            t0 = time.perf_counter()
+            transport.sendto(b"dae-probe")
+            await fut
+            return (time.perf_counter() - t0) * 1000.0
+        finally:
+            transport.close()
+
+    async def probe_once(self, t: ProbeTarget) -> Optional[float]:
+        """RTT in ms, or None if the probe failed or missed its deadline."""
+        probe = self._udp_rtt(t) if t.proto == "udp" else self._tcp_rtt(t)
+        try:
+            return await asyncio.wait_for(probe, self.timeout_sec)
+        except (asyncio.TimeoutError, OSError):
+            return None
+
+    async def probe_round(self) -> Dict[str, Optional[float]]:
+        """Probe every target concurrently and record the results."""
+        rtts = await asyncio.gather(*(self.probe_once(t) for t in self.targets))
+        out = {t.key: r for t, r in zip(self.targets, rtts)}
+        with self._lock:
+            for k, r in out.items():
+                self._rtts[k].append(r)
+        return out
+
+    def run_round(self) -> Dict[str, Optional[float]]:
+        """Synchronous probe_round(); must not be called from a running event loop."""
+        return asyncio.run(self.probe_round())
+
+    # --- background mode ---
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stop.is_set():
+                t0 = time.monotonic()
+                loop.run_until_complete(self.probe_round())
+                self._stop.wait(max(0.0, self.interval_sec - (time.monotonic() - t0)))
+        finally:
+            loop.close()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="dae-latency-prober")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout_sec + 5)
+            self._thread = None
+
+    # --- results ---
+
+    def stats(self, key: str) -> LatencyStats:
+        with self._lock:
+            rtts = list(self._rtts.get(key, ()))
+        return _stats(rtts)
+
+    def summary(self) -> LatencyStats:
+        """
+        Across targets: p50/p95 over all successful RTTs, loss over all probes,
+        jitter averaged over targets (consecutive deltas within a target only).
+        """
+        with self._lock:
+            per = [list(d) for d in self._rtts.values()]
+        st = _stats([r for rtts in per for r in rtts])
+        jitters = [j for j in (_stats(rtts).jitter_ms for rtts in per) if j is not None]
+        st.jitter_ms = sum(jitters) / len(jitters) if jitters else None
+        return st
+
+    def as_metrics(self) -> Dict[str, Optional[float]]:
+        """MetricSample field mapping."""
+        st = self.summary()
+        return {"latency_p95_ms": st.p95_ms, "jitter_ms": st.jitter_ms, "loss_pct": st.loss_pct}
+
+def parse_targets(spec: str) -> List[ProbeTarget]:
+    """"8.8.8.8:53,udp://192.168.1.1:7" -> [ProbeTarget, ...] (tcp unless prefixed)."""
+    out: List[ProbeTarget] = []
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        proto = "tcp"
+        if "://" in item:
+            proto, item = item.split("://", 1)
+        host, _, port = item.rpartition(":")
+        out.append(ProbeTarget(host=host.strip("[]"), port=int(port), proto=proto))
+    return out
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from .base_adapter import DomainAdapter
+from .rate_engine import CounterRateEngine
+from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot
+from ..M01_windowing import Windowing
+from ..M03_metrics_collector import MetricsCollector
+
+class ProcFile:
+    """
+    Keeps a /proc file descriptor open and re-reads it with os.pread (no reopen per tick).
+    Reads bufsize chunks until a short read, so large files (/proc/net/dev on hosts with
+    hundreds of interfaces) are not truncated. A missing file yields None on read.
+    """
+    def __init__(self, path: str, bufsize: int = 65536):
+        self.path = path
+        self.bufsize = bufsize
+        try:
+            self.fd: Optional[int] = os.open(path, os.O_RDONLY)
+        except OSError:
+            self.fd = None
+
+    def read(self) -> Optional[bytes]:
+        if self.fd is None:
+            return None
+        try:
+            parts, off = [], 0
+            while True:
+                chunk = os.pread(self.fd, self.bufsize, off)
+                parts.append(chunk)
+                off += len(chunk)
+                if len(chunk) < self.bufsize:
+                    return parts[0] if len(parts) == 1 else b"".join(parts)
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def parse_net_dev(raw: bytes) -> Dict[str, Tuple[int, int]]:
+    """/proc/net/dev -> {iface: (rx_bytes, tx_bytes)}"""
+    out: Dict[str, Tuple[int, int]] = {}
+    for line in raw.split(b"\n")[2:]:
+        name, sep, rest = line.partition(b":")
+        if not sep:
+            continue
+        cols = rest.split()
+        if len(cols) < 9:
+            continue
+        out[name.strip().decode()] = (int(cols[0]), int(cols[8]))
+    return out
+
+def parse_stat_cpu(raw: bytes) -> Optional[Tuple[int, int]]:
+    """/proc/stat aggregate cpu line -> (idle_jiffies, total_jiffies). idle includes iowait."""
+    line = raw[:raw.find(b"\n")] if b"\n" in raw else raw
+    cols = line.split()
+    if not cols or cols[0] != b"cpu":
+        return None
+    vals = [int(c) for c in cols[1:]]
+    idle = vals[3] + (vals[4] if len(vals) > 4 else 0)
+    # guest/guest_nice are already included in user/nice
+    total = sum(vals[:8])
+    return idle, total
+
+def parse_meminfo(raw: bytes) -> Optional[float]:
+    """/proc/meminfo -> used memory percent (MemAvailable based)."""
+    total = avail = None
+    for line in raw.split(b"\n"):
+        if line.startswith(b"MemTotal:"):
+            total = int(line.split()[1])
+        elif line.startswith(b"MemAvailable:"):
+            avail = int(line.split()[1])
+        if total is not None and avail is not None:
+            break
+    if not total or avail is None:
+        return None
+    return 100.0 * (1.0 - avail / total)
+
+def parse_wireless(raw: bytes) -> Dict[str, Tuple[float, float]]:
+    """/proc/net/wireless -> {iface: (link_quality, level_dbm)}"""
+    out: Dict[str, Tuple[float, float]] = {}
+    for line in raw.split(b"\n")[2:]:
+        name, sep, rest = line.partition(b":")
+        if not sep:
+            continue
+        cols = rest.split()
+        if len(cols) < 3:
+            continue
+        out[name.strip().decode()] = (float(cols[1].rstrip(b".")), float(cols[2].rstrip(b".")))
+    return out
+
+class LinuxHostAdapter(DomainAdapter):
+    """
+    Linux host adapter reading /proc directly (no psutil, no subprocesses, no regex):
+    - /proc/net/dev      -> in_rate / out_rate (Mbps, per-iface counter deltas via CounterRateEngine)
+    - /proc/stat         -> cpu_load (from jiffy deltas)
+    - /proc/meminfo      -> mem_load
+    - /proc/net/wireless -> signal_strength_pct (link quality / 70)
+    proc_root can point at recorded fixture files for tests.
+    counter_bits: 32 for 32-bit kernels whose net/dev counters wrap at 2**32.
+    """
+    LINK_QUALITY_MAX = 70.0
+    MBPS = 8 / (1024 * 1024)
+
+    def __init__(self, proc_root: str = "/proc", iface: Optional[str] = None,
+                 clock: Callable[[], float] = time.monotonic, counter_bits: int = 64):
+        self.windowing = Windowing()
+        self.collector = MetricsCollector(self.windowing)
+        self.iface = iface
+        self.clock = clock
+        self.net_dev = ProcFile(os.path.join(proc_root, "net", "dev"))
+        self.stat = ProcFile(os.path.join(proc_root, "stat"))
+        self.meminfo = ProcFile(os.path.join(proc_root, "meminfo"))
+        self.wireless = ProcFile(os.path.join(proc_root, "net", "wireless"))
+        self.rates = CounterRateEngine(default_width=counter_bits)
+        self._last_cpu: Optional[Tuple[int, int]] = None
+        self.overrides = {}  # accepted for /simulate/incident compatibility; not applied to host metrics
+
+    def _net_rates(self, now: float) -> Tuple[Optional[float], Optional[float]]:
+        raw = self.net_dev.read()
+        if raw is None:
+            return None, None
+        counters: Dict[str, Optional[int]] = {}
+        for name, (r, t) in parse_net_dev(raw).items():
+            if name == "lo" or (self.iface is not None and name != self.iface):
+                continue
+            for key, v in ((name + ":rx", r), (name + ":tx", t)):
+                if key not in self.rates.index:
+                    self.rates.add_series(key, scale=self.MBPS)
+                counters[key] = v
+        if not counters:
+            return None, None
+        rates = self.rates.update(now, counters)
+        rx = [v for k, v in rates.items() if k.endswith(":rx") and v is not None]
+        tx = [v for k, v in rates.items() if k.endswith(":tx") and v is not None]
+        return (sum(rx) if rx else None), (sum(tx) if tx else None)
+
+    def _signal_pct(self) -> Optional[int]:
+        raw = self.wireless.read()
+        if raw is None:
+            return None
+        w = parse_wireless(raw)
+        if not w:
+            return None
+        q = w[self.iface][0] if self.iface in w else next(iter(w.values()))[0]
+        return int(max(0.0, min(100.0, q * 100.0 / self.LINK_QUALITY_MAX)))
+
+    def collect_metric_sample(self) -> MetricSample:
+        now = self.clock()
+        in_rate, out_rate = self._net_rates(now)
+        raw_stat = self.stat.read()
+        cpu = parse_stat_cpu(raw_stat) if raw_stat is not None else None
+        raw_mem = self.meminfo.read()
+        mem = parse_meminfo(raw_mem) if raw_mem is not None else None
+
+        cpu_load = None
+        if cpu is not None and self._last_cpu is not None:
+            d_total = cpu[1] - self._last_cpu[1]
+            if d_total > 0:
+                cpu_load = 100.0 * (1.0 - (cpu[0] - self._last_cpu[0]) / d_total)
+        self._last_cpu = cpu
+
+        return self.collector.collect(
+            in_rate=in_rate,
+            out_rate=out_rate,
+            cpu_load=cpu_load,
+            mem_load=mem,
+            signal_strength_pct=self._signal_pct()
+        )
+
+    def collect_change_events_and_snapshots(self) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
+        # Host counters carry no change provenance; events come from other sources.
+        return [], []
+
+    def close(self) -> None:
+        for f in (self.net_dev, self.stat, self.meminfo, self.wireless):
+            f.close()
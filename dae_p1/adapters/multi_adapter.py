@@ -0,0 +1,217 @@
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+from .base_adapter import DomainAdapter
+from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, now_ts
+from ..M01_windowing import Windowing
+
+_METRIC_FIELDS = [f.name for f in fields(MetricSample) if f.name not in ("ts", "window_ref")]
+
+MERGE_MODES = ("last", "mean", "max", "min", "sum")
+
+@dataclass
+class ChildSpec:
+    """
+    One source feeding a MultiAdapter.
+    interval_sec: the child's own collection period.
+    fields: MetricSample fields owned by this child (None = every non-None field it reports).
+    """
+    adapter: DomainAdapter
+    interval_sec: float = 1.0
+    fields: Optional[Sequence[str]] = None
+    name: str = ""
+
+class _FieldAcc:
+    __slots__ = ("n", "total", "last", "last_ts", "lo", "hi")
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.last = None
+        self.last_ts = float("-inf")
+        self.lo = None
+        self.hi = None
+
+    def add(self, v, ts: float) -> None:
+        if ts >= self.last_ts:
+            self.last, self.last_ts = v, ts
+        if isinstance(v, (int, float)):
+            self.n += 1
+            self.total += v
+            self.lo = v if self.lo is None or v < self.lo else self.lo
+            self.hi = v if self.hi is None or v > self.hi else self.hi
+
+    def value(self, mode: str):
+        if mode == "last" or self.n == 0:
+            return self.last
+        if mode == "mean":
+            v = self.total / self.n
+            return int(round(v)) if isinstance(self.last, int) else v
+        if mode == "max":
+            return self.hi
+        if mode == "min":
+            return self.lo
+        return type(self.last)(self.total) if isinstance(self.last, int) else self.total
+
+class MultiAdapter(DomainAdapter):
+    """
+    Merges several domain adapters (e.g. WAN from one source, in-home Wi-Fi from another)
+    into one MetricSample per Ws window.
+    - Each child runs on its own thread and schedule (threaded=True), so slow sources overlap.
+    - Partial samples are merged per field with `merge` ("last" default) or per-field overrides.
+    - Fields without an update in the current window carry forward their last value for up to
+      max_carry_windows Ws windows (then None, e.g. when the child died); `provenance` gives each
+      field of the last sample as live | stale:<age>s, as ProbeRunner results do.
+    - Events and snapshots from all children are concatenated in time order.
+    threaded=False polls due children synchronously on each collect (deterministic, for tests).
+    threaded=True waits up to first_poll_sec on the first collect for every child's first poll,
+    so the first sample is not empty. close() stops the child threads.
+    """
+    def __init__(self, children: Sequence[ChildSpec], merge: str = "last",
+                 field_merge: Optional[Dict[str, str]] = None,
+                 windowing: Optional[Windowing] = None, threaded: bool = True,
+                 max_carry_windows: int = 6, first_poll_sec: float = 2.0):
+        for mode in [merge, *(field_merge or {}).values()]:
+            if mode not in MERGE_MODES:
+                raise ValueError(f"unknown merge mode: {mode}")
+        self.children = list(children)
+        self.merge = merge
+        self.field_merge = dict(field_merge or {})
+        self.windowing = windowing or Windowing()
+        self.threaded = threaded
+        self.max_carry_windows = max_carry_windows
+        self.first_poll_sec = first_poll_sec
+        self.provenance: Dict[str, str] = {}  # MetricSample field -> live | stale:<age>s
+        self.overrides = {}  # accepted for /simulate/incident compatibility; children keep their own
+        self.errors: Dict[str, int] = {}
+
+        self._lock = threading.Lock()
+        self._window: Optional[int] = None
+        self._acc: Dict[str, _FieldAcc] = {}
+        self._carry: Dict[str, Tuple[object, float, int]] = {}  # field -> (value, last ts, window)
+        self._events: List[ChangeEventCard] = []
+        self._snaps: List[PreChangeSnapshot] = []
+        self._next_due = [0.0] * len(self.children)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._polled = [threading.Event() for _ in self.children]  # first poll done (ok or not)
+
+    # --- child collection ---
+
+    def _child_name(self, i: int) -> str:
+        return self.children[i].name or f"{type(self.children[i].adapter).__name__}#{i}"
+
+    def _poll_child(self, i: int) -> None:
+        spec = self.children[i]
+        try:
+            m = spec.adapter.collect_metric_sample()
+            evs, snaps = spec.adapter.collect_change_events_and_snapshots()
+        except Exception:
+            name = self._child_name(i)
+            with self._lock:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            self._polled[i].set()
+            return
+        wanted = spec.fields if spec.fields is not None else _METRIC_FIELDS
+        with self._lock:
+            self._roll_window(self._bucket(m.ts))
+            for f in wanted:
+                v = getattr(m, f)
+                if v is not None:
+                    acc = self._acc.get(f)
+                    if acc is None:
+                        acc = self._acc[f] = _FieldAcc()
+                    acc.add(v, m.ts)
+            self._events.extend(evs)
+            self._snaps.extend(snaps)
+        self._polled[i].set()
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.windowing.policy.ws_sec)
+
+    def _roll_window(self, ws: int) -> None:
+        if self._window is not None and ws <= self._window:
+            return  # same window, or a late partial: fold into the current one
+        for f, acc in self._acc.items():
+            self._carry[f] = (acc.value(self.field_merge.get(f, self.merge)), acc.last_ts, self._window)
+        self._acc = {}
+        self._window = ws
+
+    def _run_child(self, i: int) -> None:
+        interval = max(0.001, self.children[i].interval_sec)
+        while not self._stop.is_set():
+            self._poll_child(i)
+            self._stop.wait(interval)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(len(self.children)):
+            t = threading.Thread(target=self._run_child, args=(i,), daemon=True,
+                                 name=f"dae-multi-{self._child_name(i)}")
+            t.start()
+            self._threads.append(t)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+    def close(self) -> None:
+        """Stop the child threads and close children that hold resources."""
+        self.stop()
+        for spec in self.children:
+            close = getattr(spec.adapter, "close", None)
+            if close is not None:
+                close()
+
+    def _wait_first_poll(self) -> None:
+        deadline = time.monotonic() + self.first_poll_sec
+        for ev in self._polled:
+            ev.wait(max(0.0, deadline - time.monotonic()))
+
+    def _poll_due(self) -> None:
+        now = now_ts()
+        for i, spec in enumerate(self.children):
+            if now >= self._next_due[i]:
+                self._poll_child(i)
+                self._next_due[i] = now + spec.interval_sec
+
+    # --- DomainAdapter contract ---
+
+    def collect_metric_sample(self) -> MetricSample:
+        if self.threaded:
+            if not self._threads:
+                self.start()
+                self._wait_first_poll()
+        else:
+            self._poll_due()
+        ts = now_ts()
+        ws = self.windowing.window_ref(ts, "Ws")
+        bucket = self._bucket(ts)
+        vals, prov = {}, {}
+        with self._lock:
+            self._roll_window(bucket)
+            for f, (v, last_ts, w) in list(self._carry.items()):
+                if bucket - w > self.max_carry_windows:
+                    del self._carry[f]  # no update for too long: the source is gone
+                    continue
+                vals[f] = v
+                prov[f] = f"stale:{ts - last_ts:.0f}s"
+            for f, acc in self._acc.items():
+                vals[f] = acc.value(self.field_merge.get(f, self.merge))
+                prov[f] = "live"
+        self.provenance = prov
+        return MetricSample(ts=ts, window_ref=ws, **vals)
+
+    def collect_change_events_and_snapshots(self) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
+        with self._lock:
+            evs, self._events = self._events, []
+            snaps, self._snaps = self._snaps, []
+        evs.sort(key=lambda e: e.event_time)
+        snaps.sort(key=lambda s: s.capture_time)
+        return evs, snaps
@@ -0,0 +1,146 @@
+"""
+netsh wlan interface parser
+
+Single-pass parser for `netsh wlan show interfaces` output.
+Each line is split once at the first (ASCII or full-width) colon and the label is
+resolved through one combined locale table (label -> field), so the cost per line
+is a single dict lookup no matter how many locales are registered.
+Pure Python, no Windows dependency.
+
+Add a locale:
+    register_locale({"Signalstärke": "signal_pct", ...})
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+@dataclass
+class NetshInterfaceInfo:
+    signal_pct: Optional[int] = None
+    channel: Optional[int] = None
+    radio_type: Optional[str] = None
+    band: Optional[str] = None
+    tx_rate_mbps: Optional[int] = None
+    rx_rate_mbps: Optional[int] = None
+    ssid: Optional[str] = None
+    bssid: Optional[str] = None
+    rssi_dbm: Optional[int] = None
+
+# label (as printed by netsh, whitespace-trimmed) -> NetshInterfaceInfo field
+LOCALE_LABELS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "Signal": "signal_pct",
+        "Channel": "channel",
+        "Radio type": "radio_type",
+        "Band": "band",
+        "Transmit rate (Mbps)": "tx_rate_mbps",
+        "Receive rate (Mbps)": "rx_rate_mbps",
+        "SSID": "ssid",
+        "BSSID": "bssid",
+        "AP BSSID": "bssid",
+        "Rssi": "rssi_dbm",
+    },
+    "zh-TW": {
+        "信號": "signal_pct",
+        "訊號": "signal_pct",
+        "頻道": "channel",
+        "通道": "channel",
+        "無線電類型": "radio_type",
+        "無線電波類型": "radio_type",
+        "頻帶": "band",
+        "傳輸速率 (Mbps)": "tx_rate_mbps",
+        "接收速率 (Mbps)": "rx_rate_mbps",
+    },
+    "zh-CN": {
+        "信号": "signal_pct",
+        "频道": "channel",
+        "无线电类型": "radio_type",
+        "频带": "band",
+        "传输速率 (Mbps)": "tx_rate_mbps",
+        "接收速率 (Mbps)": "rx_rate_mbps",
+    },
+    "de": {
+        "Kanal": "channel",
+        "Funktyp": "radio_type",
+        "Übertragungsrate (MBit/s)": "tx_rate_mbps",
+        "Empfangsrate (MBit/s)": "rx_rate_mbps",
+    },
+    "fr": {
+        "Canal": "channel",
+        "Type de radio": "radio_type",
+        "Bande": "band",
+        "Réception (Mbits/s)": "rx_rate_mbps",
+        "Transmission (Mbits/s)": "tx_rate_mbps",
+    },
+}
+
+def _to_int(v: str) -> Optional[int]:
+    v = v.strip().rstrip("%").strip()
+    try:
+        return int(float(v))
+    except ValueError:
+        return None
+
+def _to_str(v: str) -> Optional[str]:
+    v = v.strip()
+    return v or None
+
+_CONVERTERS: Dict[str, Callable[[str], object]] = {
+    "signal_pct": _to_int,
+    "channel": _to_int,
+    "radio_type": _to_str,
+    "band": _to_str,
+    "tx_rate_mbps": _to_int,
+    "rx_rate_mbps": _to_int,
+    "ssid": _to_str,
+    "bssid": _to_str,
+    "rssi_dbm": _to_int,
+}
+
+_label_table: Dict[str, str] = {}
+
+def register_locale(labels: Dict[str, str], name: Optional[str] = None) -> None:
+    """Add localized labels (label -> NetshInterfaceInfo field name)."""
+    for label, fld in labels.items():
+        if fld not in _CONVERTERS:
+            raise ValueError(f"unknown netsh field: {fld}")
+        _label_table[label] = fld
+    if name is not None:
+        LOCALE_LABELS.setdefault(name, {}).update(labels)
+
+for _labels in LOCALE_LABELS.values():
+    register_locale(_labels)
+
+def decode_netsh(raw: bytes) -> str:
+    """UTF-8 first (current Windows consoles), else CP950 lenient."""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeError:
+        return raw.decode("cp950", errors="ignore")
+
+def parse_netsh_interfaces(output: str) -> NetshInterfaceInfo:
+    """
+    Extract all known fields in one pass over the lines.
+    With several interfaces listed, the first value of each field wins.
+    """
+    vals: Dict[str, object] = {}
+    table = _label_table
+    remaining = len(_CONVERTERS)
+    for line in output.splitlines():
+        # "<label> : <value>"; the label never contains a colon, values may (BSSID)
+        i = line.find(":")
+        if i < 0:
+            i = line.find("：")
+            if i < 0:
+                continue
+        fld = table.get(line[:i].strip())
+        if fld is None or fld in vals:
+            continue
+        v = _CONVERTERS[fld](line[i + 1:])
+        if v is None:
+            continue
+        vals[fld] = v
+        remaining -= 1
+        if remaining == 0:
+            break
+    return NetshInterfaceInfo(**vals)
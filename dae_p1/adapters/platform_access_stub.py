@@ -1,4 +1,3 @@
-
 """
 Platform Access Stub
 
@@ -9,22 +8,116 @@ Replace these functions with platform-specific integrations:
 - syslog/telemetry collectors
 
 The adapters in this folder call these stubs to illustrate mapping only.
+
+Bulk reads:
+Each per-name read below is one round trip against a real backend. Adapters
+instead declare their required parameter set once (BulkMetricReader) and issue
+a single bulk Get per tick via read_param_set(). Install a real integration
+with set_backend().
 """
 from __future__ import annotations
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence, Tuple
+import time
+from .probe_runner import ProbeRunner
+
+ParamSet = Dict[str, Tuple[str, ...]]
+
+class PlatformBackend:
+    """
+    Backend contract: one call to get() is one round trip.
+    Paths are "<domain>.<name>" (e.g. "wan.rtt_p95_ms"). Unknown paths map to None.
+    """
+    def get(self, paths: Sequence[str]) -> Dict[str, Optional[float]]:
+        return {p: None for p in paths}
+
+    def events(self) -> list[Dict[str, Any]]:
+        return []
+
+class LocalLatencyBackend(PlatformBackend):
+    """
+    Local stand-in backend with configurable per-call latency.
+    Counts round trips so bulk vs per-name reads can be benchmarked.
+    Raw events queued in `pending_events` are drained by events().
+    """
+    def __init__(self, values: Optional[Dict[str, float]] = None, latency_sec: float = 0.0):
+        self.values = dict(values or {})
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self.pending_events: list[Dict[str, Any]] = []
+
+    def get(self, paths: Sequence[str]) -> Dict[str, Optional[float]]:
+        self.calls += 1
+        if self.latency_sec > 0:
+            time.sleep(self.latency_sec)
+        return {p: self.values.get(p) for p in paths}
+
+    def events(self) -> list[Dict[str, Any]]:
+        evs, self.pending_events = self.pending_events, []
+        return evs
+
+_backend: PlatformBackend = PlatformBackend()
+
+def set_backend(backend: PlatformBackend) -> None:
+    global _backend
+    _backend = backend
+
+def get_backend() -> PlatformBackend:
+    return _backend
+
+def read_metrics(domain: str, names: Sequence[str]) -> Dict[str, Optional[float]]:
+    """Batched read of several parameters of one domain in a single round trip."""
+    res = _backend.get([f"{domain}.{n}" for n in names])
+    return {n: res.get(f"{domain}.{n}") for n in names}
+
+def read_param_set(params: ParamSet) -> Dict[str, Dict[str, Optional[float]]]:
+    """Batched read across domains in a single round trip."""
+    paths = [f"{d}.{n}" for d, names in params.items() for n in names]
+    res = _backend.get(paths)
+    return {d: {n: res.get(f"{d}.{n}") for n in names} for d, names in params.items()}
 
 def read_wifi_metric(name: str) -> Optional[float]:
-    return None
+    return read_metrics("wifi", (name,))[name]
 
 def read_wan_metric(name: str) -> Optional[float]:
-    return None
+    return read_metrics("wan", (name,))[name]
 
 def read_docsis_metric(name: str) -> Optional[float]:
-    return None
+    return read_metrics("docsis", (name,))[name]
 
 def read_pon_metric(name: str) -> Optional[float]:
-    return None
+    return read_metrics("pon", (name,))[name]
 
 def read_event_stream() -> list[Dict[str, Any]]:
     # Return a list of event dicts from platform telemetry/log bridge
-    return []
+    return _backend.events()
+
+class BulkMetricReader:
+    """
+    Holds an adapter's required parameter set (declared once at construction)
+    and caches the result of one bulk Get per tick.
+    max_age_sec: reuse the cached result if it is younger than this (0 = always refresh).
+    probes: optional ProbeRunner bounding the Get with a deadline/circuit breaker;
+    on failure the last good result (or all-None) is served and `source` says which.
+    """
+    def __init__(self, params: ParamSet, max_age_sec: float = 0.0, probes: Optional[ProbeRunner] = None):
+        self.params: ParamSet = {d: tuple(names) for d, names in params.items()}
+        self.max_age_sec = max_age_sec
+        self.probes = probes
+        self.source = "live"
+        self._cache: Dict[str, Dict[str, Optional[float]]] = {}
+        self._cache_ts: Optional[float] = None
+
+    def refresh(self) -> Dict[str, Dict[str, Optional[float]]]:
+        now = time.monotonic()
+        if self._cache_ts is None or now - self._cache_ts >= self.max_age_sec:
+            if self.probes is None:
+                self._cache = read_param_set(self.params)
+            else:
+                empty = {d: {n: None for n in names} for d, names in self.params.items()}
+                res = self.probes.run("platform_get", read_param_set, self.params, default=empty)
+                self._cache, self.source = res.value, res.provenance
+            self._cache_ts = now
+        return self._cache
+
+    def get(self, domain: str, name: str) -> Optional[float]:
+        return self._cache.get(domain, {}).get(name)
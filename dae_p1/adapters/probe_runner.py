@@ -0,0 +1,181 @@
+"""
+Bounded probe execution for adapters.
+
+Every platform probe (subprocess, platform Get, driver query) runs through a ProbeRunner:
+- hard per-probe deadline (the tick waits at most deadline_sec for it);
+- per-probe circuit breaker: after `failure_threshold` consecutive failures the probe is
+  skipped for an exponentially growing back-off, then retried once (half-open);
+- fallback: the last good value (source="stale", with its age) while it is younger than
+  max_stale_sec, else the caller's default (source="default").
+A probe still running from a previous tick is never started twice, so hung probes cannot
+pile up worker threads. Counters are exposed via snapshot() for /modules.
+"""
+from __future__ import annotations
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Sequence
+from ..M13_fp_lite import QuantileCalculator
+
+SOURCE_LIVE = "live"
+SOURCE_STALE = "stale"
+SOURCE_DEFAULT = "default"
+
+@dataclass
+class ProbeResult:
+    value: Any
+    source: str  # live | stale | default
+    age_sec: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def provenance(self) -> str:
+        return f"stale:{self.age_sec:.0f}s" if self.source == SOURCE_STALE else self.source
+
+class CircuitBreaker:
+    """closed -> open (after N consecutive failures) -> half_open (after back-off) -> closed | open."""
+    def __init__(self, failure_threshold: int = 3, backoff_sec: float = 5.0, max_backoff_sec: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opens = 0
+        self._current_backoff = backoff_sec
+        self._open_until = 0.0
+
+    def allow(self, now: float) -> bool:
+        if self.state == "open":
+            if now < self._open_until:
+                return False
+            self.state = "half_open"
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._current_backoff = self.backoff_sec
+
+    def record_failure(self, now: float) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open":
+            self._current_backoff = min(self.max_backoff_sec, self._current_backoff * 2)
+            self._trip(now)
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        self.state = "open"
+        self.opens += 1
+        self._open_until = now + self._current_backoff
+
+class _ProbeState:
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.inflight: Optional[Future] = None
+        self.last_value: Any = None
+        self.last_ok: Optional[float] = None
+        self.last_source = SOURCE_DEFAULT
+        self.latencies_ms: Deque[float] = deque(maxlen=100)
+        self.counters = {"calls": 0, "ok": 0, "failures": 0, "timeouts": 0,
+                         "short_circuited": 0, "busy": 0, "stale_served": 0}
+
+class ProbeRunner:
+    def __init__(self, default_deadline_sec: float = 2.0, max_stale_sec: float = 60.0,
+                 failure_threshold: int = 3, backoff_sec: float = 5.0, max_backoff_sec: float = 120.0,
+                 max_workers: int = 8, clock: Callable[[], float] = time.monotonic):
+        self.default_deadline_sec = default_deadline_sec
+        self.max_stale_sec = max_stale_sec
+        self._breaker_args = (failure_threshold, backoff_sec, max_backoff_sec)
+        self.clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dae-probe")
+        self._probes: Dict[str, _ProbeState] = {}
+
+    def _state(self, name: str) -> _ProbeState:
+        st = self._probes.get(name)
+        if st is None:
+            st = self._probes[name] = _ProbeState(CircuitBreaker(*self._breaker_args))
+        return st
+
+    def run(self, name: str, fn: Callable[..., Any], *args,
+            deadline_sec: Optional[float] = None, default: Any = None, stale_ok: bool = True,
+            **kwargs) -> ProbeResult:
+        """
+        Run fn(*args, **kwargs) under the probe's deadline and breaker.
+        stale_ok=False for non-idempotent reads (e.g. event streams) that must not be replayed.
+        """
+        st = self._state(name)
+        c = st.counters
+        c["calls"] += 1
+        now = self.clock()
+
+        if st.inflight is not None and not st.inflight.done():
+            c["busy"] += 1
+            return self._fallback(st, default, now, "still running", stale_ok)
+        if not st.breaker.allow(now):
+            c["short_circuited"] += 1
+            return self._fallback(st, default, now, "circuit open", stale_ok)
+
+        deadline = self.default_deadline_sec if deadline_sec is None else deadline_sec
+        t0 = time.perf_counter()
+        fut = self._pool.submit(fn, *args, **kwargs)
+        try:
+            value = fut.result(timeout=deadline)
+        except FutureTimeout:
+            st.inflight = fut
+            c["timeouts"] += 1
+            st.breaker.record_failure(now)
+            return self._fallback(st, default, now, f"deadline {deadline}s exceeded", stale_ok)
+        except Exception as e:
+            c["failures"] += 1
+            st.breaker.record_failure(now)
+            return self._fallback(st, default, now, f"{type(e).__name__}: {e}", stale_ok)
+        finally:
+            st.latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        st.inflight = None
+        st.breaker.record_success()
+        c["ok"] += 1
+        st.last_value, st.last_ok, st.last_source = value, now, SOURCE_LIVE
+        return ProbeResult(value, SOURCE_LIVE)
+
+    def _fallback(self, st: _ProbeState, default: Any, now: float, error: str, stale_ok: bool) -> ProbeResult:
+        if stale_ok and st.last_ok is not None and now - st.last_ok <= self.max_stale_sec:
+            st.counters["stale_served"] += 1
+            st.last_source = SOURCE_STALE
+            return ProbeResult(st.last_value, SOURCE_STALE, age_sec=now - st.last_ok, error=error)
+        st.last_source = SOURCE_DEFAULT
+        return ProbeResult(default, SOURCE_DEFAULT, error=error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-probe counters, breaker state, latency p50/p95 (ms) and last value source."""
+        out: Dict[str, Dict[str, Any]] = {}
+        # Copy first: the tick thread may register a probe while the API reads this
+        for name, st in list(self._probes.items()):
+            lat = list(st.latencies_ms)
+            out[name] = {
+                **st.counters,
+                "breaker": st.breaker.state,
+                "breaker_opens": st.breaker.opens,
+                "latency_p50_ms": round(QuantileCalculator.calculate(lat, 50), 2) if lat else None,
+                "latency_p95_ms": round(QuantileCalculator.calculate(lat, 95), 2) if lat else None,
+                "last_source": st.last_source,
+            }
+        return out
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def run_command(cmd: Sequence[str], timeout_sec: float, check: bool = True) -> bytes:
+    """
+    subprocess with a hard timeout: the child is killed when it expires
+    (raises subprocess.TimeoutExpired), so a hung tool never outlives its deadline.
+    cmd is an argv list, run without a shell: killing a shell would leave the tool running.
+    """
+    if isinstance(cmd, str):
+        raise TypeError("run_command() takes an argv list, not a shell string")
+    res = subprocess.run(list(cmd), stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL, timeout=timeout_sec, check=check)
+    return res.stdout
@@ -0,0 +1,118 @@
+"""
+Counter-to-rate derivation shared by adapters.
+
+Turns monotonically increasing device counters (bytes, codewords, re-registers, ...)
+into per-interval deltas and per-second rates. State per series is a handful of
+array slots (prev value, prev ts, width, scale), so thousands of series stay compact.
+
+Decreasing counters are classified as:
+- wrap:  width < 64 and prev sat in the top WRAP_ZONE of the range while the
+         unwrapped delta is small -> delta = cur + 2**width - prev
+- reset: anything else (device reboot, iface down/up) -> delta = cur
+"""
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+WRAP_ZONE = 0.25
+
+class CounterRateEngine:
+    """
+    Register series with add_series() (or let update() auto-register them with
+    default_width), then call update() once per tick with all counters.
+    """
+    def __init__(self, default_width: int = 64):
+        if default_width not in (32, 64):
+            raise ValueError("counter width must be 32 or 64")
+        self.default_width = default_width
+        self.index: Dict[str, int] = {}
+        self._prev = array("Q")
+        self._prev_ts = array("d")
+        self._has_prev = array("B")  # 0 = empty, 1 = has prev, 2 = has delta
+        self._width = array("B")
+        self._scale = array("d")
+        self._delta = array("d")
+        self.wraps = array("I")
+        self.resets = array("I")
+        self._tick_ts: Optional[float] = None
+
+    def add_series(self, name: str, width: Optional[int] = None, scale: float = 1.0) -> int:
+        """scale multiplies the per-second rate (e.g. 8 / 2**20 for bytes -> Mbps)."""
+        if name in self.index:
+            return self.index[name]
+        width = width or self.default_width
+        if width not in (32, 64):
+            raise ValueError("counter width must be 32 or 64")
+        i = len(self._prev)
+        self.index[name] = i
+        self._prev.append(0)
+        self._prev_ts.append(0.0)
+        self._has_prev.append(0)
+        self._width.append(width)
+        self._scale.append(scale)
+        self._delta.append(0.0)
+        self.wraps.append(0)
+        self.resets.append(0)
+        return i
+
+    def update_many(self, ts: float, values: Sequence[Optional[int]]) -> List[Optional[float]]:
+        """
+        One pass over all series, values aligned with registration order
+        (None = not sampled this tick). Returns scaled per-second rates
+        (None on the first sample of a series or on dt <= 0).
+        """
+        prev, prev_ts, has_prev = self._prev, self._prev_ts, self._has_prev
+        width, scale, delta = self._width, self._scale, self._delta
+        out: List[Optional[float]] = [None] * len(prev)
+        self._tick_ts = ts
+        for i, cur in enumerate(values):
+            if cur is None:
+                continue
+            w = width[i]
+            cur = int(cur) & ((1 << w) - 1)
+            if has_prev[i]:
+                p = prev[i]
+                if cur >= p:
+                    d = cur - p
+                else:
+                    span = 1 << w
+                    wrapped = cur + span - p
+                    if w < 64 and p >= span * (1 - WRAP_ZONE) and wrapped <= span * WRAP_ZONE:
+                        d = wrapped
+                        self.wraps[i] += 1
+                    else:
+                        d = cur
+                        self.resets[i] += 1
+                delta[i] = d
+                has_prev[i] = 2
+                dt = ts - prev_ts[i]
+                if dt > 0:
+                    out[i] = d / dt * scale[i]
+            else:
+                has_prev[i] = 1
+            prev[i] = cur
+            prev_ts[i] = ts
+        return out
+
+    def update(self, ts: float, values: Mapping[str, Optional[int]]) -> Dict[str, Optional[float]]:
+        """Named convenience wrapper around update_many(); unknown names are auto-registered."""
+        for name in values:
+            if name not in self.index:
+                self.add_series(name)
+        aligned: List[Optional[int]] = [None] * len(self._prev)
+        for name, v in values.items():
+            aligned[self.index[name]] = v
+        rates = self.update_many(ts, aligned)
+        return {name: rates[self.index[name]] for name in values}
+
+    def delta(self, name: str) -> Optional[int]:
+        """Counter increase seen by the most recent update (None if not sampled or first sample)."""
+        i = self.index.get(name)
+        if i is None or self._has_prev[i] != 2 or self._prev_ts[i] != self._tick_ts:
+            return None
+        return int(self._delta[i])
+
+    def stats(self, name: str) -> Tuple[int, int]:
+        """(wraps, resets) seen for a series."""
+        i = self.index[name]
+        return self.wraps[i], self.resets[i]
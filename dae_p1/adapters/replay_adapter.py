@@ -0,0 +1,228 @@
+from __future__ import annotations
+import calendar
+import csv
+import json
+import time
+from dataclasses import dataclass, field, fields, asdict, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .base_adapter import DomainAdapter
+from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot
+from ..M01_windowing import Windowing
+from ..M14_bundle_reader import load_bundle
+
+class ReplayExhausted(RuntimeError):
+    """Raised when a non-looping replay has no records left."""
+
+@dataclass
+class ReplayRecord:
+    ts: float
+    sample: MetricSample
+    events: List[ChangeEventCard] = field(default_factory=list)
+    snaps: List[PreChangeSnapshot] = field(default_factory=list)
+
+class ReplayClock:
+    """
+    Injectable clock that reports the replayed (original) time.
+    Pass to M00_common.set_clock() so windowing/episodes follow the recording.
+    """
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+# --- Loaders -----------------------------------------------------------------
+
+_METRIC_TYPES = {f.name: f.type for f in fields(MetricSample)}
+
+def _coerce_metric(k: str, v: Any) -> Any:
+    if v is None or v == "":
+        return None
+    t = _METRIC_TYPES[k]
+    if "int" in t:
+        return int(float(v))
+    if "float" in t:
+        return float(v)
+    return str(v)
+
+def _metric_from_dict(d: Dict[str, Any]) -> MetricSample:
+    return MetricSample(**{k: _coerce_metric(k, v) for k, v in d.items() if k in _METRIC_TYPES})
+
+def _iso_to_ts(s: str) -> float:
+    return float(calendar.timegm(time.strptime(s, "%Y-%m-%dT%H:%M:%SZ")))
+
+def _group(metrics: List[MetricSample], events: List[ChangeEventCard],
+           snaps: List[PreChangeSnapshot]) -> List[ReplayRecord]:
+    """Attach each event/snapshot to the first sample at or after it (time order)."""
+    metrics = sorted(metrics, key=lambda m: m.ts)
+    events = sorted(events, key=lambda e: e.event_time)
+    snaps = sorted(snaps, key=lambda s: s.capture_time)
+    out: List[ReplayRecord] = []
+    ei = si = 0
+    for i, m in enumerate(metrics):
+        last = i == len(metrics) - 1
+        rec = ReplayRecord(ts=m.ts, sample=m)
+        while ei < len(events) and (last or events[ei].event_time <= m.ts):
+            rec.events.append(events[ei]); ei += 1
+        while si < len(snaps) and (last or snaps[si].capture_time <= m.ts):
+            rec.snaps.append(snaps[si]); si += 1
+        out.append(rec)
+    return out
+
+def load_ndjson(path: str) -> List[ReplayRecord]:
+    """
+    NDJSON recording, one object per line with "kind": metric | event | snapshot
+    (default metric). Fields follow MetricSample / ChangeEventCard / PreChangeSnapshot.
+    """
+    metrics: List[MetricSample] = []
+    events: List[ChangeEventCard] = []
+    snaps: List[PreChangeSnapshot] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            d = json.loads(line)
+            kind = d.pop("kind", "metric")
+            if kind == "event":
+                events.append(ChangeEventCard(**d))
+            elif kind == "snapshot":
+                snaps.append(PreChangeSnapshot(**d))
+            else:
+                metrics.append(_metric_from_dict(d))
+    return _group(metrics, events, snaps)
+
+def load_csv(path: str) -> List[ReplayRecord]:
+    """CSV recording of MetricSample rows (header = MetricSample field names)."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        metrics = [_metric_from_dict(row) for row in csv.DictReader(f)]
+    return _group(metrics, [], [])
+
+def load_bundle_records(path: str) -> List[ReplayRecord]:
+    """Evidence bundle (bundles/*.json) timeline -> replay records (1 s resolution)."""
+    tl = load_bundle(path).get("timeline", {})
+    metrics = []
+    for p in tl.get("metrics_points", []):
+        d = {k: v for k, v in p.items() if k != "t"}
+        d["ts"] = _iso_to_ts(p["t"])
+        metrics.append(_metric_from_dict(d))
+    events = [ChangeEventCard(event_time=_iso_to_ts(e["t"]), event_type=e["event_type"],
+                              origin_hint=e.get("origin_hint", "unknown"),
+                              target_scope=e.get("target_scope", "unknown"),
+                              change_ref=e.get("change_ref"), window_ref=e.get("window_ref"),
+                              count=e.get("count", 1))
+              for e in tl.get("change_events", [])]
+    snaps = [PreChangeSnapshot(snapshot_ref_id=s["snapshot_ref_id"], snapshot_scope=s["snapshot_scope"],
+                               capture_time=_iso_to_ts(s["t"]), snapshot_digest=s["snapshot_digest"],
+                               snapshot_type=s.get("snapshot_type", "periodic"),
+                               readable_fields=s.get("readable_fields", {}))
+             for s in tl.get("pre_change_snapshots", [])]
+    return _group(metrics, events, snaps)
+
+def load_recording(path: str) -> List[ReplayRecord]:
+    if path.endswith(".csv"):
+        return load_csv(path)
+    if path.endswith(".ndjson") or path.endswith(".jsonl"):
+        return load_ndjson(path)
+    return load_bundle_records(path)
+
+def write_ndjson(path: str, metrics: Iterable[MetricSample],
+                 events: Iterable[ChangeEventCard] = (),
+                 snaps: Iterable[PreChangeSnapshot] = ()) -> None:
+    """Record buffers (e.g. core.metrics_buf.snapshot()) in the NDJSON replay format."""
+    with open(path, "w", encoding="utf-8") as f:
+        for kind, items in (("metric", metrics), ("event", events), ("snapshot", snaps)):
+            for it in items:
+                f.write(json.dumps({"kind": kind, **asdict(it)}, ensure_ascii=False) + "\n")
+
+# --- Adapter -----------------------------------------------------------------
+
+class ReplayAdapter(DomainAdapter):
+    """
+    Streams recorded MetricSample / ChangeEventCard / PreChangeSnapshot back through the core.
+    - Original timestamps and window_refs are preserved; `clock` follows the replayed time.
+    - speed: N x real time (pacing by original inter-sample gaps); 0 = as fast as possible.
+    - next_batch(n) hands out several records at once for throughput runs.
+    - loop: each pass is shifted later by the recording's span (window_refs re-derived), so
+      time keeps moving forward across the wrap.
+    Records are handed out as copies: the core annotates samples in place, and a loop must
+    not see the previous pass's values.
+    """
+    def __init__(self, records: List[ReplayRecord], speed: float = 0.0, loop: bool = False,
+                 clock: Optional[ReplayClock] = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 monotonic: Callable[[], float] = time.monotonic):
+        self.records = records
+        self.speed = speed
+        self.loop = loop
+        self.clock = clock or ReplayClock(records[0].ts if records else 0.0)
+        self._sleep = sleep
+        self._monotonic = monotonic
+        self._idx = 0
+        self._wall0: Optional[float] = None
+        self._ts0 = records[0].ts if records else 0.0
+        self._offset = 0.0  # added to recorded times; grows by _span per loop pass
+        gap = records[1].ts - records[0].ts if len(records) > 1 else 1.0
+        self._span = records[-1].ts - records[0].ts + gap if records else 0.0
+        self._windowing = Windowing()
+        self._last_evs: List[ChangeEventCard] = []
+        self._last_snaps: List[PreChangeSnapshot] = []
+        self.overrides = {}  # accepted for /simulate/incident compatibility; replay is not altered
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplayAdapter":
+        return cls(load_recording(path), **kwargs)
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.loop and self._idx >= len(self.records)
+
+    def _next(self) -> ReplayRecord:
+        if self._idx >= len(self.records):
+            if not self.loop or not self.records:
+                raise ReplayExhausted("replay finished")
+            self._idx = 0
+            self._offset += self._span
+        rec = self._copy(self.records[self._idx])
+        self._idx += 1
+        self._pace(rec.ts)
+        self.clock.t = rec.ts
+        return rec
+
+    def _copy(self, rec: ReplayRecord) -> ReplayRecord:
+        off = self._offset
+        if not off:
+            return ReplayRecord(rec.ts, replace(rec.sample), [replace(e) for e in rec.events],
+                                [replace(s) for s in rec.snaps])
+        ts = rec.ts + off
+        return ReplayRecord(
+            ts, replace(rec.sample, ts=ts, window_ref=self._windowing.window_ref(ts, "Ws")),
+            [replace(e, event_time=e.event_time + off) for e in rec.events],
+            [replace(s, capture_time=s.capture_time + off) for s in rec.snaps])
+
+    def _pace(self, ts: float) -> None:
+        if self.speed <= 0:
+            return
+        now = self._monotonic()
+        if self._wall0 is None:
+            self._wall0, self._ts0 = now, ts
+            return
+        wait = (ts - self._ts0) / self.speed - (now - self._wall0)
+        if wait > 0:
+            self._sleep(wait)
+
+    def collect_metric_sample(self) -> MetricSample:
+        rec = self._next()
+        self._last_evs, self._last_snaps = rec.events, rec.snaps
+        return rec.sample
+
+    def collect_change_events_and_snapshots(self) -> Tuple[List[ChangeEventCard], List[PreChangeSnapshot]]:
+        evs, snaps = self._last_evs, self._last_snaps
+        self._last_evs, self._last_snaps = [], []
+        return evs, snaps
+
+    def next_batch(self, n: int) -> List[ReplayRecord]:
+        out: List[ReplayRecord] = []
+        while len(out) < n and not self.exhausted:
+            out.append(self._next())
+        return out
@@ -1,11 +1,15 @@
 from __future__ import annotations
 import psutil
 import time
+import os
 import subprocess
-import re
 import random
 from typing import List, Tuple, Optional
 from .base_adapter import DomainAdapter
+from .latency_prober import LatencyProber, parse_targets
+from .netsh_parser import NetshInterfaceInfo, parse_netsh_interfaces, decode_netsh
+from .probe_runner import ProbeRunner, run_command
+from .rate_engine import CounterRateEngine
 from ..M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot
 from ..M01_windowing import Windowing
 from ..M03_metrics_collector import MetricsCollector
@@ -16,115 +20,68 @@ class WindowsWifiAdapter(DomainAdapter):
     Adapter to collect real-time metrics from Windows:
     - CPU/Mem via psutil
     - Network Rates via psutil
-    - Signal Quality via netsh (subprocess)
+    - Signal Quality via netsh (subprocess, bounded by ProbeRunner)
+    - Latency/jitter/loss via LatencyProber (TCP connect RTT, DAE_PROBE_TARGETS)
     """
+    DEFAULT_PROBE_TARGETS = "8.8.8.8:53,1.1.1.1:53"
+    # Subprocess kill timeout; the ProbeRunner deadline bounds how long a tick waits
+    SUBPROCESS_TIMEOUT_SEC = 3.0
+    PROBE_DEADLINE_SEC = 0.5
+
     def __init__(self):
         self.windowing = Windowing()
         self.collector = MetricsCollector(self.windowing)
         self.sim = DemoSimulator() # Integrated simulator
-        self.last_net_io = psutil.net_io_counters()
-        self.last_time = time.time()
+        # bytes -> Mbps (1024*1024 bits)
+        self.rates = CounterRateEngine()
+        self.rates.add_series("bytes_recv", scale=8 / (1024 * 1024))
+        self.rates.add_series("bytes_sent", scale=8 / (1024 * 1024))
+        io = psutil.net_io_counters()
+        self.rates.update_many(time.time(), [io.bytes_recv, io.bytes_sent])
         self.last_signal = None  # Track last signal for event generation
         self._last_evs = []
         self._last_snaps = []
         self.overrides = {} # For simulation injection
+        self.probes = ProbeRunner(default_deadline_sec=self.PROBE_DEADLINE_SEC)
+        self.provenance = {}  # MetricSample field -> live | stale:<age>s | default
+        self.prober = LatencyProber(parse_targets(os.environ.get("DAE_PROBE_TARGETS", self.DEFAULT_PROBE_TARGETS)))
+
+    def _read_netsh(self) -> NetshInterfaceInfo:
+        # Run netsh wlan show interfaces; parse all fields in a single pass
+        raw_output = run_command(["netsh", "wlan", "show", "interfaces"], timeout_sec=self.SUBPROCESS_TIMEOUT_SEC)
+        return parse_netsh_interfaces(decode_netsh(raw_output))
 
     def _get_signal_strength(self) -> Tuple[int, Optional[int], Optional[str], Optional[str], Optional[int], Optional[int]]:
         """
         Returns (signal_pct, channel, radio_type, band, tx_rate_mbps, rx_rate_mbps)
         """
-        signal = 0
-        channel = None
-        radio_type = None
-        band = None
-        tx_rate = None
-        rx_rate = None
-
-        try:
-            # Run netsh wlan show interfaces
-            # Use cp950 for Traditional Chinese Windows
-            raw_output = subprocess.check_output("netsh wlan show interfaces", shell=True)
-            try:
-                # Try UTF-8 strict first (common in localized Windows environments)
-                output = raw_output.decode("utf-8")
-            except UnicodeError:
-                try:
-                    # Try CP950 strict
-                    output = raw_output.decode("cp950")
-                except UnicodeError:
-                    # Fallback to loose CP950 or UTF-8
-                    output = raw_output.decode("cp950", errors="ignore")
-            
-            # Helper to find int value with multiple regex options
-            def find_int(patterns):
-                for p in patterns:
-                    m = re.search(p, output)
-                    if m: return int(m.group(1))
-                return None
-
-            # Helper to find str value
-            def find_str(patterns):
-                for p in patterns:
-                    m = re.search(p, output)
-                    if m: return m.group(1).strip()
-                return None
-
-            # Signal (Signal / 信號 / 訊號 / 信号)
-            signal = find_int([r"Signal\s*:\s*(\d+)%", r"信號\s*:\s*(\d+)%", r"訊號\s*:\s*(\d+)%", r"信号\s*:\s*(\d+)%"]) or 0
+        res = self.probes.run("netsh", self._read_netsh, default=NetshInterfaceInfo())
+        self.provenance["signal_strength_pct"] = res.provenance
+        info = res.value
+        return info.signal_pct or 0, info.channel, info.radio_type, info.band, info.tx_rate_mbps, info.rx_rate_mbps
 
-            # Channel (Channel / 頻道 / 通道 / 频道)
-            channel = find_int([r"Channel\s*:\s*(\d+)", r"頻道\s*:\s*(\d+)", r"通道\s*:\s*(\d+)", r"频道\s*:\s*(\d+)"])
-
-            # Radio Type (Radio type / 無線電類型 / 無線電波類型 / 无线电类型)
-            radio_type = find_str([r"Radio type\s*:\s*(.+)", r"無線電類型\s*:\s*(.+)", r"無線電波類型\s*:\s*(.+)", r"无线电类型\s*:\s*(.+)"])
-
-            # Band (Band / 頻帶 / 频带)
-            band = find_str([r"Band\s*:\s*(.+)", r"頻帶\s*:\s*(.+)", r"频带\s*:\s*(.+)"])
-            
-            # Tx/Rx Rates
-            # "Transmit rate (Mbps) : 1201" / "傳輸速率 (Mbps) : 1201"
-            # "Receive rate (Mbps)  : 1201" / "接收速率 (Mbps) : 1201"
-            tx_rate = find_int([r"Transmit rate \(Mbps\)\s*:\s*(\d+)", r"傳輸速率 \(Mbps\)\s*:\s*(\d+)", r"传输速率 \(Mbps\)\s*:\s*(\d+)"])
-            rx_rate = find_int([r"Receive rate \(Mbps\)\s*:\s*(\d+)", r"接收速率 \(Mbps\)\s*:\s*(\d+)", r"接收速率 \(Mbps\)\s*:\s*(\d+)"])
-
-        except Exception:
-            pass
-            
-        return signal, channel, radio_type, band, tx_rate, rx_rate
-
-    def _check_dns_status(self) -> str:
-        """Simple check if we can resolve google.com"""
+    def _nslookup(self) -> str:
+        # nslookup is ubiquitous; a non-zero exit is a real DNS failure (not a probe failure)
         try:
-            # nslookup is ubiquitous
-            subprocess.check_call("nslookup google.com", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return "OK"
-        except Exception:
+            run_command(["nslookup", "google.com"], timeout_sec=self.SUBPROCESS_TIMEOUT_SEC)
+        except subprocess.CalledProcessError:
             return "FAIL"
+        return "OK"
 
-    def _get_ping_stats(self) -> Tuple[float, float]:
-        """Returns (latency_ms, jitter_ms). Jitter is approximated as 0 for single ping or stdev for multiple."""
-        try:
-            # Run ping 8.8.8.8 -n 1 for speed (since we tick every 1s)
-            # Or -n 2 to get some jitter. Let's do -n 2.
-            output = subprocess.check_output("ping 8.8.8.8 -n 2", shell=True).decode("cp950", errors="ignore") # cp950 for TW Windows
-            
-            # Extract times: "時間=6ms", "time=6ms"
-            times = [int(x) for x in re.findall(r"[=<](\d+)ms", output)]
-            
-            if not times:
-                return 0.0, 0.0
-            
-            avg_latency = sums = sum(times) / len(times)
-            
-            # Simple jitter: max difference from avg? or stdev? or max-min?
-            # RFC 3393 jitter is usually smoothed. Here we just take range for simplicity in a 2-ping sample.
-            jitter = float(max(times) - min(times))
-            
-            return float(avg_latency), jitter
-            
-        except Exception:
-            pass
-        return 0.0, 0.0
+    def _check_dns_status(self) -> Optional[str]:
+        """Simple check if we can resolve google.com (None = unknown, probe unavailable)"""
+        res = self.probes.run("nslookup", self._nslookup, default=None)
+        self.provenance["dns_status"] = res.provenance
+        return res.value
+
+    def _get_ping_stats(self) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """
+        Returns (latency_p95_ms, jitter_ms, loss_pct) from the background LatencyProber.
+        Non-blocking: the prober measures TCP connect RTT on its own thread.
+        """
+        self.prober.start()
+        m = self.prober.as_metrics()
+        return m["latency_p95_ms"], m["jitter_ms"], m["loss_pct"]
 
     def collect_metric_sample(self) -> MetricSample:
         # 1. CPU / Mem
@@ -132,23 +89,10 @@ class WindowsWifiAdapter(DomainAdapter):
         mem = psutil.virtual_memory().percent
 
         # 2. Network Rates
-        current_net_io = psutil.net_io_counters()
-        current_time = time.time()
-        
-        dt = current_time - self.last_time
-        if dt <= 0: dt = 0.001 
-
-        bytes_recv = current_net_io.bytes_recv - self.last_net_io.bytes_recv
-        bytes_sent = current_net_io.bytes_sent - self.last_net_io.bytes_sent
-        
-        if bytes_recv < 0: bytes_recv = 0
-        if bytes_sent < 0: bytes_sent = 0
-
-        in_rate_mbps = (bytes_recv * 8) / (1024 * 1024) / dt
-        out_rate_mbps = (bytes_sent * 8) / (1024 * 1024) / dt
-
-        self.last_net_io = current_net_io
-        self.last_time = current_time
+        io = psutil.net_io_counters()
+        in_rate_mbps, out_rate_mbps = self.rates.update_many(time.time(), [io.bytes_recv, io.bytes_sent])
+        in_rate_mbps = in_rate_mbps or 0.0
+        out_rate_mbps = out_rate_mbps or 0.0
 
         # 3. Signal Strength & Extended Wifi Info
         signal, channel, radio, band, tx, rx = self._get_signal_strength()
@@ -156,11 +100,8 @@ class WindowsWifiAdapter(DomainAdapter):
         # DNS Check (Do periodically? Every 1s might be heavy. Let's do it every tick for now demo)
         dns = self._check_dns_status()
         
-        # 4. Latency & Jitter
-        # Execute ping. Note: this blocks! In a real async server, run in executor.
-        # But this is "Demo Core" ticking in a background thread, so blocking is "okay-ish" but will slow down the tick rate.
-        # Tick rate is 1s, ping -n 2 takes ~20ms + timeout. Should be fine.
-        lat, jit = self._get_ping_stats()
+        # 4. Latency, Jitter & Loss (rolling window, probed concurrently off-tick)
+        lat, jit, loss = self._get_ping_stats()
 
         # Check for overrides (Simulation)
         sim_metrics = {}
@@ -197,6 +138,7 @@ class WindowsWifiAdapter(DomainAdapter):
 
         ms = self.collector.collect(
             latency_p95_ms=get_val('latency_p95_ms', lat),
+            loss_pct=get_val('loss_pct', loss),
             retry_pct=get_val('retry_pct', 0.0),
             airtime_busy_pct=get_val('airtime_busy_pct', 0.0),
             in_rate=in_rate_mbps,
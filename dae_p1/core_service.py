@@ -1,10 +1,11 @@
 
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
 import time
 import os
 import uuid
-from typing import Optional, List, Tuple, Dict, Any
+from typing import Optional, List, Tuple, Dict, Any, Callable, Mapping
 
 
 from .M02_ring_buffer import RingBuffer
@@ -12,10 +13,130 @@ from .M10_timeline_builder import TimelineBuilder
 from .M11_bundle_exporter import BundleExporter
 from .M12_obh_controller import OBHController, OBHResult
 from .M16_recognition_engine import RecognitionEngine
+from .M07_incident_detector import AdaptiveIncidentDetector, IncidentDetector, flags_from_mask
+from .M07D_rule_engine import default_rules, load_rules
+from .M08_verdict_classifier import VerdictClassifier
+from .M07A_flag_index import BAD_BIT, FlagBitmapIndex
+from .M07E_window_aggregates import WindowAggregator
+from .M07C_oscillation_analyzer import OscillationAnalyzer
+from .M06A_event_index import IntervalIndex
+from .status_helper import RecognitionSnapshot, StatusMachine
+from .M09A_episode_store import EpisodeStore
 from .M00_common import MetricSample, ChangeEventCard, PreChangeSnapshot, EpisodeRecognition
 from .adapters.base_adapter import DomainAdapter
 from .M01_windowing import Windowing
 
+# --- Derived features ---------------------------------------------------------
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    One derived feature column, computed once per sample at ingest.
+    sources: MetricSample fields, first non-None wins; fn: custom derivation instead.
+    Names match the ProofCard vector keys so generators read columns directly.
+    """
+    name: str
+    sources: Tuple[str, ...] = ()
+    fn: Optional[Callable[[MetricSample], Optional[float]]] = None
+    typecode: str = "d"
+
+def _sum_rates(m: MetricSample) -> Optional[float]:
+    if m.in_rate is None and m.out_rate is None:
+        return None
+    return (m.in_rate or 0.0) + (m.out_rate or 0.0)
+
+def _quality_to_dbm(m: MetricSample) -> Optional[float]:
+    # Wi-Fi signal quality % -> approximate RSSI dBm (quality = 2 * (dBm + 100))
+    if m.signal_strength_pct is None:
+        return None
+    return m.signal_strength_pct / 2.0 - 100.0
+
+DERIVED_FEATURES: Tuple[FeatureSpec, ...] = (
+    FeatureSpec("rtt_ms", ("latency_p95_ms",)),
+    FeatureSpec("loss_pct", ("loss_pct",)),
+    FeatureSpec("us_rtt_ms"),
+    FeatureSpec("us_loss_pct"),
+    FeatureSpec("throughput_mbps", fn=_sum_rates),
+    FeatureSpec("wifi_retry_pct", ("retry_pct",)),
+    FeatureSpec("backhaul_rssi", fn=_quality_to_dbm),
+    FeatureSpec("access_retry_pct"),
+    FeatureSpec("rsrp", ("wan_rsrp_dbm",)),
+    FeatureSpec("sinr", ("wan_sinr_db",)),
+    FeatureSpec("ofdm_mer"),
+    FeatureSpec("fec_corrected", ("fec_corrected",)),
+    FeatureSpec("retrans_count"),
+    FeatureSpec("retry_burst_count", ("retry_burst_count",)),
+    FeatureSpec("airtime_burst_count", ("airtime_burst_count",)),
+    FeatureSpec("retry_osc_period_sec", ("retry_osc_period_sec",)),
+    FeatureSpec("mlo_switch_count", ("mlo_switch_count",)),
+    FeatureSpec("phy_rate_mbps", ("phy_rate_mbps",)),
+)
+
+def resolve_features(specs: Tuple[FeatureSpec, ...], aliases: Mapping[str, str]) -> Tuple[FeatureSpec, ...]:
+    """
+    Apply adapter FEATURE_ALIASES (feature -> MetricSample field) to features without a source;
+    features still without a source are dropped (no always-NaN ring).
+    """
+    out = []
+    for f in specs:
+        if not f.sources and f.fn is None:
+            if f.name not in aliases:
+                continue
+            f = FeatureSpec(f.name, (aliases[f.name],), None, f.typecode)
+        out.append(f)
+    return tuple(out)
+
+class FeatureColumns:
+    """
+    Typed ring columns (array('d'), NaN = missing) for derived features, aligned with metrics_buf.
+    """
+    def __init__(self, specs: Tuple[FeatureSpec, ...], maxlen: int):
+        self.specs = specs
+        self.maxlen = maxlen
+        self.cols: Dict[str, array] = {f.name: array(f.typecode) for f in specs}
+        self._head = 0  # next write slot once full
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, m: MetricSample) -> None:
+        nan = float("nan")
+        full = self._n >= self.maxlen
+        for f in self.specs:
+            if f.fn is not None:
+                v = f.fn(m)
+            else:
+                v = None
+                for src in f.sources:
+                    v = getattr(m, src, None)
+                    if v is not None:
+                        break
+            v = nan if v is None else float(v)
+            col = self.cols[f.name]
+            if full:
+                col[self._head] = v
+            else:
+                col.append(v)
+        if full:
+            self._head = (self._head + 1) % self.maxlen
+        else:
+            self._n += 1
+
+    def column(self, name: str, last: Optional[int] = None) -> array:
+        """Values in time order (NaN = missing), optionally only the last N rows."""
+        col = self.cols[name]
+        k = min(last, self._n) if last else self._n
+        # Once full, the newest row sits just before _head: copy only the k rows needed
+        end = self._head if self._head else self._n
+        start = end - k
+        if start >= 0:
+            return col[start:end]
+        return col[start:] + col[:end]
+
+    def window(self, last: Optional[int] = None) -> Dict[str, array]:
+        return {f.name: self.column(f.name, last) for f in self.specs}
+
 @dataclass
 class CoreRuntimeConfig:
     sample_interval_sec: int = 10
@@ -26,6 +147,16 @@ class CoreRuntimeConfig:
     # API to enable persistence (Deprecated)
     persistence_enabled: bool = False
     # db_path is deprecated and removed
+    # Per-device EWMA/Welford baselines instead of fixed detector thresholds
+    adaptive_baselines: bool = False
+    # SQLite file for closed episodes (":memory:" = not persisted across restarts)
+    episode_store_path: str = ":memory:"
+    # Detector/verdict rules YAML (M07D); None = configs/rules_v1.yaml or built-in defaults
+    rules_path: Optional[str] = None
+    # Background recognition in ingest(), published in OBHCoreService.latest:
+    # "ws" = on the first sample of each Ws window, "tick" = every sample, "off" = never: nothing
+    # is published and episodes neither advance nor close unless generate_recognition() is called
+    recognize_every: str = "ws"
 
 
 class OBHCoreService:
@@ -53,21 +184,121 @@ class OBHCoreService:
 
 
         self.windowing = Windowing()
-        self.recognition = RecognitionEngine()
+        # Time-sorted views of events_buf/snaps_buf for lookback joins against bad windows
+        self.event_index = IntervalIndex(self.events_buf.maxlen, key=lambda e: e.event_time,
+                                         windowing=self.windowing)
+        self.snap_index = IntervalIndex(self.snaps_buf.maxlen, key=lambda s: s.capture_time,
+                                        windowing=self.windowing)
+        self.episode_store = EpisodeStore(self.cfg.episode_store_path)
+        self.rules = load_rules(self.cfg.rules_path) if self.cfg.rules_path else default_rules()
+        self.recognition = RecognitionEngine(
+            detector=(AdaptiveIncidentDetector(rules=self.rules) if self.cfg.adaptive_baselines
+                      else IncidentDetector(rules=self.rules)),
+            store=self.episode_store, classifier=VerdictClassifier(rules=self.rules))
+        # Per-sample flag bitmasks, maintained on append for time-range flag queries
+        self.flag_index = FlagBitmapIndex(maxlen=buffer_items, detector=self.recognition.detector)
+        # Per-Ws / per-Wl means, p95s and flag fractions, updated on ingest; recognition input
+        self.aggregates = WindowAggregator(windowing=self.windowing)
+        # Adds retry/airtime burst and link switch counts to each sample before buffering
+        self.oscillation = OscillationAnalyzer(windowing=self.windowing)
+        # Derived feature columns (ProofCard vectors), computed once per sample
+        self.features = FeatureColumns(
+            resolve_features(DERIVED_FEATURES, getattr(adapter, "FEATURE_ALIASES", {})), buffer_items)
         self.obh = OBHController(TimelineBuilder(), BundleExporter())
+        # Device status, re-evaluated once per ingested sample; read via status.current
+        self.status = StatusMachine()
+        # Status + recognition published once per ingested sample (see _publish)
+        self.latest = RecognitionSnapshot(version=0, ts=0.0, status=self.status.current)
+        self._recognized_ws: Optional[str] = None
 
     def tick_once(self) -> None:
         m = self.adapter.collect_metric_sample()
-        self.metrics_buf.append(m)
-
         evs, snaps = self.adapter.collect_change_events_and_snapshots()
+        self.ingest(m, evs, snaps)
+
+        if not self.cfg.accelerate:
+            time.sleep(self.cfg.sample_interval_sec)
+
+    def ingest(self, m: MetricSample, evs: List[ChangeEventCard], snaps: List[PreChangeSnapshot]) -> None:
+        """
+        Append one collected sample plus its events/snapshots to the buffers.
+        Shared by tick_once() and batch/replay feeds.
+        """
+        self.oscillation.annotate(m)
+        self.metrics_buf.append(m)
+        self.features.append(m)
+        mask = self.flag_index.append(m)
+        self.aggregates.add(m, mask, bool(mask & BAD_BIT))
+        # Learn after flagging so a spike is judged against the baseline before it
+        self.recognition.detector.observe(m)
+        self.recognition.changepoints.update(m)
+        self.recognition.track(m, self.windowing.window_ref(m.ts, "Wl"))
         for e in evs:
             self.events_buf.append(e)
+            self.event_index.add(e)
         for s in snaps:
             self.snaps_buf.append(s)
+            self.snap_index.add(s)
+        # Recognize before the status update so an episode it opens shows in the same tick
+        rec = self._background_recognition(m)
+        self._update_status(m, mask)
+        self._publish(m, rec)
+        # An episode closed this tick reaches the archive within flush_interval_sec
+        self.episode_store.flush_if_due()
 
-        if not self.cfg.accelerate:
-            time.sleep(self.cfg.sample_interval_sec)
+    def _background_recognition(self, m: MetricSample) -> Optional[EpisodeRecognition]:
+        """Recognition for this tick per cfg.recognize_every; None = keep the published one."""
+        every = self.cfg.recognize_every
+        if every == "off":
+            return None
+        if every == "ws":
+            ws = self.windowing.window_ref(m.ts, "Ws")
+            if ws == self._recognized_ws:
+                return None
+            self._recognized_ws = ws
+        return self.generate_recognition()
+
+    def _publish(self, m: MetricSample, rec: Optional[EpisodeRecognition]) -> None:
+        prev = self.latest
+        # One reference swap: readers see either the previous or the new snapshot
+        self.latest = RecognitionSnapshot(
+            version=prev.version + 1, ts=m.ts, status=self.status.current,
+            recognition=rec if rec is not None else prev.recognition,
+            recognized_ts=m.ts if rec is not None else prev.recognized_ts)
+
+    def published(self) -> Tuple[RecognitionSnapshot, Optional[EpisodeRecognition]]:
+        """
+        The published snapshot and its recognition, read once so both come from the same
+        tick. A pure read (no episode bookkeeping), safe from any thread; the recognition is
+        None until one was published (none ever is with recognize_every="off").
+        """
+        snap = self.latest
+        return snap, snap.recognition
+
+    def latest_recognition(self) -> Optional[EpisodeRecognition]:
+        return self.published()[1]
+
+    def _update_status(self, m: MetricSample, mask: int) -> None:
+        # Judge the Wl aggregate as recognition does, so one noisy sample does not flip /status
+        window = self.aggregates.context("Wl")
+        if window is not None:
+            is_bad, flags = window.judge_mask(self.recognition.window_quorum)
+        else:
+            is_bad, flags = bool(mask & BAD_BIT), mask & ~BAD_BIT
+        opaque = True
+        if is_bad:
+            # Latest change event, if it falls in the sample's Ws window lookback
+            ev = self.event_index.last()
+            start = (m.ts // self.windowing.policy.ws_sec) * self.windowing.policy.ws_sec
+            if ev is not None and ev.event_time >= start - self.recognition.event_lookback_sec:
+                opaque = self.recognition.obs.check_event(ev).opaque_risk
+        self.status.update(m.ts, is_bad, flags_from_mask(flags), opaque,
+                           investigating=bool(self.recognition.episodes.open))
+
+    def close(self) -> None:
+        """Shutdown, once the tick loop has stopped: archive open episodes, then close the store."""
+        self.recognition.episodes.clear()
+        self.episode_store.close()
 
     def run_for(self, seconds: int) -> None:
         """
@@ -88,15 +319,29 @@ class OBHCoreService:
         worst_window_ref = self.windowing.window_ref(latest.ts, "Wl")
         return self.recognition.recognize(
             latest_metric=latest,
-            recent_change_events=self.events_buf.snapshot(),
-            worst_window_ref=worst_window_ref
+            recent_change_events=self.event_index.for_window(latest.ts, self.recognition.event_lookback_sec),
+            worst_window_ref=worst_window_ref,
+            window=self.aggregates.context("Wl")
         )
 
+    def bad_window_events(self, t0: Optional[float] = None, t1: Optional[float] = None,
+                          lookback_sec: Optional[float] = None) -> List[Tuple[float, List[ChangeEventCard]]]:
+        """
+        Every bad sample in [t0, t1] (flag bitmap index) joined with the change events in its
+        lookback window, in one sort-merge pass over both streams.
+        """
+        bad_ts = self.flag_index.query(t0, t1, all_of=BAD_BIT)
+        lookback = self.recognition.event_lookback_sec if lookback_sec is None else lookback_sec
+        return self.event_index.join(bad_ts, lookback)
+
     def obh_export(self, out_dir: str) -> OBHResult:
         """
-        Perform OBH export using current buffers.
+        Perform OBH export using current buffers and the published recognition.
+        Raises RuntimeError when none was published yet.
         """
-        rec = self.generate_recognition()
+        rec = self.latest_recognition()
+        if rec is None:
+            raise RuntimeError("No recognition published yet")
         return self.obh.run(
             out_dir=out_dir,
             recognition=rec,
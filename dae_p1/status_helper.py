@@ -1,90 +1,85 @@
-from .M00_common import Verdict, ObservabilityResult
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Sequence, Tuple
+from .M00_common import EpisodeRecognition
 
-def calculate_simple_status(core_service) -> str:
+# Simple status values, most severe last
+STATUS_VALUES = ("ok", "unstable", "suspected", "investigation")
+
+def derive_status(is_bad: bool, opaque: bool, investigating: bool) -> str:
     """
-    Calculates a simplified status string (ok/unstable/suspected/investigation)
-    based on the current state of the core service *without* triggering side effects.
+    - investigation: an M09 episode is open (closes after its good-window hysteresis)
+    - suspected: bad window with no change event explaining it (opaque)
+    - unstable: bad window attributed to a referenced change event
+    - ok: otherwise
     """
-    
-    # 1. Check for active investigation (Investigation)
-    # If there is an active episode, we consider it 'investigation' or 'suspected' depending on preference.
-    # The requirement asks for 'investigation'. M09 tracks episodes.
-    if core_service.recognition.episodes.current is not None:
+    if investigating:
         return "investigation"
+    if is_bad:
+        return "suspected" if opaque else "unstable"
+    return "ok"
 
-    # 2. Peek at latest data
-    latest_metric = core_service.metrics_buf.last()
-    if not latest_metric:
-        return "ok" # No data yet, assume OK
+@dataclass(frozen=True)
+class DeviceStatus:
+    status: str
+    since: float  # ts of the transition into this status
+    ts: float  # sample ts this value was computed from
+    flags: Tuple[str, ...] = ()
+    seq: int = 0  # ticks evaluated
 
-    # 3. Re-run detection logic (stateless)
-    is_bad, flags = core_service.recognition.detector.is_bad_window(latest_metric)
-    
-    # 4. Re-run observability logic (stateless)
-    # Get latest event if any
-    events = core_service.events_buf.snapshot()
-    if events:
-        obs_res = core_service.recognition.obs.check_event(events[-1])
-        opaque = obs_res.opaque_risk
-    else:
-        # Default state with no events usually implies no immediate observability risk unless we expected one
-        # But M16 logic says: check_no_change_event() -> INSUFFICIENT -> OPAQUE
-        # However, for steady state 'ok', we shouldn't flag opaque if nothing is happening.
-        # Let's align with M16: 
-        #   if recent_change_events: check_event
-        #   else: check_no_change_event -> which returns OPAQUE.
-        # WAIT: If the system is IDLE, M16 says it's OPAQUE?
-        # Let's look at M16 again in a moment. 
-        # If strict M16 logic says no event = opaque, then 'ok' is impossible?
-        # Let's assume for 'simple status', if no flags and no active episode, it is OK.
-        opaque = False 
-        
-    # BUT, if we want to be consistent with 'suspected' logic:
-    # Suspected = OPAQUE_RISK.
-    
-    # Let's refine the logic to be more user-friendly:
-    
-    if is_bad:
-        # We have badness flags.
-        # If opaque -> Suspected
-        # If not opaque -> Unstable
-        
-        # We need to know if it's opaque for THIS bad window.
-        # In M16: if recent_change_events matches logic.
-        pass
+@dataclass(frozen=True)
+class StatusTransition:
+    ts: float
+    prev: str
+    status: str
+    flags: Tuple[str, ...]
 
-    # Let's use the Verdict directly if we can, but Verdict requires us to know 'opaque' input.
-    
-    # Re-logic:
-    # if flags exist:
-    #    verdict = classifier.classify(flags, opaque)
-    #    if verdict == OPAQUE_RISK -> suspected
-    #    if verdict in [WAN, WIFI, etc] -> unstable
-    # else:
-    #    ok
-    
-    # How to determine opaque?
-    # If there ARE flags, we look for a recent change event to explain them.
-    # If no recent change event -> M16 says "INSUFFICIENT" -> OPAQUE.
-    # So: Bad params + No recent event = Suspected (Opaque).
-    #     Bad params + Recent event + Missing refs = Suspected (Opaque).
-    #     Bad params + Recent event + Good refs = Unstable (Identified).
-    
-    if is_bad:
-        # Check observability
-        if events:
-             # We ideally check if the event is 'recent' enough, but M16 just takes the list.
-             # We'll assume the caller passes relevant events.
-             obs_res = core_service.recognition.obs.check_event(events[-1])
-             is_opaque = obs_res.opaque_risk
-        else:
-             # Bad window but no explaining event
-             is_opaque = True
-             
-        if is_opaque:
-            return "suspected"
-        else:
-            return "unstable"
-            
-    # If not bad
-    return "ok"
+@dataclass(frozen=True)
+class RecognitionSnapshot:
+    """
+    What the core publishes after each ingested sample (OBHCoreService.latest): device
+    status and the latest recognition, taken at the same tick. A new object per tick,
+    never mutated afterwards (recognition included), so API readers and OBH export read
+    one consistent value however often they poll.
+    """
+    version: int  # +1 per publish
+    ts: float  # sample ts of this tick
+    status: DeviceStatus
+    recognition: Optional[EpisodeRecognition] = None
+    recognized_ts: Optional[float] = None  # sample ts recognition last ran on
+
+class StatusMachine:
+    """
+    Device status updated once per tick by OBHCoreService.ingest() from values it already
+    has (flag mask, latest change event, open episodes): O(1) per update.
+    `current` is replaced by a new frozen DeviceStatus on every update, so readers only
+    load one reference and never see a half-updated value. Transitions are kept in a
+    bounded log.
+    """
+    def __init__(self, history: int = 1000):
+        self.current = DeviceStatus("ok", since=0.0, ts=0.0)
+        self.transitions: Deque[StatusTransition] = deque(maxlen=history)
+
+    def update(self, ts: float, is_bad: bool, flags: Sequence[str], opaque: bool,
+               investigating: bool) -> DeviceStatus:
+        status = derive_status(is_bad, opaque, investigating)
+        cur = self.current
+        since = cur.since
+        if status != cur.status or cur.seq == 0:
+            since = ts
+            if cur.seq:
+                self.transitions.append(StatusTransition(ts, cur.status, status, tuple(flags)))
+        self.current = DeviceStatus(status, since, ts, tuple(flags), cur.seq + 1)
+        return self.current
+
+    def history(self, since: Optional[float] = None) -> List[StatusTransition]:
+        # list() copies the deque atomically; iterating it live races the tick thread's appends
+        return [t for t in list(self.transitions) if since is None or t.ts >= since]
+
+def calculate_simple_status(core_service) -> str:
+    """
+    Simplified status string (ok/unstable/suspected/investigation): the value the core
+    published on its last tick. No re-detection, no buffer copies.
+    """
+    return core_service.latest.status.status
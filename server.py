@@ -1,7 +1,9 @@
 
 import asyncio
+import os
 import logging
 from contextlib import asynccontextmanager
+from dataclasses import asdict
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -10,6 +12,7 @@ from dae_p1.M20_install_verify import verify_install
 from dae_p1.status_helper import calculate_simple_status
 from dae_p1.M13_fp_lite import ProofCardGenerator, ProofCardGeneratorV14
 from dae_p1.M00_common import iso
+from dae_p1.M16B_fleet_batch import FleetBatch
 
 
 # Configure logging
@@ -20,6 +23,7 @@ logger = logging.getLogger(__name__)
 adapter = None
 core = None
 background_task = None
+core_stop = asyncio.Event()  # set on shutdown; the loop exits after its current tick
 pc_generator = ProofCardGenerator()
 pc_generator_v14 = ProofCardGeneratorV14()
 
@@ -27,19 +31,24 @@ pc_generator_v14 = ProofCardGeneratorV14()
 async def run_core_loop():
     """Background task to simulate the core service tick."""
     logger.info("Starting Core Loop")
-    while True:
+    while not core_stop.is_set():
         if core:
             try:
-                core.tick_once()
+                # Off the event loop: a slow adapter never stalls API requests
+                await asyncio.to_thread(core.tick_once)
                 # logger.info("Tick")
             except Exception as e:
                 logger.error(f"Error in tick: {e}")
-        await asyncio.sleep(1) # simple 1 second tick
+        try:
+            await asyncio.wait_for(core_stop.wait(), timeout=1)  # simple 1 second tick
+        except asyncio.TimeoutError:
+            pass
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     global adapter, core, background_task
+    core_stop.clear()
 
     
     import platform
@@ -54,13 +63,19 @@ async def lifespan(app: FastAPI):
             logger.error(f"Failed to import WindowsWifiAdapter on Windows: {e}. Fallback to Demo.")
             from dae_p1.adapters.demo_adapter import DemoAdapter
             adapter = DemoAdapter()
+    elif os_name == "Linux" and os.environ.get("DAE_ADAPTER") == "linux" and os.path.exists("/proc/net/dev"):
+        from dae_p1.adapters.linux_host_adapter import LinuxHostAdapter
+        logger.info("Linux detected (DAE_ADAPTER=linux). Initializing Core Service with LinuxHostAdapter...")
+        adapter = LinuxHostAdapter(iface=os.environ.get("DAE_IFACE") or None)
     else:
         logger.info(f"{os_name} detected (Not Windows). Initializing Core Service with DemoAdapter...")
         from dae_p1.adapters.demo_adapter import DemoAdapter
         adapter = DemoAdapter()
     
     # Use accelerate=True so it doesn't sleep internally, we control loop with asyncio
-    cfg = CoreRuntimeConfig(sample_interval_sec=1, buffer_minutes=60, accelerate=True, persistence_enabled=True)
+    cfg = CoreRuntimeConfig(sample_interval_sec=1, buffer_minutes=60, accelerate=True, persistence_enabled=True,
+                            episode_store_path=os.environ.get("DAE_EPISODE_DB", "data/episodes.db"),
+                            rules_path=os.environ.get("DAE_RULES") or None)
     core = OBHCoreService(adapter, cfg)
 
 
@@ -68,13 +83,12 @@ async def lifespan(app: FastAPI):
     
     yield
     
-    # Shutdown
+    # Shutdown: stop the loop (a running tick finishes in its thread, cancel would not
+    # wait for it), then archive open episodes and close the store
+    core_stop.set()
     if background_task:
-        background_task.cancel()
-        try:
-            await background_task
-        except asyncio.CancelledError:
-            pass
+        await background_task
+    core.close()
     logger.info("Core Service Shut Down")
 
 app = FastAPI(lifespan=lifespan)
@@ -113,32 +127,115 @@ def get_metrics_history(limit: int = 20):
     all_metrics = core.metrics_buf.snapshot()
     return all_metrics[-limit:]
 
+@app.get("/metrics/flags")
+def get_metric_flags(flags: str = "BAD", match: str = "all", t0: float = None, t1: float = None, limit: int = 1000):
+    """
+    Samples in [t0, t1] (epoch seconds) carrying the given detector flags,
+    e.g. flags=AIRTIME_HIGH,RETRY_HIGH (match=all) or match=any. Served from the flag bitmap index.
+    """
+    if not core:
+        return {"error": "Core not initialized"}
+    from dae_p1.M07A_flag_index import bits_for
+    try:
+        mask = bits_for(f.strip() for f in flags.split(",") if f.strip())
+    except KeyError as e:
+        return {"error": f"unknown flag {e}"}
+    if not mask:
+        return {"error": "no flags given"}
+    kw = {"all_of": mask} if match == "all" else {"any_of": mask}
+    ts = core.flag_index.query(t0, t1, **kw)
+    return {"count": len(ts), "ts": ts[-limit:]}
+
+@app.get("/episodes")
+def get_episodes(verdict: str = None, device_id: str = None, change_ref: str = None,
+                 since: float = None, until: float = None, min_confidence: float = None, limit: int = 100):
+    """
+    Closed episodes from the episode store, newest first, e.g.
+    verdict=WAN_UNSTABLE&since=<epoch>&min_confidence=0.6. Open episodes are listed separately.
+    """
+    if not core:
+        return {"error": "Core not initialized"}
+    closed = core.episode_store.query(verdict=verdict, device_id=device_id, change_ref=change_ref,
+                                      since=since, until=until, min_confidence=min_confidence, limit=limit)
+    open_eps = [{"episode_id": e.episode_id, "verdict": e.verdict, "start_ts": e.start_ts,
+                 "confidence": e.confidence, "change_ref": e.change_ref}
+                for e in core.recognition.episodes.open_episodes()]
+    return {"count": len(closed), "episodes": closed, "open": open_eps}
+
+@app.get("/episodes/{episode_id}")
+def get_episode(episode_id: str):
+    """One closed episode by id."""
+    if not core:
+        return {"error": "Core not initialized"}
+    ep = core.episode_store.get(episode_id)
+    return ep if ep is not None else {"error": "episode not found"}
+
 @app.get("/events")
-def get_events():
-    """Get recent change events."""
+def get_events(since: float = None, until: float = None):
+    """Get recent change events, optionally only those in [since, until] (epoch seconds)."""
     if not core:
         return []
-    return core.events_buf.snapshot()
+    if since is None and until is None:
+        return core.events_buf.snapshot()
+    return core.event_index.range(since, until)
 
 @app.get("/snapshots")
-def get_snapshots():
-    """Get recent snapshots."""
+def get_snapshots(since: float = None, until: float = None):
+    """Get recent snapshots, optionally only those in [since, until] (epoch seconds)."""
     if not core:
         return []
-    return core.snaps_buf.snapshot()
+    if since is None and until is None:
+        return core.snaps_buf.snapshot()
+    return core.snap_index.range(since, until)
 
 @app.get("/recognition")
 def get_recognition():
-    """Trigger and return recognition result."""
+    """Latest recognition published by the core loop (same result however often it is polled)."""
     if not core:
         return {"error": "Core not initialized"}
     
     try:
-        rec = core.generate_recognition()
-        return rec
+        snap, rec = core.published()
+        if rec is None:
+            return {"status": "not_recognized", "version": snap.version}
+        return {**asdict(rec), "version": snap.version,
+                "recognized_at": iso(snap.recognized_ts) if snap.recognized_ts is not None else None}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@app.get("/fleet/recognition")
+def get_fleet_recognition():
+    """
+    Latest published recognition per device. This server hosts only its local core, so the
+    list has at most one entry ("local"), none until it published a recognition; batches
+    for other devices go to POST.
+    """
+    if not core:
+        return {"error": "Core not initialized"}
+    out = []
+    for dev, c in {"local": core}.items():
+        snap, rec = c.published()
+        if rec is None:
+            continue
+        out.append({"device_id": dev, **asdict(rec), "version": snap.version})
+    return out
+
+@app.post("/fleet/recognition")
+def post_fleet_recognition(columns: dict, window_stats: bool = False):
+    """
+    Stateless batch recognition for N devices posted as FleetBatch columns
+    (device_id, window_ref, samples, bad, flag_frac, bad_flag_frac, obs_mask, ...).
+    ?window_stats=true adds each row's window aggregate to its result.
+    """
+    if not core:
+        return {"error": "Core not initialized"}
+    try:
+        batch = FleetBatch.from_dict(columns)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+    recs = core.recognition.recognize_batch(batch, window_stats=window_stats)
+    return [{"device_id": d, **asdict(r)} for d, r in zip(batch.device_id, recs)]
+
 @app.get("/install_verify")
 def get_install_verify():
     """Trigger installation verification (closure readiness)."""
@@ -157,7 +254,7 @@ def get_install_verify():
     }
     
     # Run verification (defaults to 3 minute window inside the function)
-    result = verify_install(metrics_snapshot, window_refs=w_refs, buffer_stats=b_stats)
+    result = verify_install(metrics_snapshot, window_refs=w_refs, buffer_stats=b_stats, rules=core.rules)
     
     return result
 
@@ -167,8 +264,27 @@ def get_status():
     if not core:
         return {"status": "starting"}
     
-    s = calculate_simple_status(core)
-    return {"status": s}
+    snap = core.latest
+    st = snap.status
+    rec = snap.recognition
+    return {"status": st.status, "since": iso(st.since) if st.seq else None, "version": snap.version,
+            "verdict": rec.primary_verdict if rec else None, "episode_id": rec.episode_id if rec else None}
+
+@app.get("/status/transitions")
+def get_status_transitions(since: float = None):
+    """Logged status transitions (oldest first), optionally only those at or after `since`."""
+    if not core:
+        return []
+    return core.status.history(since)
+
+@app.get("/windows")
+def get_windows(kind: str = "Wl", last: int = 10):
+    """Per-window aggregates (means, p95s, flag fractions): the open window, then closed ones newest first."""
+    if not core or kind not in ("Ws", "Wl"):
+        return []
+    cur = core.aggregates.current(kind)
+    closed = core.aggregates.closed(kind, last)[::-1]
+    return [w.to_dict() for w in ([cur] if cur else []) + closed]
 
 # Execution block moved to end of file
 
@@ -220,6 +336,17 @@ def get_modules_status():
         
     add_mod("M03", "MetricsCollector", "Active", m03_data)
 
+    # Adapter probes (deadlines / circuit breakers / stale fallback)
+    probes = getattr(core.adapter, "probes", None)
+    if probes is not None:
+        probe_stats = probes.snapshot()
+        open_count = sum(1 for p in probe_stats.values() if p["breaker"] == "open")
+        add_mod("ADP", "AdapterProbes", "Degraded" if open_count else "Active", {
+            "adapter": type(core.adapter).__name__,
+            "probes": probe_stats,
+            "provenance": getattr(core.adapter, "provenance", {}),
+        })
+
     # ... (Skipping M04-M12 for brevity, they remain largely same but accessing core props)
     # Re-implementing simplified status for other modules
     
@@ -266,7 +393,7 @@ def _get_mock_fleet():
         
         # authoritative verify logic
         snaps = core.metrics_buf.snapshot()
-        v_result = verify_install(snaps)
+        v_result = verify_install(snaps, rules=core.rules)
         
         closure = "READY" if v_result.closure_readiness == "ready" else "NOT_READY"
         readiness_verdict = v_result.readiness_verdict
@@ -346,7 +473,7 @@ def get_device_detail(device_id: str):
             
             # Run verification for detail
             m_snaps = core.metrics_buf.snapshot()
-            v_result = verify_install(m_snaps)
+            v_result = verify_install(m_snaps, rules=core.rules)
         
         if not snapshots:
             snapshots = [
@@ -426,12 +553,8 @@ def get_device_proof(device_id: str, profile: str = "WIFI78_INSTALL_ACCEPT"):
         return {"error": "Core not initialized"}
         
     # Get current Window (last N minutes or samples)
-    # For sim, we take the last 100 samples
-    metrics = core.metrics_buf.snapshot()[-100:] 
-    
-    # Convert dataclasses to dicts for M13 processing
-    from dataclasses import asdict, is_dataclass
-    metrics_dicts = [asdict(m) if is_dataclass(m) else m for m in metrics]
+    # Last 100 samples, as feature columns precomputed at ingest
+    columns = core.features.window(100)
 
     # Get Manifest Ref
     manifest = core.get_manifest(device_id)
@@ -440,7 +563,8 @@ def get_device_proof(device_id: str, profile: str = "WIFI78_INSTALL_ACCEPT"):
 
     # Generate
     try:
-        card = pc_generator.generate(metrics_dicts, profile, window_ref_str="W-LATEST-100", manifest_ref_str=manifest_ref)
+        card = pc_generator.generate([], profile, window_ref_str="W-LATEST-100", manifest_ref_str=manifest_ref,
+                                     columns=columns)
         return card
     except Exception as e:
         return {"error": f"Proof Generation Failed: {e}"}
@@ -466,10 +590,7 @@ def get_device_proof_v14(
     if not core:
         return {"error": "Core not initialized"}
 
-    metrics = core.metrics_buf.snapshot()[-100:]
-
-    from dataclasses import asdict, is_dataclass
-    metrics_dicts = [asdict(m) if is_dataclass(m) else m for m in metrics]
+    columns = core.features.window(100)
 
     manifest = core.get_manifest(device_id)
     manifest_ref = manifest["manifest_ref"]
@@ -482,11 +603,12 @@ def get_device_proof_v14(
             ctx_overrides["proposed_egress"] = export_mode
 
         card = pc_generator_v14.generate(
-            metrics_dicts,
+            [],
             profile,
             window_ref_str="W-LATEST-100",
             manifest_ref_str=manifest_ref,
             ctx_overrides=ctx_overrides or None,
+            columns=columns,
         )
 
         # Apply egress gate to filter output
@@ -0,0 +1,91 @@
+"""
+Tests for adaptive per-device baselines in M07.
+"""
+
+import json
+import random
+import unittest
+
+from dae_p1.M00_common import MetricSample
+from dae_p1.core_service import OBHCoreService, CoreRuntimeConfig
+from dae_p1.M07_incident_detector import (AdaptiveIncidentDetector, AdaptivePolicy, DeviceBaseline,
+                                          DetectorThresholds, IncidentDetector)
+
+
+def ms(**kw):
+    return MetricSample(ts=0.0, window_ref="Ws:0", **kw)
+
+
+class TestDeviceBaseline(unittest.TestCase):
+
+    def test_welford_matches_exact_stats(self):
+        xs = [random.Random(2).gauss(50, 5) for _ in range(20)]
+        b = DeviceBaseline()
+        for x in xs:
+            b.update(0, x, alpha=0.1, min_samples=100)
+        n, mean, std = b.stats(0)
+        exact_mean = sum(xs) / len(xs)
+        exact_std = (sum((x - exact_mean) ** 2 for x in xs) / len(xs)) ** 0.5
+        self.assertEqual(n, 20)
+        self.assertAlmostEqual(mean, exact_mean)
+        self.assertAlmostEqual(std, exact_std)
+
+    def test_round_trip_serialization(self):
+        b = DeviceBaseline()
+        b.update(2, 42.0, 0.1, 5)
+        state = json.loads(json.dumps(b.to_list()))
+        self.assertEqual(DeviceBaseline.from_list(state).stats(2), b.stats(2))
+
+
+class TestAdaptiveDetector(unittest.TestCase):
+
+    def feed(self, det, device, n, **mean):
+        rnd = random.Random(device)
+        for _ in range(n):
+            det.observe(ms(**{k: rnd.gauss(v, 1.0) for k, v in mean.items()}), device)
+
+    def test_cold_start_uses_fixed_thresholds(self):
+        det = AdaptiveIncidentDetector()
+        m = ms(airtime_busy_pct=80.0, retry_pct=20.0)
+        self.assertEqual(det.badness_flags(m, "new"), IncidentDetector().badness_flags(m))
+
+    def test_dense_and_rural_devices_diverge(self):
+        det = AdaptiveIncidentDetector(policy=AdaptivePolicy(min_samples=30))
+        self.feed(det, "dense", 200, airtime_busy_pct=82.0, retry_pct=20.0)
+        self.feed(det, "rural", 200, airtime_busy_pct=20.0, retry_pct=3.0)
+        typical_dense = ms(airtime_busy_pct=83.0, retry_pct=21.0)
+        self.assertEqual(det.badness_flags(typical_dense, "dense"), [])
+        self.assertEqual(len(IncidentDetector().badness_flags(typical_dense)), 2)
+        spike_rural = ms(airtime_busy_pct=45.0, retry_pct=12.0)
+        self.assertEqual(det.badness_flags(spike_rural, "rural"), ["AIRTIME_HIGH", "RETRY_HIGH"])
+        self.assertEqual(IncidentDetector().badness_flags(spike_rural), [])
+        self.assertGreater(det.deviations(spike_rural, "rural")["airtime_busy_pct"], 3)
+
+    def test_thresholds_clamped_to_bounds(self):
+        th = DetectorThresholds()
+        det = AdaptiveIncidentDetector(th)
+        self.feed(det, "d", 100, latency_p95_ms=500.0, airtime_busy_pct=1.0)
+        t = det.thresholds("d")
+        self.assertEqual(t["latency_p95_ms"], th.latency_p95_ms * 2)
+        self.assertEqual(t["airtime_busy_pct"], th.airtime_busy_pct * 0.5)
+
+    def test_state_round_trip(self):
+        det = AdaptiveIncidentDetector()
+        self.feed(det, "a", 50, retry_pct=10.0)
+        other = AdaptiveIncidentDetector()
+        other.load_state(json.loads(json.dumps(det.state())))
+        self.assertEqual(other.thresholds("a"), det.thresholds("a"))
+
+
+class TestCoreWiring(unittest.TestCase):
+
+    def test_core_learns_on_ingest(self):
+        core = OBHCoreService(adapter=None, config=CoreRuntimeConfig(accelerate=True, adaptive_baselines=True))
+        for i in range(5):
+            core.ingest(ms(retry_pct=10.0), [], [])
+        n, mean, _ = core.recognition.detector.baseline().stats(1)
+        self.assertEqual((n, mean), (5, 10.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for background recognition in the core loop: OBHCoreService publishes a versioned,
+immutable RecognitionSnapshot per ingested sample; readers never trigger recognition.
+"""
+
+import dataclasses
+import tempfile
+import unittest
+from unittest import mock
+
+from dae_p1.M00_common import MetricSample, set_clock
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+from dae_p1.adapters.demo_adapter import DemoAdapter
+from dae_p1.status_helper import calculate_simple_status
+
+try:
+    from fastapi.testclient import TestClient  # optional: API endpoint tests
+    import server
+except ImportError:
+    TestClient = None
+
+BAD = dict(airtime_busy_pct=90.0, retry_pct=40.0)
+
+
+def make_core(every="ws"):
+    return OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True,
+                                                           recognize_every=every))
+
+
+def feed(core, ts, **kw):
+    core.ingest(MetricSample(ts=float(ts), window_ref=f"Ws:{int(ts) // 10 * 10}", **kw), [], [])
+
+
+class TestBackgroundRecognition(unittest.TestCase):
+
+    def setUp(self):
+        set_clock(lambda: 0.0)
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_version_per_tick_and_once_per_ws(self):
+        core = make_core("ws")
+        self.assertEqual(core.latest.version, 0)
+        calls = []
+        gen = core.generate_recognition
+        core.generate_recognition = lambda: calls.append(1) or gen()
+        for t in range(25):
+            feed(core, t, **BAD)
+        self.assertEqual(core.latest.version, 25)
+        self.assertEqual(len(calls), 3)  # Ws:0, Ws:10, Ws:20
+        self.assertEqual(core.latest.recognized_ts, 20.0)
+        self.assertEqual(core.latest.ts, 24.0)
+
+    def test_tick_and_off(self):
+        tick, off = make_core("tick"), make_core("off")
+        for t in range(5):
+            feed(tick, t, **BAD)
+            feed(off, t, **BAD)
+        self.assertEqual(tick.latest.recognized_ts, 4.0)
+        self.assertIsNone(off.latest.recognition)
+        self.assertEqual(off.latest.version, 5)
+        # Nothing published: reads report that and never recognize (no episode bookkeeping)
+        for _ in range(3):
+            self.assertEqual(off.published(), (off.latest, None))
+        self.assertEqual(off.recognition.episodes.open, {})
+        with tempfile.TemporaryDirectory() as d, self.assertRaises(RuntimeError):
+            off.obh_export(d)
+        # On-demand recognition stays available to the core's own thread
+        self.assertEqual(off.generate_recognition().primary_verdict, tick.latest.recognition.primary_verdict)
+
+    def test_polling_does_not_recognize(self):
+        core = make_core("ws")
+        for t in range(12):
+            feed(core, t, **BAD)
+        snap = core.latest
+        ep = core.recognition.episodes.open[snap.recognition.primary_verdict]
+        before = (ep.bad_windows, ep.last_bad_ts, ep.evidence_refs)
+        for _ in range(50):
+            self.assertIs(core.latest_recognition(), snap.recognition)
+            calculate_simple_status(core)
+        self.assertIs(core.latest, snap)
+        self.assertEqual((ep.bad_windows, ep.last_bad_ts, ep.evidence_refs), before)
+
+    def test_snapshot_immutable_and_status_same_tick(self):
+        core = make_core("ws")
+        feed(core, 0, **BAD)
+        snap = core.latest
+        self.assertEqual(snap.status.status, "investigation")
+        self.assertEqual(calculate_simple_status(core), "investigation")
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snap.version = 99
+        feed(core, 1)
+        self.assertIsNot(core.latest, snap)
+        self.assertEqual(snap.version, 1)
+
+    def test_obh_export_uses_snapshot(self):
+        core = make_core("ws")
+        for t in range(3):
+            feed(core, t, **BAD)
+        calls = []
+        core.generate_recognition = lambda: calls.append(1)
+        with tempfile.TemporaryDirectory() as d:
+            core.obh_export(d)
+        self.assertEqual(calls, [])
+
+    def test_published_reads_one_snapshot(self):
+        core = make_core("ws")
+        feed(core, 0, **BAD)
+        snap, rec = core.published()
+        self.assertIs(snap, core.latest)
+        self.assertIs(rec, snap.recognition)
+
+    @unittest.skipUnless(TestClient, "fastapi not installed")
+    def test_polling_endpoints_does_not_recognize(self):
+        core = make_core("ws")
+        for t in range(12):
+            feed(core, t, **BAD)
+        ep = core.recognition.episodes.open[core.latest.recognition.primary_verdict]
+        before = (ep.bad_windows, ep.evidence.total, ep.evidence_refs)
+        client = TestClient(server.app)
+        with mock.patch.object(server, "core", core):
+            for _ in range(5):
+                fleet = client.get("/fleet/recognition").json()
+                rec = client.get("/recognition").json()
+                status = client.get("/status").json()
+        self.assertEqual((ep.bad_windows, ep.evidence.total, ep.evidence_refs), before)
+        self.assertEqual([r["device_id"] for r in fleet], ["local"])
+        self.assertEqual(fleet[0]["evidence_refs"], core.latest.recognition.evidence_refs)
+        self.assertEqual((fleet[0]["version"], rec["version"], status["version"]), (12, 12, 12))
+        self.assertEqual(rec["episode_id"], status["episode_id"])
+
+    @unittest.skipUnless(TestClient, "fastapi not installed")
+    def test_endpoints_before_recognition(self):
+        core = make_core("off")
+        feed(core, 0, **BAD)
+        client = TestClient(server.app)
+        with mock.patch.object(server, "core", core):
+            rec = client.get("/recognition").json()
+            fleet = client.get("/fleet/recognition").json()
+        self.assertEqual(rec, {"status": "not_recognized", "version": 1})
+        self.assertEqual(fleet, [])
+        self.assertEqual(core.recognition.episodes.open, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
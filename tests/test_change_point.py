@@ -0,0 +1,80 @@
+"""
+Tests for streaming change-point detection (M07B) and onset-aware episodes.
+"""
+
+import unittest
+
+from dae_p1.M00_common import MetricSample
+from dae_p1.M07_incident_detector import IncidentDetector
+from dae_p1.M07B_change_point import ChangePointDetector
+from dae_p1.M16_recognition_engine import RecognitionEngine
+from dae_p1.M17_demo_simulator import generate_scenario
+
+
+def samples(name):
+    return [MetricSample(ts=1000.0 + p["t"], window_ref="", retry_pct=p["retry_ratio"] * 100,
+                         airtime_busy_pct=p["airtime_busy"] * 100) for p in generate_scenario(name)]
+
+
+class TestChangePointDetector(unittest.TestCase):
+
+    def test_degrading_fires_long_before_thresholds(self):
+        cp, det = ChangePointDetector(), IncidentDetector()
+        fired_at = first_bad = None
+        for m in samples("degrading"):
+            if cp.update(m) and fired_at is None:
+                fired_at = m.ts
+            if first_bad is None and det.is_bad_window(m)[0]:
+                first_bad = m.ts
+        self.assertIsNotNone(fired_at)
+        self.assertLess(fired_at + 300, first_bad)
+        onset = cp.earliest_onset()
+        self.assertLessEqual(onset.onset_ts, fired_at)
+        self.assertEqual(onset.onset_window_ref, "Ws:%d" % (int(onset.onset_ts) // 10 * 10))
+
+    def test_stable_stays_quiet(self):
+        cp = ChangePointDetector()
+        fired = [c for m in samples("stable") for c in cp.update(m)]
+        self.assertEqual(fired, [])
+
+    def test_step_and_recovery_sinr_falling(self):
+        cp = ChangePointDetector(warmup=10)
+        ts = 0.0
+        for i in range(40):
+            ts += 1
+            cp.update(MetricSample(ts=ts, window_ref="", wan_sinr_db=20.0 + (i % 2) * 0.2))
+        fired = []
+        for _ in range(10):
+            ts += 1
+            fired += cp.update(MetricSample(ts=ts, window_ref="", wan_sinr_db=10.0))
+        self.assertEqual([c.field for c in fired], ["wan_sinr_db"])
+        self.assertEqual(fired[0].onset_ts, 41.0)
+        for _ in range(50):
+            ts += 1
+            cp.update(MetricSample(ts=ts, window_ref="", wan_sinr_db=20.0))
+        self.assertEqual(cp.active(), [])
+
+    def test_devices_are_independent(self):
+        cp = ChangePointDetector(warmup=5)
+        for i in range(20):
+            cp.update(MetricSample(ts=float(i), window_ref="", latency_p95_ms=20.0), "a")
+            cp.update(MetricSample(ts=float(i), window_ref="", latency_p95_ms=20.0 + (200 if i > 10 else 0)), "b")
+        self.assertEqual(cp.active("a"), [])
+        self.assertEqual(len(cp.active("b")), 1)
+
+
+class TestOnsetEpisode(unittest.TestCase):
+
+    def test_episode_starts_at_onset(self):
+        eng = RecognitionEngine()
+        ms = samples("degrading")
+        for m in ms[:200]:
+            eng.changepoints.update(m)
+        rec = eng.recognize(ms[199], [], worst_window_ref="Wl:1140")
+        onset = eng.changepoints.earliest_onset()
+        self.assertEqual(rec.episode_start, onset.onset_ts)
+        self.assertEqual(rec.onset_window_ref, onset.onset_window_ref)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for the M09 episode lifecycle: hysteresis, concurrent verdict episodes,
+run-length evidence ring and archived history.
+"""
+
+import unittest
+
+from dae_p1.M00_common import MetricSample, set_clock
+from dae_p1.M09_episode_manager import EpisodeManager, EvidenceRing
+from dae_p1.M16_recognition_engine import RecognitionEngine
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestEpisodeManager(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        set_clock(self.clock)
+        self.em = EpisodeManager(close_after=3)
+
+    def tearDown(self):
+        set_clock(None)
+
+    def feed(self, w, is_bad, verdict="WIFI_CONGESTION"):
+        self.clock.t = 1000.0 + 10 * w
+        return self.em.observe(f"Ws:{w}", is_bad, verdict, f"Ws:{w}:x", "Wl:0")
+
+    def test_close_after_good_windows(self):
+        ep = self.feed(0, True)
+        for w in (1, 2):
+            self.feed(w, False)
+            self.assertIn(ep, self.em.open_episodes())
+        self.feed(3, False)
+        self.assertEqual(self.em.open_episodes(), [])
+        closed = self.em.history[-1]
+        self.assertEqual((closed.episode_id, closed.bad_windows, closed.end_ts), (ep.episode_id, 1, 1000.0))
+
+    def test_bad_window_resets_streak(self):
+        ep = self.feed(0, True)
+        self.feed(1, False)
+        self.feed(2, False)
+        self.assertIs(self.feed(3, True), ep)
+        self.feed(4, False)
+        self.assertEqual(len(self.em.open_episodes()), 1)
+
+    def test_repeated_window_does_not_advance(self):
+        self.feed(0, True)
+        for _ in range(10):
+            self.feed(1, False)
+        self.assertEqual(len(self.em.open_episodes()), 1)
+
+    def test_concurrent_verdicts(self):
+        a = self.feed(0, True, "WAN_UNSTABLE")
+        b = self.feed(1, True, "WIFI_CONGESTION")
+        self.assertNotEqual(a.episode_id, b.episode_id)
+        self.assertEqual(len(self.em.open_episodes()), 2)
+        for w in (2, 3):
+            self.feed(w, True, "WIFI_CONGESTION")
+        # three windows not bad for WAN_UNSTABLE -> closed; congestion stays open
+        self.assertEqual([e.verdict for e in self.em.open_episodes()], ["WIFI_CONGESTION"])
+        self.assertEqual(self.em.history[-1].verdict, "WAN_UNSTABLE")
+
+    def test_open_after(self):
+        em = EpisodeManager(open_after=2)
+        self.assertIsNone(em.observe("Ws:0", True, "MESH_FLAP", "e", "Wl:0"))
+        self.assertIsNone(em.observe("Ws:0", True, "MESH_FLAP", "e", "Wl:0"))
+        self.assertIsNotNone(em.observe("Ws:1", True, "MESH_FLAP", "e", "Wl:0"))
+
+    def test_evidence_ring_rle_bounded(self):
+        ring = EvidenceRing(maxlen=4)
+        for ref in ["a", "a", "a", "b"] + [f"c{i}" for i in range(5)]:
+            ring.add(ref)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.total, 9)
+        ring = EvidenceRing()
+        for _ in range(1000):
+            ring.add("Ws:1:RETRY_HIGH")
+        self.assertEqual(ring.refs(), ["Ws:1:RETRY_HIGH x1000"])
+
+
+class TestRecognitionLifecycle(unittest.TestCase):
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_polling_does_not_grow_and_recovers(self):
+        clock = _Clock()
+        set_clock(clock)
+        eng = RecognitionEngine()
+        bad = MetricSample(ts=0.0, window_ref="Ws:0", airtime_busy_pct=90.0, retry_pct=40.0)
+        for _ in range(500):
+            rec = eng.recognize(bad, [], "Wl:0")
+        self.assertEqual(len(eng.episodes.current.evidence), 1)
+        self.assertEqual(len(rec.evidence_refs), 1)
+        for w in range(1, 4):
+            clock.t += 10
+            eng.recognize(MetricSample(ts=10.0 * w, window_ref=f"Ws:{w}"), [], "Wl:0")
+        self.assertEqual(eng.episodes.open_episodes(), [])
+        self.assertEqual(eng.episodes.history[-1].episode_id, rec.episode_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
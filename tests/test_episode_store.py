@@ -0,0 +1,116 @@
+"""
+Tests for the SQLite episode store (M09A) and its wiring behind EpisodeManager.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from dae_p1.M00_common import MetricSample, set_clock
+from dae_p1.M09_episode_manager import ClosedEpisode, EpisodeManager
+from dae_p1.M09A_episode_store import EpisodeStore
+from dae_p1.adapters.demo_adapter import DemoAdapter
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+
+
+def closed(i, verdict="WAN_UNSTABLE", conf=0.7, device="local", change_ref=None):
+    return ClosedEpisode(episode_id=f"ep-{i}", verdict=verdict, start_ts=1000.0 + 100 * i,
+                         end_ts=1050.0 + 100 * i, worst_window_ref=f"Wl:{i}", bad_windows=3,
+                         evidence_refs=(f"Ws:{i}:WAN_LOW_SINR",), device_id=device,
+                         confidence=conf, change_ref=change_ref)
+
+
+class TestEpisodeStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = EpisodeStore(batch_size=4, flush_interval_sec=3600)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_filters(self):
+        for i in range(10):
+            self.store.add(closed(i, verdict="WAN_UNSTABLE" if i % 2 else "WIFI_CONGESTION",
+                                  conf=0.7 if i < 5 else 0.4, change_ref="chg-1" if i == 3 else None))
+        got = self.store.query(verdict="WAN_UNSTABLE", min_confidence=0.6)
+        self.assertEqual([e["episode_id"] for e in got], ["ep-3", "ep-1"])
+        self.assertEqual(got[0]["evidence_refs"], ["Ws:3:WAN_LOW_SINR"])
+        # overlap with [1320, 1420]: ep-3 (1300-1350) and ep-4 (1400-1450)
+        self.assertEqual({e["episode_id"] for e in self.store.query(since=1320, until=1420)}, {"ep-3", "ep-4"})
+        self.assertEqual(self.store.query(change_ref="chg-1")[0]["episode_id"], "ep-3")
+        self.assertEqual(self.store.get("ep-7")["verdict"], "WAN_UNSTABLE")
+        self.assertIsNone(self.store.get("missing"))
+
+    def test_batched_writes_visible_to_queries(self):
+        for i in range(3):
+            self.store.add(closed(i))
+        self.assertEqual(len(self.store._pending), 3)
+        self.assertEqual(self.store.count(), 3)
+        self.assertEqual(len(self.store._pending), 0)
+
+    def test_indexed_lookups(self):
+        self.assertIn("ix_episodes_verdict_start", self.store.explain(verdict="WAN_UNSTABLE"))
+        self.assertIn("ix_episodes_device_start", self.store.explain(device_id="local"))
+        self.assertIn("ix_episodes_change_ref", self.store.explain(change_ref="x"))
+
+    def test_persists_across_reopen(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "episodes.db")
+            s = EpisodeStore(path)
+            s.add(closed(1))
+            s.close()
+            s = EpisodeStore(path)
+            self.assertEqual(s.count(), 1)
+            s.close()
+
+    def test_due_flush_without_further_writes(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "episodes.db")
+            s = EpisodeStore(path, flush_interval_sec=3600)
+            s.add(closed(1))
+            s.flush_if_due()
+            self.assertEqual(len(s._pending), 1)
+            s.flush_interval_sec = 0
+            s.flush_if_due()
+            # Visible to another connection (a killed process keeps it) before close()
+            with sqlite3.connect(path) as other:
+                self.assertEqual(other.execute("SELECT COUNT(*) FROM episodes").fetchone()[0], 1)
+            s.close()
+
+
+class TestManagerArchivesToStore(unittest.TestCase):
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_closed_episode_stored(self):
+        set_clock(lambda: 2000.0)
+        store = EpisodeStore()
+        em = EpisodeManager(close_after=2, store=store, device_id="cpe-7")
+        ep = em.observe("Ws:0", True, "WAN_UNSTABLE", "e", "Wl:0", confidence=0.7, change_ref="chg-9")
+        em.observe("Ws:1", False, "OPAQUE_RISK", "e", "Wl:0")
+        self.assertEqual(store.count(), 0)
+        em.observe("Ws:2", False, "OPAQUE_RISK", "e", "Wl:0")
+        row = store.query(device_id="cpe-7")[0]
+        self.assertEqual((row["episode_id"], row["confidence"], row["change_ref"]), (ep.episode_id, 0.7, "chg-9"))
+        store.close()
+
+    def test_core_close_archives_open_episodes(self):
+        set_clock(lambda: 0.0)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "episodes.db")
+            core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True,
+                                                                   episode_store_path=path))
+            for t in range(5):
+                core.ingest(MetricSample(ts=float(t), window_ref="Ws:0", airtime_busy_pct=90.0, retry_pct=40.0),
+                            [], [])
+            self.assertTrue(core.recognition.episodes.open)
+            core.close()
+            s = EpisodeStore(path)
+            self.assertEqual(s.count(), 1)
+            s.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
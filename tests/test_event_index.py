@@ -0,0 +1,90 @@
+"""
+Tests for the change-event interval index (M06A) and its use in recognition/status.
+"""
+
+import unittest
+
+from dae_p1.M00_common import ChangeEventCard, MetricSample, VersionRefs, set_clock
+from dae_p1.M06A_event_index import IntervalIndex
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+from dae_p1.adapters.demo_adapter import DemoAdapter
+from dae_p1.status_helper import calculate_simple_status
+
+
+def ev(t, change_ref=None):
+    return ChangeEventCard(event_time=float(t), event_type="config_change", origin_hint="user",
+                           change_ref=change_ref, version_refs=VersionRefs(fw="1.0"))
+
+
+def index(times, maxlen=100):
+    idx = IntervalIndex(maxlen, key=lambda e: e.event_time)
+    for t in times:
+        idx.add(ev(t, change_ref=f"c{t}"))
+    return idx
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def test_range_and_out_of_order(self):
+        idx = index([10, 20, 40, 30, 50])
+        self.assertEqual([e.event_time for e in idx.range(20, 40)], [20.0, 30.0, 40.0])
+        self.assertEqual([e.event_time for e in idx.lookback(45, 20)], [30.0, 40.0])
+        self.assertEqual(idx.range(60, 70), [])
+
+    def test_windows(self):
+        idx = index([5, 9, 10, 19, 20])
+        self.assertEqual([e.event_time for e in idx.in_window("Ws:10")], [10.0, 19.0])
+        # Ws window of ts=14 is [10, 20); lookback 5 -> [5, 20)
+        self.assertEqual([e.event_time for e in idx.for_window(14, 5)], [5.0, 9.0, 10.0, 19.0])
+
+    def test_eviction_matches_maxlen(self):
+        idx = index(range(100), maxlen=16)
+        self.assertEqual([e.event_time for e in idx.range()], [float(t) for t in range(84, 100)])
+        self.assertEqual(idx.range(0, 50), [])
+
+    def test_sort_merge_join_matches_lookups(self):
+        idx = index(range(0, 1000, 7))
+        bad = [float(t) for t in range(0, 1000, 13)]
+        joined = idx.join(bad, 30)
+        self.assertEqual(len(joined), len(bad))
+        for t, evs in joined:
+            self.assertEqual(evs, idx.lookback(t, 30))
+
+
+class TestCoreUsesWindowEvents(unittest.TestCase):
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_old_event_not_used_for_observability(self):
+        set_clock(lambda: 5000.0)
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True,
+                                                                  recognize_every="off"))
+        bad = dict(airtime_busy_pct=90.0, retry_pct=40.0)
+        # Fully referenced change long before the bad window
+        core.ingest(MetricSample(ts=1000.0, window_ref="Ws:1000"), [ev(1000, change_ref="old")], [])
+        core.ingest(MetricSample(ts=5000.0, window_ref="Ws:5000", **bad), [], [])
+        self.assertEqual(calculate_simple_status(core), "suspected")
+        rec = core.generate_recognition()
+        self.assertEqual(rec.observability.observability_status, "INSUFFICIENT")
+
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True,
+                                                                  recognize_every="off"))
+        core.ingest(MetricSample(ts=4900.0, window_ref="Ws:4900"), [ev(4900, change_ref="recent")], [])
+        core.ingest(MetricSample(ts=5000.0, window_ref="Ws:5000", **bad), [], [])
+        self.assertEqual(calculate_simple_status(core), "unstable")
+        rec = core.generate_recognition()
+        self.assertEqual(rec.observability.observability_status, "SUFFICIENT")
+
+    def test_bad_window_events(self):
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True))
+        for t in range(0, 1000, 10):
+            evs = [ev(t, change_ref=f"c{t}")] if t in (100, 700) else []
+            metrics = dict(airtime_busy_pct=90.0, retry_pct=40.0) if t in (200, 500, 750) else {}
+            core.ingest(MetricSample(ts=float(t), window_ref="", **metrics), evs, [])
+        joined = {t: [e.change_ref for e in evs] for t, evs in core.bad_window_events(lookback_sec=150)}
+        self.assertEqual(joined, {200.0: ["c100"], 500.0: [], 750.0: ["c700"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
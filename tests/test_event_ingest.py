@@ -0,0 +1,87 @@
+"""
+Tests for batched change-event ingestion (coalescing, classification, backpressure).
+"""
+
+import unittest
+
+from dae_p1.M00_common import VersionRefs, set_clock
+from dae_p1.M01_windowing import Windowing
+from dae_p1.adapters import platform_access_stub as pas
+from dae_p1.adapters.event_ingest import EventClassTable, EventIngestor
+from dae_p1.adapters.PON_adapter import PONAdapter
+
+
+def ev(etype, scope="wan", change_ref=None, origin="local"):
+    return {"event_type": etype, "origin_hint": origin, "target_scope": scope, "change_ref": change_ref}
+
+
+class TestEventIngestor(unittest.TestCase):
+
+    def make(self, **kw):
+        table = EventClassTable("pon", ("los", "policy_update"))
+        return EventIngestor(table, Windowing(), VersionRefs(fw="1", driver="1", agent="t"), **kw)
+
+    def test_coalesces_identical_consecutive_events(self):
+        ing = self.make()
+        evs, snaps = ing.ingest([ev("los")] * 100 + [ev("config_change")] + [ev("los")] * 3)
+        self.assertEqual([(e.event_type, e.count) for e in evs],
+                         [("los", 100), ("config_change", 1), ("los", 3)])
+        self.assertEqual(len(snaps), 2)  # one per "los" run, none for config_change
+        self.assertEqual(ing.stats["coalesced"], 101)
+
+    def test_distinct_change_refs_not_merged(self):
+        evs, _ = self.make().ingest([ev("policy_update", change_ref="a"), ev("policy_update", change_ref="b")])
+        self.assertEqual([e.change_ref for e in evs], ["a", "b"])
+
+    def test_coalesce_disabled(self):
+        evs, _ = self.make(coalesce=False).ingest([ev("los")] * 5)
+        self.assertEqual(len(evs), 5)
+
+    def test_budget_defers_to_next_tick(self):
+        ing = self.make(max_cards_per_tick=3)
+        raw = [ev("e%d" % i) for i in range(5)]
+        first, _ = ing.ingest(raw)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(ing.stats["deferred"], 2)
+        second, _ = ing.ingest([])
+        self.assertEqual([e.event_type for e in second], ["e3", "e4"])
+
+    def test_deferred_events_keep_first_seen_time(self):
+        ing = self.make(max_cards_per_tick=2)
+        try:
+            set_clock(lambda: 1005.0)
+            first, _ = ing.ingest([ev("e%d" % i) for i in range(3)])
+            set_clock(lambda: 1012.0)
+            second, _ = ing.ingest([ev("late")])
+        finally:
+            set_clock(None)
+        self.assertEqual([(e.event_type, e.event_time, e.window_ref) for e in first + second],
+                         [("e0", 1005.0, "Ws:1000"), ("e1", 1005.0, "Ws:1000"),
+                          ("e2", 1005.0, "Ws:1000"), ("late", 1012.0, "Ws:1010")])
+
+    def test_overflow_reported_as_single_card(self):
+        ing = self.make(max_cards_per_tick=4, max_pending=2)
+        evs, _ = ing.ingest([ev("e%d" % i) for i in range(10)])
+        self.assertEqual([e.event_type for e in evs], ["e0", "e1", "event_overflow"])
+        self.assertEqual(evs[-1].count, 8)
+        self.assertEqual(ing.stats["dropped"], 8)
+        again, _ = ing.ingest([])
+        self.assertEqual(again, [])
+
+
+class TestAdapterWiring(unittest.TestCase):
+
+    def tearDown(self):
+        pas.set_backend(pas.PlatformBackend())
+
+    def test_pon_adapter_uses_ingestor(self):
+        backend = pas.LocalLatencyBackend()
+        backend.pending_events = [ev("los")] * 50 + [ev("re_range", scope="pon")]
+        pas.set_backend(backend)
+        evs, snaps = PONAdapter().collect_change_events_and_snapshots()
+        self.assertEqual([(e.event_type, e.count) for e in evs], [("los", 50), ("re_range", 1)])
+        self.assertEqual([s.snapshot_scope for s in snaps], ["wan", "pon"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for the derived-feature columns computed at ingest (core_service.FeatureColumns).
+"""
+
+import math
+import unittest
+from dataclasses import asdict
+
+from dae_p1.M00_common import MetricSample
+from dae_p1.M07C_oscillation_analyzer import OscillationAnalyzer
+from dae_p1.M13_fp_lite import ProofCardGenerator
+from dae_p1.M17_demo_simulator import generate_scenario
+from dae_p1.adapters.DOCSIS_adapter import DOCSISAdapter
+from dae_p1.core_service import DERIVED_FEATURES, FeatureColumns, resolve_features
+
+
+def sample(ts, **kw):
+    return MetricSample(ts=float(ts), window_ref="", **kw)
+
+
+class TestFeatureColumns(unittest.TestCase):
+
+    def test_derivations_and_missing(self):
+        fc = FeatureColumns(DERIVED_FEATURES, maxlen=10)
+        fc.append(sample(0, in_rate=30.0, out_rate=12.5, signal_strength_pct=80.0, latency_p95_ms=42.0))
+        fc.append(sample(1))
+        self.assertEqual(fc.column("throughput_mbps")[0], 42.5)
+        self.assertEqual(fc.column("backhaul_rssi")[0], -60.0)
+        self.assertEqual(fc.column("rtt_ms")[0], 42.0)
+        self.assertTrue(math.isnan(fc.column("throughput_mbps")[1]))
+        self.assertTrue(math.isnan(fc.column("us_rtt_ms")[0]))
+
+    def test_ring_wraparound_keeps_time_order(self):
+        fc = FeatureColumns(DERIVED_FEATURES, maxlen=4)
+        for t in range(10):
+            fc.append(sample(t, latency_p95_ms=float(t)))
+        self.assertEqual(len(fc), 4)
+        self.assertEqual(list(fc.column("rtt_ms")), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(list(fc.window(2)["rtt_ms"]), [8.0, 9.0])
+        for head in range(4):
+            fc = FeatureColumns(DERIVED_FEATURES, maxlen=4)
+            for t in range(8 + head):
+                fc.append(sample(t, latency_p95_ms=float(t)))
+            for last in (1, 2, 3, 4, 9):
+                expected = [float(t) for t in range(8 + head)][-min(last, 4):]
+                self.assertEqual(list(fc.column("rtt_ms", last)), expected, (head, last))
+
+    def test_unsourced_features_dropped(self):
+        names = {f.name for f in resolve_features(DERIVED_FEATURES, {})}
+        self.assertNotIn("us_rtt_ms", names)
+        self.assertIn("rtt_ms", names)
+
+    def test_adapter_aliases(self):
+        specs = resolve_features(DERIVED_FEATURES, DOCSISAdapter.FEATURE_ALIASES)
+        fc = FeatureColumns(specs, maxlen=4)
+        fc.append(sample(0, latency_p95_ms=20.0, wan_sinr_db=38.0))
+        self.assertEqual(fc.column("us_rtt_ms")[0], 20.0)
+        self.assertEqual(fc.column("ofdm_mer")[0], 38.0)
+
+    def test_columns_match_dict_path(self):
+        gen = ProofCardGenerator()
+        for name in ("oscillating", "stable"):
+            a = OscillationAnalyzer()
+            ms = [a.annotate(sample(1000 + p["t"], retry_pct=p["retry_ratio"] * 100,
+                                    airtime_busy_pct=p["airtime_busy"] * 100))
+                  for p in generate_scenario(name)][-100:]
+            fc = FeatureColumns(DERIVED_FEATURES, maxlen=100)
+            for m in ms:
+                fc.append(m)
+            by_dict = gen.generate([asdict(m) for m in ms], "WIFI78_OSCILLATION_GUARD", "W")
+            by_cols = gen.generate([], "WIFI78_OSCILLATION_GUARD", "W", columns=fc.window())
+            self.assertEqual(by_cols["verdict"], by_dict["verdict"])
+            self.assertEqual(by_cols["reason_code"], by_dict["reason_code"])
+
+
+if __name__ == '__main__':
+    unittest.main()
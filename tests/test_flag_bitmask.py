@@ -0,0 +1,61 @@
+"""
+Tests for the IntFlag badness-flag representation (M07 Flag) through the detector,
+classifier, episode evidence and recognition, with names rendered only on output.
+"""
+
+import unittest
+
+from dae_p1.M00_common import MetricSample, set_clock
+from dae_p1.M07_incident_detector import FLAG_BITS, FLAG_NAMES, Flag, IncidentDetector, flag_label, flags_from_mask
+from dae_p1.M07A_flag_index import FlagBitmapIndex
+from dae_p1.M08_verdict_classifier import VerdictClassifier
+from dae_p1.M09_episode_manager import EvidenceRing
+from dae_p1.M16_recognition_engine import RecognitionEngine
+
+BAD = MetricSample(ts=0.0, window_ref="Ws:0", airtime_busy_pct=90.0, retry_pct=40.0, latency_p95_ms=80.0)
+
+
+class TestFlagBitmask(unittest.TestCase):
+
+    def test_layout_matches_names(self):
+        self.assertEqual(FLAG_NAMES, tuple(f.name for f in Flag))
+        self.assertEqual(FLAG_BITS, {f.name: f.value for f in Flag})
+        self.assertEqual(flags_from_mask(Flag.RETRY_HIGH | Flag.WAN_LOW_SINR), ["RETRY_HIGH", "WAN_LOW_SINR"])
+        self.assertEqual(flag_label(0), "no_flags")
+
+    def test_detector_and_classifier_on_masks(self):
+        det, clf = IncidentDetector(), VerdictClassifier()
+        is_bad, mask = det.judge(BAD)
+        self.assertIsInstance(mask, Flag)
+        self.assertEqual(mask, Flag.AIRTIME_HIGH | Flag.RETRY_HIGH | Flag.LAT_SPIKE)
+        self.assertEqual((is_bad, flags_from_mask(mask)), det.is_bad_window(BAD))
+        for m in range(1 << len(FLAG_NAMES)):
+            for opaque in (False, True):
+                self.assertEqual(clf.classify(Flag(m), opaque), clf.classify(flags_from_mask(m), opaque))
+
+    def test_flag_index_queries_with_flags(self):
+        idx = FlagBitmapIndex(maxlen=100)
+        for t in range(10):
+            idx.append(MetricSample(ts=float(t), window_ref="", retry_pct=40.0 if t % 2 else 0.0,
+                                    airtime_busy_pct=90.0 if t % 3 == 0 else 0.0))
+        self.assertEqual(idx.query(all_of=Flag.AIRTIME_HIGH | Flag.RETRY_HIGH), [3.0, 9.0])
+
+    def test_evidence_rendered_on_read(self):
+        ring = EvidenceRing(4)
+        ring.add(("Ws:0", Flag.AIRTIME_HIGH | Flag.RETRY_HIGH))
+        ring.add(("Ws:0", Flag.AIRTIME_HIGH | Flag.RETRY_HIGH))
+        ring.add(("Ws:10", Flag(0)))
+        self.assertEqual(ring.refs(), ["Ws:0:AIRTIME_HIGH,RETRY_HIGH x2", "Ws:10:no_flags"])
+
+    def test_recognition_renders_names(self):
+        set_clock(lambda: 0.0)
+        try:
+            rec = RecognitionEngine().recognize(BAD, [], "Wl:0")
+        finally:
+            set_clock(None)
+        self.assertEqual(rec.evidence_refs, ["Ws:0:AIRTIME_HIGH,RETRY_HIGH,LAT_SPIKE"])
+        self.assertEqual(rec.primary_verdict, "OPAQUE_RISK")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for batch flag masks (M07) and the flag bitmap index (M07A).
+"""
+
+import random
+import unittest
+from array import array
+from unittest import mock
+
+from dae_p1 import M07_incident_detector
+from dae_p1.M00_common import MetricSample
+from dae_p1.M07_incident_detector import IncidentDetector, FLAG_BITS, flags_from_mask
+from dae_p1.M07A_flag_index import FlagBitmapIndex, BAD_BIT, CHUNK_BITS, bits_for
+
+
+def sample(ts, rnd):
+    pick = lambda v: v if rnd.random() > 0.1 else None
+    return MetricSample(ts=float(ts), window_ref="Ws:0",
+                        airtime_busy_pct=pick(rnd.uniform(40, 95)), retry_pct=pick(rnd.uniform(0, 30)),
+                        latency_p95_ms=pick(rnd.uniform(10, 120)), mesh_flap_count=pick(rnd.randint(0, 3)),
+                        wan_sinr_db=pick(rnd.uniform(0, 25)))
+
+
+class TestFlagMasks(unittest.TestCase):
+
+    def test_batch_matches_per_sample(self):
+        rnd = random.Random(1)
+        det = IncidentDetector()
+        samples = [sample(i, rnd) for i in range(500)]
+        masks = det.flag_masks(samples)
+        for m, mask in zip(samples, masks):
+            self.assertEqual(flags_from_mask(mask), det.badness_flags(m))
+            self.assertEqual(det.is_bad_mask(mask), det.is_bad_window(m)[0])
+
+    @unittest.skipUnless(M07_incident_detector.np, "NumPy not installed")
+    def test_numpy_and_pure_python_agree(self):
+        rnd = random.Random(2)
+        det = IncidentDetector()
+        samples = [sample(i, rnd) for i in range(500)]
+        fields = ("airtime_busy_pct", "retry_pct", "latency_p95_ms", "mesh_flap_count", "wan_sinr_db")
+        lists = {f: [getattr(m, f) for m in samples] for f in fields}
+        arrays = {f: array("d", (float("nan") if v is None else v for v in col)) for f, col in lists.items()}
+        for cols in (lists, arrays):
+            vectorized = det.flag_masks_columns(cols, len(samples))
+            with mock.patch.object(M07_incident_detector, "np", None):
+                pure = det.flag_masks_columns(cols, len(samples))
+            self.assertEqual(vectorized, pure)
+
+
+class TestFlagBitmapIndex(unittest.TestCase):
+
+    def setUp(self):
+        rnd = random.Random(7)
+        self.samples = [sample(i * 10, rnd) for i in range(3 * CHUNK_BITS + 100)]
+        self.det = IncidentDetector()
+
+    def brute(self, samples, t0, t1, all_of=0, any_of=0):
+        out = []
+        for m in samples:
+            mask = self.det.flag_mask(m)
+            if self.det.is_bad_mask(mask):
+                mask |= BAD_BIT
+            if t0 <= m.ts <= t1 and (mask & all_of) == all_of and (not any_of or mask & any_of):
+                out.append(m.ts)
+        return out
+
+    def test_range_queries_match_brute_force(self):
+        idx = FlagBitmapIndex(maxlen=10 ** 6)
+        for m in self.samples:
+            idx.append(m)
+        both = bits_for(["AIRTIME_HIGH", "RETRY_HIGH"])
+        for t0, t1 in ((0, 1e9), (12345, 98765), (40950, 40970)):
+            self.assertEqual(idx.query(t0, t1, all_of=both), self.brute(self.samples, t0, t1, all_of=both))
+            self.assertEqual(idx.count(t0, t1, any_of=FLAG_BITS["LAT_SPIKE"] | FLAG_BITS["MESH_FLAP"]),
+                             len(self.brute(self.samples, t0, t1,
+                                            any_of=FLAG_BITS["LAT_SPIKE"] | FLAG_BITS["MESH_FLAP"])))
+        self.assertEqual(idx.query(all_of=BAD_BIT), self.brute(self.samples, 0, 1e9, all_of=BAD_BIT))
+
+    def test_eviction_follows_maxlen(self):
+        idx = FlagBitmapIndex(maxlen=1000)
+        idx.extend(self.samples)
+        live = self.samples[-1000:]
+        self.assertEqual(len(idx), 1000)
+        self.assertEqual(idx.query(all_of=BAD_BIT), self.brute(live, 0, 1e9, all_of=BAD_BIT))
+        self.assertLess(len(idx._ts), 1000 + CHUNK_BITS)
+        ts, masks = idx.masks()
+        self.assertEqual(len(ts), 1000)
+        self.assertEqual(ts[0], live[0].ts)
+
+    def test_empty_query_rejected(self):
+        with self.assertRaises(ValueError):
+            FlagBitmapIndex(maxlen=10).query(0, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Tests for batch (fleet) recognition: RecognitionEngine.recognize_batch over M16B
+FleetBatch columns against per-device generate_recognition().
+"""
+
+import json
+import random
+import unittest
+from unittest import mock
+
+from dae_p1 import M16_recognition_engine
+from dae_p1.M00_common import ChangeEventCard, MetricSample, VersionRefs, set_clock
+from dae_p1.M07_incident_detector import FLAG_NAMES
+from dae_p1.M07E_window_aggregates import WindowStats
+from dae_p1.M16B_fleet_batch import FleetBatch
+from dae_p1.M16_recognition_engine import RecognitionEngine
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+from dae_p1.adapters.demo_adapter import DemoAdapter
+
+PROFILES = {
+    "ok": dict(airtime_busy_pct=30.0, retry_pct=3.0),
+    "congested": dict(airtime_busy_pct=90.0, retry_pct=40.0),
+    "wan": dict(wan_sinr_db=2.0, latency_p95_ms=90.0),
+    "mesh": dict(mesh_flap_count=3, retry_pct=30.0),
+}
+
+
+def fleet():
+    cores = {}
+    # k=0: no change event, k=1: fully referenced event, k=2: event without change_ref
+    for k, (p, kw) in [(k, pv) for k in range(3) for pv in PROFILES.items()]:
+        dev = f"{p}-{k}"
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True))
+        for t in range(25):
+            evs = []
+            if t == 20 and k:
+                evs = [ChangeEventCard(event_time=20.0, event_type="config_change", origin_hint="user",
+                                       change_ref=f"c-{dev}" if k == 1 else None, version_refs=VersionRefs(fw="2"))]
+            core.ingest(MetricSample(ts=float(t), window_ref=f"Ws:{t // 10 * 10}", **kw), evs, [])
+        cores[dev] = core
+    return cores
+
+
+def random_batch(n=400, seed=11):
+    rnd = random.Random(seed)
+    windows, events = [], []
+    for i in range(n):
+        samples = rnd.choice([0, 1, 6, 60])
+        bad = rnd.randint(0, samples)
+        # Fractions on and around the quorum
+        frac = {f: rnd.choice([0.0, 0.25, 0.5, 0.75, 1.0, rnd.random()]) for f in FLAG_NAMES}
+        windows.append(WindowStats(window_ref=f"Wl:{60 * i}", start=60.0 * i, samples=samples, bad=bad,
+                                   flag_frac=frac, bad_flag_frac=frac if bad else {}))
+        events.append(ChangeEventCard(event_time=0.0, event_type="config_change", origin_hint="user",
+                                      change_ref=rnd.choice([None, f"c{i}"]),
+                                      version_refs=VersionRefs(fw=rnd.choice([None, "1"])))
+                      if rnd.random() < 0.6 else None)
+    return FleetBatch.from_windows([f"d{i}" for i in range(n)], windows, [w.window_ref for w in windows], events)
+
+
+def key(r):
+    return (r.primary_verdict, r.confidence, r.worst_window_ref, r.evidence_refs, r.onset_window_ref,
+            r.observability.opaque_risk, r.observability.missing_refs)
+
+
+def stats(r):
+    # Batch columns carry counts and flag fractions, not means / p95s
+    return {k: v for k, v in r.window_stats.items() if k not in ("mean", "p95")}
+
+
+class TestFleetRecognition(unittest.TestCase):
+
+    def setUp(self):
+        set_clock(lambda: 0.0)
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_batch_matches_per_device(self):
+        single, batched = fleet(), fleet()
+        expected = {dev: core.generate_recognition() for dev, core in single.items()}
+        batch = FleetBatch.from_cores(batched)
+        recs = RecognitionEngine().recognize_batch(batch, [batched[d].recognition.episodes for d in batch.device_id],
+                                                  window_stats=True)
+        self.assertEqual(batch.device_id, list(single))
+        for dev, rec in zip(batch.device_id, recs):
+            self.assertEqual(key(rec), key(expected[dev]), dev)
+            self.assertEqual(stats(rec), stats(expected[dev]), dev)
+            self.assertEqual(sorted(batched[dev].recognition.episodes.open),
+                             sorted(single[dev].recognition.episodes.open), dev)
+        verdicts = {r.primary_verdict for r in recs}
+        self.assertTrue({"WIFI_CONGESTION", "WAN_UNSTABLE", "MESH_FLAP", "OPAQUE_RISK"} <= verdicts)
+
+    def test_posted_columns_round_trip(self):
+        batch = FleetBatch.from_cores(fleet())
+        posted = FleetBatch.from_dict(json.loads(json.dumps(batch.to_dict())))
+        eng = RecognitionEngine()
+        a, b = eng.recognize_batch(batch, window_stats=True), eng.recognize_batch(posted, window_stats=True)
+        self.assertEqual([key(r) + (r.episode_id,) for r in a], [key(r) + (r.episode_id,) for r in b])
+        self.assertEqual([r.window_stats for r in a], [r.window_stats for r in b])
+
+    @unittest.skipUnless(M16_recognition_engine.np, "NumPy not installed")
+    def test_numpy_and_pure_python_agree(self):
+        batch, eng = random_batch(), RecognitionEngine()
+        vectorized = eng.recognize_batch(batch)
+        with mock.patch.object(M16_recognition_engine, "np", None):
+            pure = eng.recognize_batch(batch)
+        self.assertEqual(vectorized, pure)
+        self.assertGreater(len({r.primary_verdict for r in pure}), 3)
+
+    def test_minimal_columns(self):
+        recs = RecognitionEngine().recognize_batch(FleetBatch.from_dict(
+            {"device_id": ["a", "b"], "window_ref": ["Wl:0", "Wl:0"], "samples": [6, 6], "bad": [0, 4],
+             "bad_flag_frac": {"AIRTIME_HIGH": [0.0, 1.0], "RETRY_HIGH": [0.0, 0.75]},
+             "obs_mask": [-1, 0], "change_ref": [None, "c1"]}), window_stats=True)
+        self.assertEqual([r.primary_verdict for r in recs], ["OPAQUE_RISK", "WIFI_CONGESTION"])
+        self.assertEqual(recs[0].observability.missing_refs, ["no_change_event_detected"])
+        self.assertEqual(recs[1].window_stats["bad_flag_frac"], {"AIRTIME_HIGH": 1.0, "RETRY_HIGH": 0.75})
+        self.assertEqual(recs[1].window_stats["start"], 0.0)
+        # Window aggregates are opt-in; observability results are shared per distinct mask
+        plain = RecognitionEngine().recognize_batch(random_batch())
+        self.assertEqual({r.window_stats for r in plain}, {None})
+        self.assertLessEqual(len({id(r.observability) for r in plain}), 8)
+        with self.assertRaises(ValueError):
+            FleetBatch.from_dict({"device_id": ["a"], "window_ref": ["Wl:0"], "samples": [1, 2], "bad": [0]})
+
+
+if __name__ == '__main__':
+    unittest.main()
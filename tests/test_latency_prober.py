@@ -0,0 +1,112 @@
+"""
+Tests for the concurrent latency prober against local TCP/UDP echo servers.
+"""
+
+import socket
+import threading
+import time
+import unittest
+
+from dae_p1.adapters.latency_prober import LatencyProber, ProbeTarget, parse_targets
+
+
+class _UdpEchoServer:
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self._stop = threading.Event()
+        self._t = threading.Thread(target=self._run, daemon=True)
+        self._t.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            self.sock.sendto(data, addr)
+
+    def close(self):
+        self._stop.set()
+        self._t.join()
+        self.sock.close()
+
+
+def _free_port():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+class TestLatencyProber(unittest.TestCase):
+
+    def setUp(self):
+        self.tcp = socket.socket()
+        self.tcp.bind(("127.0.0.1", 0))
+        self.tcp.listen(64)
+        self.udp = _UdpEchoServer()
+
+    def tearDown(self):
+        self.tcp.close()
+        self.udp.close()
+
+    def test_tcp_and_udp_round(self):
+        targets = [ProbeTarget("127.0.0.1", self.tcp.getsockname()[1]),
+                   ProbeTarget("127.0.0.1", self.udp.port, proto="udp", name="udp-echo")]
+        prober = LatencyProber(targets, timeout_sec=1.0)
+        for _ in range(5):
+            res = prober.run_round()
+        self.assertTrue(all(r is not None and r >= 0 for r in res.values()))
+        st = prober.stats("udp-echo")
+        self.assertEqual(st.samples, 5)
+        self.assertEqual(st.loss_pct, 0.0)
+        self.assertLessEqual(st.p50_ms, st.p95_ms)
+        m = prober.as_metrics()
+        self.assertEqual(m["loss_pct"], 0.0)
+        self.assertIsNotNone(m["latency_p95_ms"])
+        self.assertIsNotNone(m["jitter_ms"])
+
+    def test_refused_and_timeout_count_as_loss(self):
+        targets = [ProbeTarget("127.0.0.1", self.tcp.getsockname()[1], name="ok"),
+                   ProbeTarget("127.0.0.1", _free_port(), name="refused"),
+                   ProbeTarget("127.0.0.1", _free_port(), proto="udp", name="silent")]
+        prober = LatencyProber(targets, timeout_sec=0.2)
+        t0 = time.perf_counter()
+        prober.run_round()
+        # Probes run concurrently: one round costs about one timeout, not the sum
+        self.assertLess(time.perf_counter() - t0, 0.6)
+        self.assertEqual(prober.stats("refused").loss_pct, 100.0)
+        self.assertEqual(prober.stats("silent").loss_pct, 100.0)
+        self.assertEqual(prober.stats("ok").loss_pct, 0.0)
+        self.assertAlmostEqual(prober.summary().loss_pct, 200.0 / 3)
+
+    def test_rolling_window(self):
+        prober = LatencyProber([ProbeTarget("127.0.0.1", self.tcp.getsockname()[1], name="t")], window=3)
+        for _ in range(5):
+            prober.run_round()
+        self.assertEqual(prober.stats("t").samples, 3)
+
+    def test_background_thread(self):
+        prober = LatencyProber([ProbeTarget("127.0.0.1", self.udp.port, proto="udp", name="u")],
+                               interval_sec=0.01)
+        prober.start()
+        try:
+            deadline = time.time() + 2
+            while prober.stats("u").samples < 3 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            prober.stop()
+        self.assertGreaterEqual(prober.stats("u").samples, 3)
+
+    def test_parse_targets(self):
+        t = parse_targets("8.8.8.8:53, udp://10.0.0.1:7,[::1]:443")
+        self.assertEqual([(x.host, x.port, x.proto) for x in t],
+                         [("8.8.8.8", 53, "tcp"), ("10.0.0.1", 7, "udp"), ("::1", 443, "tcp")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Tests for MultiAdapter: per-window merge of several child adapters.
+"""
+
+import time
+import unittest
+
+from dae_p1.M00_common import MetricSample, ChangeEventCard, set_clock
+from dae_p1.adapters.base_adapter import DomainAdapter
+from dae_p1.adapters.multi_adapter import MultiAdapter, ChildSpec
+
+
+class Clock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class ScriptedAdapter(DomainAdapter):
+    """Returns queued field dicts; timestamps come from the shared clock."""
+
+    def __init__(self, clock, values, events=None, delay=0.0):
+        self.clock = clock
+        self.values = list(values)
+        self.events = list(events or [])
+        self.delay = delay
+        self.calls = 0
+
+    def collect_metric_sample(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self.calls += 1
+        v = self.values.pop(0) if len(self.values) > 1 else self.values[0]
+        return MetricSample(ts=self.clock(), window_ref="", **v)
+
+    def collect_change_events_and_snapshots(self):
+        evs, self.events = self.events, []
+        return evs, []
+
+
+class TestMultiAdapterMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        set_clock(self.clock)
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_last_value_and_field_ownership(self):
+        wan = ScriptedAdapter(self.clock, [{"latency_p95_ms": 30.0, "retry_pct": 99.0}])
+        wifi = ScriptedAdapter(self.clock, [{"retry_pct": 5.0, "airtime_busy_pct": 40.0}])
+        multi = MultiAdapter([ChildSpec(wan, 1.0, fields=["latency_p95_ms"]),
+                              ChildSpec(wifi, 1.0)], threaded=False)
+        m = multi.collect_metric_sample()
+        self.assertEqual((m.latency_p95_ms, m.retry_pct, m.airtime_busy_pct), (30.0, 5.0, 40.0))
+        self.assertEqual(m.window_ref, "Ws:1000")
+
+    def test_aggregate_within_window_and_carry_forward(self):
+        wifi = ScriptedAdapter(self.clock, [{"retry_pct": 10.0, "mesh_flap_count": 1},
+                                            {"retry_pct": 20.0, "mesh_flap_count": 2},
+                                            {"retry_pct": 30.0, "mesh_flap_count": 0}])
+        wan = ScriptedAdapter(self.clock, [{"latency_p95_ms": 50.0}])
+        multi = MultiAdapter([ChildSpec(wifi, 1.0), ChildSpec(wan, 60.0)], merge="mean",
+                             field_merge={"mesh_flap_count": "sum"}, threaded=False)
+        multi.collect_metric_sample()
+        self.clock.t += 1
+        m = multi.collect_metric_sample()
+        self.assertAlmostEqual(m.retry_pct, 15.0)
+        self.assertEqual(m.mesh_flap_count, 3)
+        self.assertEqual(wan.calls, 1)
+        # next Ws window: wifi restarts accumulation, wan (slow) carries forward
+        self.clock.t += 10
+        m = multi.collect_metric_sample()
+        self.assertAlmostEqual(m.retry_pct, 30.0)
+        self.assertEqual(m.latency_p95_ms, 50.0)
+        self.assertEqual(m.window_ref, "Ws:1010")
+        self.assertEqual(multi.provenance["retry_pct"], "live")
+        self.assertEqual(multi.provenance["latency_p95_ms"], "stale:11s")
+
+    def test_carried_values_expire(self):
+        wan = ScriptedAdapter(self.clock, [{"latency_p95_ms": 50.0}])
+        multi = MultiAdapter([ChildSpec(wan, 1.0)], max_carry_windows=2, threaded=False)
+        multi.collect_metric_sample()
+        wan.collect_metric_sample = lambda: 1 / 0  # the source dies
+        self.clock.t += 20
+        self.assertEqual(multi.collect_metric_sample().latency_p95_ms, 50.0)
+        self.clock.t += 10
+        m = multi.collect_metric_sample()
+        self.assertIsNone(m.latency_p95_ms)
+        self.assertNotIn("latency_p95_ms", multi.provenance)
+        self.assertEqual(multi.errors, {"ScriptedAdapter#0": 2})
+
+    def test_events_time_ordered(self):
+        a = ScriptedAdapter(self.clock, [{}], events=[ChangeEventCard(event_time=5.0, event_type="b")])
+        b = ScriptedAdapter(self.clock, [{}], events=[ChangeEventCard(event_time=3.0, event_type="a")])
+        multi = MultiAdapter([ChildSpec(a), ChildSpec(b)], threaded=False)
+        multi.collect_metric_sample()
+        evs, snaps = multi.collect_change_events_and_snapshots()
+        self.assertEqual([e.event_type for e in evs], ["a", "b"])
+        self.assertEqual(multi.collect_change_events_and_snapshots(), ([], []))
+
+    def test_bad_merge_mode(self):
+        with self.assertRaises(ValueError):
+            MultiAdapter([], merge="median")
+
+
+class TestMultiAdapterThreaded(unittest.TestCase):
+
+    def test_children_run_concurrently(self):
+        set_clock(None)
+        slow = [ScriptedAdapter(time.time, [{"retry_pct": float(i)}], delay=0.2) for i in range(4)]
+        multi = MultiAdapter([ChildSpec(a, 5.0, fields=["retry_pct"]) for a in slow])
+        t0 = time.monotonic()
+        multi.start()
+        while any(a.calls == 0 for a in slow) and time.monotonic() - t0 < 2.0:
+            time.sleep(0.01)
+        elapsed = time.monotonic() - t0
+        multi.stop()
+        self.assertTrue(all(a.calls >= 1 for a in slow))
+        # 4 x 0.2 s sources polled in parallel, not 0.8 s serialized
+        self.assertLess(elapsed, 0.6)
+
+    def test_first_collect_waits_for_children_and_close_stops(self):
+        set_clock(None)
+        a = ScriptedAdapter(time.time, [{"retry_pct": 7.0}], delay=0.1)
+        a.close = lambda: setattr(a, "closed", True)
+        multi = MultiAdapter([ChildSpec(a, 0.01)])
+        try:
+            self.assertEqual(multi.collect_metric_sample().retry_pct, 7.0)
+        finally:
+            multi.close()
+        calls = a.calls
+        time.sleep(0.05)
+        self.assertEqual(a.calls, calls)
+        self.assertTrue(a.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
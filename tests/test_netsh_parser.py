@@ -0,0 +1,62 @@
+"""
+Tests for the single-pass netsh interface parser (runs on any OS).
+"""
+
+import os
+import unittest
+
+from dae_p1.adapters.netsh_parser import (
+    NetshInterfaceInfo, parse_netsh_interfaces, decode_netsh, register_locale,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "netsh")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class TestNetshParser(unittest.TestCase):
+
+    def test_zh_tw(self):
+        info = parse_netsh_interfaces(decode_netsh(_fixture("zh_tw.txt")))
+        self.assertEqual(info, NetshInterfaceInfo(
+            signal_pct=87, channel=108, radio_type="802.11ac", band="5 GHz",
+            tx_rate_mbps=400, rx_rate_mbps=400, ssid="ubee",
+            bssid="34:8f:27:5b:af:6d", rssi_dbm=-53,
+        ))
+
+    def test_zh_tw_cp950(self):
+        raw = _fixture("zh_tw.txt").decode("utf-8").encode("cp950", errors="ignore")
+        info = parse_netsh_interfaces(decode_netsh(raw))
+        self.assertEqual(info.signal_pct, 87)
+        self.assertEqual(info.channel, 108)
+
+    def test_en(self):
+        info = parse_netsh_interfaces(decode_netsh(_fixture("en.txt")))
+        self.assertEqual(info.signal_pct, 92)
+        self.assertEqual(info.channel, 37)
+        self.assertEqual(info.radio_type, "802.11ax")
+        self.assertEqual(info.band, "6 GHz")
+        self.assertEqual(info.tx_rate_mbps, 2401)
+        self.assertEqual(info.rx_rate_mbps, 1921)
+
+    def test_zh_cn(self):
+        info = parse_netsh_interfaces(decode_netsh(_fixture("zh_cn.txt")))
+        self.assertEqual((info.signal_pct, info.channel, info.band), (61, 6, "2.4 GHz"))
+        self.assertEqual(info.bssid, "70:3a:0e:11:22:33")
+
+    def test_empty_output(self):
+        self.assertEqual(parse_netsh_interfaces(""), NetshInterfaceInfo())
+
+    def test_register_locale(self):
+        register_locale({"Segnale": "signal_pct"}, name="it")
+        info = parse_netsh_interfaces("    Segnale : 55%\n")
+        self.assertEqual(info.signal_pct, 55)
+        with self.assertRaises(ValueError):
+            register_locale({"X": "not_a_field"})
+
+
+if __name__ == '__main__':
+    unittest.main()
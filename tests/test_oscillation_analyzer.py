@@ -0,0 +1,93 @@
+"""
+Tests for the incremental oscillation analyzer (M07C) and the oscillation guard profile.
+"""
+
+import math
+import unittest
+from dataclasses import asdict
+
+from dae_p1.M00_common import MetricSample
+from dae_p1.M07C_oscillation_analyzer import OscillationAnalyzer, np
+from dae_p1.M13_fp_lite import ProofCardGenerator
+from dae_p1.M17_demo_simulator import generate_scenario
+
+
+def run(name):
+    a = OscillationAnalyzer()
+    return [a.annotate(MetricSample(ts=1000.0 + p["t"], window_ref="", retry_pct=p["retry_ratio"] * 100,
+                                    airtime_busy_pct=p["airtime_busy"] * 100))
+            for p in generate_scenario(name)]
+
+
+class TestOscillationAnalyzer(unittest.TestCase):
+
+    def test_oscillating_vs_stable(self):
+        osc, stable = run("oscillating"), run("stable")
+        self.assertGreater(max(m.retry_burst_count for m in osc), 5)
+        self.assertGreater(max(m.airtime_burst_count for m in osc), 5)
+        self.assertEqual(max(m.retry_burst_count for m in stable), 0)
+
+    def test_guard_profile_now_fires(self):
+        gen = ProofCardGenerator()
+        osc = gen.generate([asdict(m) for m in run("oscillating")[-100:]], "WIFI78_OSCILLATION_GUARD", "W")
+        stable = gen.generate([asdict(m) for m in run("stable")[-100:]], "WIFI78_OSCILLATION_GUARD", "W")
+        self.assertEqual(osc["verdict"], "NOT_READY")
+        self.assertEqual(stable["verdict"], "READY")
+
+    def test_guard_fires_on_airtime_bursts(self):
+        a = OscillationAnalyzer()
+        rows = [asdict(a.annotate(MetricSample(ts=float(t), window_ref="", retry_pct=5.0,
+                                               airtime_busy_pct=90.0 if (t // 3) % 2 else 40.0)))
+                for t in range(60)]
+        card = ProofCardGenerator().generate(rows[-40:], "WIFI78_OSCILLATION_GUARD", "W")
+        self.assertEqual(card["verdict"], "NOT_READY")
+        self.assertEqual(rows[-1]["retry_burst_count"], 0)
+
+    @unittest.skipUnless(np, "NumPy not installed")
+    def test_period_reaches_guard_facets(self):
+        a = OscillationAnalyzer()
+        rows = [asdict(a.annotate(MetricSample(ts=float(t), window_ref="",
+                                               retry_pct=25.0 + 20.0 * math.sin(2 * math.pi * t / 8))))
+                for t in range(80)]
+        self.assertAlmostEqual(rows[-1]["retry_osc_period_sec"], 8.0, delta=0.5)
+        card = ProofCardGenerator().generate(rows[-40:], "WIFI78_OSCILLATION_GUARD", "W")
+        facets = {f["name"]: f["value"] for f in card["outcome_facet"]}
+        self.assertAlmostEqual(facets["retry_oscillation_period_p50"], 8.0, delta=0.5)
+
+    def test_counts_roll_off_after_wl(self):
+        a = OscillationAnalyzer()
+        for t in range(20):
+            a.annotate(MetricSample(ts=float(t), window_ref="", retry_pct=40.0 if t % 2 else 10.0))
+        self.assertEqual(a.annotate(MetricSample(ts=20.0, window_ref="", retry_pct=10.0)).retry_burst_count, 20)
+        m = a.annotate(MetricSample(ts=200.0, window_ref="", retry_pct=10.0))
+        self.assertEqual(m.retry_burst_count, 0)
+
+    def test_hysteresis_ignores_chatter(self):
+        a = OscillationAnalyzer()
+        for t in range(30):
+            m = a.annotate(MetricSample(ts=float(t), window_ref="", retry_pct=25.0 + (1.5 if t % 2 else -1.5)))
+        self.assertEqual(m.retry_burst_count, 0)
+
+    def test_link_switches_and_existing_values_kept(self):
+        a = OscillationAnalyzer()
+        bands = ["6GHz", "5GHz", "6GHz", "6GHz", "5GHz"]
+        for t, band in enumerate(bands):
+            m = a.annotate(MetricSample(ts=float(t), window_ref="", band=band, channel=37))
+        self.assertEqual(m.mlo_switch_count, 3)
+        kept = a.annotate(MetricSample(ts=6.0, window_ref="", retry_pct=50.0, retry_burst_count=9))
+        self.assertEqual(kept.retry_burst_count, 9)
+
+    @unittest.skipUnless(np, "NumPy not installed")
+    def test_dominant_period_with_missing_samples(self):
+        a = OscillationAnalyzer()
+        for t in range(128):
+            # retry_pct only on every other sample; airtime on all of them
+            a.annotate(MetricSample(ts=float(t), window_ref="",
+                                    retry_pct=25.0 + 20.0 * math.sin(2 * math.pi * t / 16) if t % 2 == 0 else None,
+                                    airtime_busy_pct=70.0 + 20.0 * math.sin(2 * math.pi * t / 8)))
+        self.assertAlmostEqual(a.dominant_period("retry_pct"), 16.0, delta=1.0)
+        self.assertAlmostEqual(a.dominant_period("airtime_busy_pct"), 8.0, delta=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
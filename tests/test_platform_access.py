@@ -0,0 +1,61 @@
+"""
+Tests for platform_access_stub bulk reads and the FWA/DOCSIS/PON adapters.
+"""
+
+import unittest
+
+from dae_p1.adapters import platform_access_stub as pas
+from dae_p1.adapters.FWA_adapter import FWAAdapter
+from dae_p1.adapters.DOCSIS_adapter import DOCSISAdapter
+from dae_p1.adapters.PON_adapter import PONAdapter
+
+
+class TestBulkRead(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = pas.LocalLatencyBackend({
+            "wan.rtt_p95_ms": 42.0, "wan.loss_pct": 0.5, "wan.sinr_db": 12.0,
+            "wifi.retry_pct": 7.0, "docsis.rx_mer_db": 36.0,
+        })
+        pas.set_backend(self.backend)
+
+    def tearDown(self):
+        pas.set_backend(pas.PlatformBackend())
+
+    def test_read_metrics_single_round_trip(self):
+        res = pas.read_metrics("wan", ["rtt_p95_ms", "loss_pct", "rsrp_dbm"])
+        self.assertEqual(res, {"rtt_p95_ms": 42.0, "loss_pct": 0.5, "rsrp_dbm": None})
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_per_name_wrappers_still_work(self):
+        self.assertEqual(pas.read_wan_metric("rtt_p95_ms"), 42.0)
+        self.assertEqual(pas.read_docsis_metric("rx_mer_db"), 36.0)
+        self.assertIsNone(pas.read_pon_metric("optical_rx_power_dbm"))
+
+    def test_fwa_one_get_per_tick(self):
+        adapter = FWAAdapter()
+        m = adapter.collect_metric_sample()
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(m.latency_p95_ms, 42.0)
+        self.assertEqual(m.wan_sinr_db, 12.0)
+        self.assertEqual(m.retry_pct, 7.0)
+        adapter.collect_metric_sample()
+        self.assertEqual(self.backend.calls, 2)
+
+    def test_docsis_pon_one_get_per_tick(self):
+        m = DOCSISAdapter().collect_metric_sample()
+        self.assertEqual(m.wan_sinr_db, 36.0)
+        PONAdapter().collect_metric_sample()
+        self.assertEqual(self.backend.calls, 2)
+
+    def test_reader_cache_max_age(self):
+        reader = pas.BulkMetricReader({"wan": ("rtt_p95_ms",)}, max_age_sec=60.0)
+        reader.refresh()
+        reader.refresh()
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(reader.get("wan", "rtt_p95_ms"), 42.0)
+        self.assertIsNone(reader.get("wifi", "retry_pct"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Tests for bounded probe execution (deadlines, circuit breaker, stale fallback).
+"""
+
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from dae_p1.adapters import platform_access_stub as pas
+from dae_p1.adapters.FWA_adapter import FWAAdapter
+from dae_p1.adapters.probe_runner import ProbeRunner, run_command
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+def boom():
+    raise RuntimeError("probe failed")
+
+
+class TestProbeRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.runner = ProbeRunner(default_deadline_sec=0.1, max_stale_sec=30, failure_threshold=2,
+                                  backoff_sec=10, clock=self.clock)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.runner.close()
+
+    def test_live_then_stale_then_default(self):
+        r = self.runner.run("p", lambda: 42)
+        self.assertEqual((r.value, r.source), (42, "live"))
+        self.clock.t += 5
+        r = self.runner.run("p", boom, default=-1)
+        self.assertEqual((r.value, r.source, r.provenance), (42, "stale", "stale:5s"))
+        self.clock.t += 60
+        r = self.runner.run("p", boom, default=-1)
+        self.assertEqual((r.value, r.source), (-1, "default"))
+
+    def test_deadline_bounds_wait_and_hung_probe_not_restarted(self):
+        t0 = time.perf_counter()
+        r = self.runner.run("hang", self.release.wait, default="d")
+        self.assertLess(time.perf_counter() - t0, 0.5)
+        self.assertEqual(r.source, "default")
+        r = self.runner.run("hang", self.release.wait, default="d")
+        stats = self.runner.snapshot()["hang"]
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["busy"], 1)
+
+    def test_circuit_breaker_backoff_and_half_open(self):
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise OSError("down")
+
+        for _ in range(2):
+            self.runner.run("c", failing)
+        self.assertEqual(self.runner.snapshot()["c"]["breaker"], "open")
+        self.runner.run("c", failing)
+        self.assertEqual(len(calls), 2)  # short-circuited
+        self.clock.t += 11
+        self.runner.run("c", failing)  # half-open trial fails -> reopen, doubled back-off
+        self.assertEqual(len(calls), 3)
+        self.clock.t += 11
+        self.runner.run("c", failing)
+        self.assertEqual(len(calls), 3)
+        self.clock.t += 10
+        r = self.runner.run("c", lambda: "ok")
+        self.assertEqual(r.source, "live")
+        self.assertEqual(self.runner.snapshot()["c"]["breaker"], "closed")
+
+    def test_no_stale_for_event_streams(self):
+        self.runner.run("ev", lambda: ["e1"], stale_ok=False)
+        r = self.runner.run("ev", boom, default=[], stale_ok=False)
+        self.assertEqual(r.value, [])
+
+    def test_run_command_kills_on_timeout(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_command([sys.executable, "-c", "import time; time.sleep(5)"], timeout_sec=0.2)
+        with self.assertRaises(TypeError):
+            run_command("sleep 5", timeout_sec=0.2)
+
+
+class _HangingBackend(pas.PlatformBackend):
+    def __init__(self):
+        self.hang = False
+        self.release = threading.Event()
+
+    def get(self, paths):
+        if self.hang:
+            self.release.wait()
+        return {p: 10.0 for p in paths}
+
+
+class TestAdapterProbes(unittest.TestCase):
+
+    def tearDown(self):
+        pas.set_backend(pas.PlatformBackend())
+
+    def test_fwa_serves_stale_sample_when_platform_hangs(self):
+        backend = _HangingBackend()
+        pas.set_backend(backend)
+        adapter = FWAAdapter()
+        adapter.probes.default_deadline_sec = 0.1
+        self.assertEqual(adapter.collect_metric_sample().latency_p95_ms, 10.0)
+        backend.hang = True
+        t0 = time.perf_counter()
+        m = adapter.collect_metric_sample()
+        backend.release.set()
+        self.assertLess(time.perf_counter() - t0, 0.5)
+        self.assertEqual(m.latency_p95_ms, 10.0)
+        self.assertTrue(adapter.reader.source.startswith("stale"))
+        self.assertEqual(adapter.probes.snapshot()["platform_get"]["timeouts"], 1)
+        adapter.probes.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for CounterRateEngine (wrap/reset handling) and its use in the DOCSIS/PON adapters.
+"""
+
+import unittest
+
+from dae_p1.M00_common import set_clock
+from dae_p1.adapters import platform_access_stub as pas
+from dae_p1.adapters.rate_engine import CounterRateEngine
+from dae_p1.adapters.DOCSIS_adapter import DOCSISAdapter
+from dae_p1.adapters.PON_adapter import PONAdapter
+
+
+class TestCounterRateEngine(unittest.TestCase):
+
+    def test_basic_rate_and_delta(self):
+        eng = CounterRateEngine()
+        eng.add_series("a", scale=2.0)
+        self.assertEqual(eng.update_many(10.0, [100]), [None])
+        self.assertIsNone(eng.delta("a"))
+        self.assertEqual(eng.update_many(12.0, [300]), [200.0])
+        self.assertEqual(eng.delta("a"), 200)
+
+    def test_32bit_wrap(self):
+        eng = CounterRateEngine(default_width=32)
+        eng.update(0.0, {"c": 2**32 - 10})
+        rates = eng.update(1.0, {"c": 5})
+        self.assertEqual(rates["c"], 15.0)
+        self.assertEqual(eng.stats("c"), (1, 0))
+
+    def test_reset_not_wrap(self):
+        eng = CounterRateEngine(default_width=32)
+        eng.update(0.0, {"c": 1000})
+        eng.update(1.0, {"c": 7})
+        self.assertEqual(eng.delta("c"), 7)
+        self.assertEqual(eng.stats("c"), (0, 1))
+
+    def test_64bit_decrease_is_reset(self):
+        eng = CounterRateEngine()
+        eng.update(0.0, {"c": 2**64 - 10})
+        eng.update(1.0, {"c": 5})
+        self.assertEqual(eng.delta("c"), 5)
+        self.assertEqual(eng.stats("c"), (0, 1))
+
+    def test_missing_sample_keeps_state(self):
+        eng = CounterRateEngine()
+        eng.update_many(0.0, [])
+        eng.add_series("a")
+        eng.add_series("b")
+        eng.update_many(0.0, [0, 0])
+        self.assertEqual(eng.update_many(1.0, [10, None]), [10.0, None])
+        self.assertIsNone(eng.delta("b"))
+        self.assertEqual(eng.update_many(2.0, [10, 40]), [0.0, 20.0])
+
+    def test_bad_width(self):
+        with self.assertRaises(ValueError):
+            CounterRateEngine(default_width=16)
+
+
+class TestAccessCounters(unittest.TestCase):
+
+    def setUp(self):
+        self.t = [1000.0]
+        set_clock(lambda: self.t[0])
+        self.backend = pas.LocalLatencyBackend({})
+        pas.set_backend(self.backend)
+
+    def tearDown(self):
+        set_clock(None)
+        pas.set_backend(pas.PlatformBackend())
+
+    def test_docsis_fec_and_t3t4(self):
+        adapter = DOCSISAdapter()
+        self.backend.values.update({"docsis.corrected_codewords": 2**32 - 100,
+                                    "docsis.uncorrectable_codewords": 5,
+                                    "docsis.t3_timeouts": 1, "docsis.t4_timeouts": 0})
+        m = adapter.collect_metric_sample()
+        self.assertIsNone(m.fec_corrected)
+        self.t[0] += 10
+        self.backend.values.update({"docsis.corrected_codewords": 400,
+                                    "docsis.uncorrectable_codewords": 9,
+                                    "docsis.t3_timeouts": 3, "docsis.t4_timeouts": 1})
+        m = adapter.collect_metric_sample()
+        self.assertEqual(m.fec_corrected, 500)
+        self.assertEqual(m.fec_uncorrected, 4)
+        self.assertEqual(m.t3_t4_count, 3)
+
+    def test_pon_re_register(self):
+        adapter = PONAdapter()
+        self.backend.values.update({"pon.re_register_count": 4, "pon.fec_corrected_codewords": 10})
+        adapter.collect_metric_sample()
+        self.t[0] += 10
+        self.backend.values.update({"pon.re_register_count": 6, "pon.fec_corrected_codewords": 25})
+        m = adapter.collect_metric_sample()
+        self.assertEqual(m.wan_reattach_count, 2)
+        self.assertEqual(m.fec_corrected, 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests for the config-driven rule engine (M07D): compiled decision tables against the
+previous hand-written detector / classifier / install-verify chains, per-sample vs
+detector column evaluation, and custom rule sets.
+"""
+
+import copy
+import random
+import unittest
+
+from dae_p1.M00_common import MetricSample
+from dae_p1.M07_incident_detector import FLAG_NAMES, IncidentDetector, flags_from_mask
+from dae_p1.M07D_rule_engine import DEFAULT_RULES, DEFAULT_RULES_PATH, default_rules, load_rules, parse_rules
+from dae_p1.M08_verdict_classifier import ClassifierConfig, VerdictClassifier
+from dae_p1.M20_install_verify import THRESHOLDS, verify_install
+
+
+def legacy_classify(flags, opaque_risk, opaque_overrides=True):
+    if opaque_risk and opaque_overrides:
+        return "OPAQUE_RISK", 0.7
+    if "WAN_LOW_SINR" in flags:
+        return "WAN_UNSTABLE", 0.7
+    if "MESH_FLAP" in flags:
+        return "MESH_FLAP", 0.7
+    if "AIRTIME_HIGH" in flags and "RETRY_HIGH" in flags:
+        return "WIFI_CONGESTION", 0.7
+    if "LAT_SPIKE" in flags and ("RETRY_HIGH" in flags or "AIRTIME_HIGH" in flags):
+        return "WIFI_CONGESTION", 0.6
+    if opaque_risk:
+        return "OPAQUE_RISK", 0.7
+    return "UNKNOWN", 0.4
+
+
+def samples(n=500, seed=3):
+    rnd = random.Random(seed)
+    pick = lambda lo, hi: None if rnd.random() < 0.1 else rnd.uniform(lo, hi)
+    return [MetricSample(ts=float(i), window_ref="", airtime_busy_pct=pick(40, 95), retry_pct=pick(0, 30),
+                         latency_p95_ms=pick(10, 100), mesh_flap_count=rnd.choice([None, 0, 1, 2, 3]),
+                         wan_sinr_db=pick(0, 20)) for i in range(n)]
+
+
+class TestDetectorRules(unittest.TestCase):
+
+    def test_classifier_table_matches_legacy_chain(self):
+        for overrides in (True, False):
+            clf = VerdictClassifier(ClassifierConfig(opaque_overrides=overrides))
+            for mask in range(1 << len(FLAG_NAMES)):
+                for opaque in (False, True):
+                    flags = flags_from_mask(mask)
+                    self.assertEqual(clf.classify(flags, opaque), legacy_classify(flags, opaque, overrides))
+
+    def test_sample_and_column_masks_agree(self):
+        ms = samples()
+        table = default_rules().detector
+        per_sample = [table.mask(m) for m in ms]
+        self.assertEqual(list(IncidentDetector().flag_masks(ms)), per_sample)
+
+    def test_custom_rules_change_behavior(self):
+        raw = copy.deepcopy(DEFAULT_RULES)
+        raw["detector"]["bad_min_flags"] = 1
+        raw["detector"]["flags"][1]["when"] = [["retry_pct", ">=", 30.0]]
+        raw["detector"]["verdicts"].insert(1, {"name": "LAT_ONLY", "verdict": "WIFI_CONGESTION",
+                                               "confidence": 0.5, "all": ["LAT_SPIKE"], "none": ["RETRY_HIGH"]})
+        rules = parse_rules(raw)
+        det = IncidentDetector(rules=rules)
+        m = MetricSample(ts=0.0, window_ref="", retry_pct=25.0, latency_p95_ms=80.0)
+        self.assertEqual(det.is_bad_window(m), (True, ["LAT_SPIKE"]))
+        self.assertEqual(det.th.retry_pct, 30.0)
+        self.assertEqual(VerdictClassifier(rules=rules).classify(["LAT_SPIKE"]), ("WIFI_CONGESTION", 0.5))
+
+    def test_invalid_rules_rejected(self):
+        raw = copy.deepcopy(DEFAULT_RULES)
+        raw["detector"]["verdicts"].pop()  # no catch-all
+        with self.assertRaises(ValueError):
+            parse_rules(raw)
+        raw = copy.deepcopy(DEFAULT_RULES)
+        raw["detector"]["flags"].append({"name": "NEW_FLAG", "when": [["loss_pct", ">=", 1.0]]})
+        with self.assertRaises(ValueError):
+            parse_rules(raw)
+
+    def test_yaml_matches_builtin_defaults(self):
+        try:
+            import yaml  # noqa: F401
+        except ImportError:
+            self.skipTest("PyYAML not installed")
+        a, b = load_rules(DEFAULT_RULES_PATH), parse_rules(DEFAULT_RULES)
+        self.assertEqual(a.detector.flags, b.detector.flags)
+        self.assertEqual(a.detector.table, b.detector.table)
+        self.assertEqual(a.install_verify.table, b.install_verify.table)
+
+    def test_configured_file_must_load(self):
+        with self.assertRaises((FileNotFoundError, ImportError)):
+            load_rules("/nonexistent/rules.yaml")
+        try:
+            import yaml  # noqa: F401
+        except ImportError:
+            with self.assertRaises(ImportError):
+                load_rules(DEFAULT_RULES_PATH)
+
+
+class TestInstallVerifyRules(unittest.TestCase):
+
+    def verdict(self, **kw):
+        base = dict(latency_p95_ms=20.0, loss_pct=0.0, retry_pct=5.0, airtime_busy_pct=30.0,
+                    mesh_flap_count=0, wan_sinr_db=20.0, signal_strength_pct=90.0,
+                    dns_status="OK", phy_rate_mbps=400.0)
+        base.update(kw)
+        r = verify_install([MetricSample(ts=float(i), window_ref="", **base) for i in range(6)])
+        return r.readiness_verdict, r.dominant_factor, r.confidence
+
+    def test_outcomes(self):
+        self.assertEqual(self.verdict(), ("PASS", "UNKNOWN", 0.85))
+        self.assertEqual(self.verdict(wan_sinr_db=3.0, dns_status="FAIL")[:2], ("FAIL", "WAN"))
+        self.assertEqual(self.verdict(wan_sinr_db=None, dns_status="FAIL")[:2], ("FAIL", "WAN (DNS)"))
+        self.assertEqual(self.verdict(retry_pct=12.0, latency_p95_ms=90.0)[:2], ("FAIL", "WIFI (Noise)"))
+        self.assertEqual(self.verdict(signal_strength_pct=None)[:2], ("FAIL", "WIFI (Coverage)"))
+        self.assertEqual(self.verdict(phy_rate_mbps=54.0)[:2], ("FAIL", "WIFI (Link Speed)"))
+        self.assertEqual(self.verdict(phy_rate_mbps=None)[:2], ("PASS", "UNKNOWN"))
+        self.assertEqual(self.verdict(latency_p95_ms=61.0), ("FAIL", "OPAQUE (Latency)", 0.8))
+
+    def test_thresholds_reported(self):
+        self.assertEqual(THRESHOLDS, {"latency_max_ms": 60.0, "loss_max_pct": 1.0, "retry_max_pct": 12.0,
+                                      "airtime_max_pct": 75.0, "mesh_flap_max": 2, "signal_min_pct": 80,
+                                      "dns_must_be": "OK", "link_rate_min_mbps": 100})
+
+
+if __name__ == '__main__':
+    unittest.main()
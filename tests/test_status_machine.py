@@ -0,0 +1,95 @@
+"""
+Tests for the per-tick device status state machine (status_helper.StatusMachine).
+"""
+
+import threading
+import unittest
+
+from dae_p1.M00_common import ChangeEventCard, MetricSample, VersionRefs, set_clock
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+from dae_p1.adapters.demo_adapter import DemoAdapter
+from dae_p1.status_helper import StatusMachine, calculate_simple_status
+
+BAD = dict(airtime_busy_pct=90.0, retry_pct=40.0)
+
+
+class TestStatusMachine(unittest.TestCase):
+
+    def test_transitions_logged_once(self):
+        sm = StatusMachine()
+        sm.update(0.0, False, [], True, False)
+        for t in (10.0, 20.0):
+            sm.update(t, True, ["AIRTIME_HIGH", "RETRY_HIGH"], True, False)
+        sm.update(30.0, False, [], True, False)
+        self.assertEqual([(t.ts, t.prev, t.status) for t in sm.transitions],
+                         [(10.0, "ok", "suspected"), (30.0, "suspected", "ok")])
+        self.assertEqual((sm.current.status, sm.current.since, sm.current.seq), ("ok", 30.0, 4))
+        self.assertEqual(len(sm.history(since=25.0)), 1)
+
+    def test_published_value_is_immutable_snapshot(self):
+        sm = StatusMachine()
+        before = sm.update(0.0, False, [], True, False)
+        sm.update(10.0, True, ["RETRY_HIGH"], False, False)
+        self.assertEqual(before.status, "ok")
+        with self.assertRaises(Exception):
+            before.status = "unstable"
+
+    def test_history_while_updating(self):
+        sm, stop = StatusMachine(history=100), threading.Event()
+        def updater():
+            t = 0.0
+            while not stop.is_set():
+                t += 1
+                sm.update(t, bool(int(t) % 2), [], False, False)
+        th = threading.Thread(target=updater)
+        th.start()
+        try:
+            for _ in range(20000):
+                sm.history()
+        finally:
+            stop.set()
+            th.join()
+        self.assertEqual(len(sm.history()), 100)
+
+
+class TestCoreStatus(unittest.TestCase):
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_status_follows_ticks(self):
+        set_clock(lambda: 0.0)
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True,
+                                                                  recognize_every="off"))
+        core.ingest(MetricSample(ts=0.0, window_ref="Ws:0"), [], [])
+        self.assertEqual(calculate_simple_status(core), "ok")
+        core.ingest(MetricSample(ts=10.0, window_ref="Ws:10", **BAD), [], [])
+        self.assertEqual(calculate_simple_status(core), "suspected")
+        evs = [ChangeEventCard(event_time=20.0, event_type="config_change", origin_hint="user",
+                               change_ref="c1", version_refs=VersionRefs(fw="2.0"))]
+        core.ingest(MetricSample(ts=20.0, window_ref="Ws:20", **BAD), evs, [])
+        self.assertEqual(core.status.current.status, "unstable")
+        self.assertEqual(core.status.current.flags, ("AIRTIME_HIGH", "RETRY_HIGH"))
+        core.generate_recognition()  # opens an episode
+        core.ingest(MetricSample(ts=30.0, window_ref="Ws:30"), [], [])
+        self.assertEqual(calculate_simple_status(core), "investigation")
+        self.assertEqual([t.status for t in core.status.transitions], ["suspected", "unstable", "investigation"])
+
+    def test_status_judges_the_wl_window(self):
+        set_clock(lambda: 0.0)
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True))
+        for t in range(10):
+            core.ingest(MetricSample(ts=float(t), window_ref="Ws:0"), [], [])
+        # One noisy sample in a mostly good Wl window: status and published verdict stay ok
+        core.ingest(MetricSample(ts=10.0, window_ref="Ws:10", **BAD), [], [])
+        snap, rec = core.published()
+        self.assertEqual(snap.status.status, "ok")
+        self.assertEqual(rec.window_stats["bad"], 1)
+        for t in range(11, 25):
+            core.ingest(MetricSample(ts=float(t), window_ref=f"Ws:{t // 10 * 10}", **BAD), [], [])
+        self.assertNotEqual(core.status.current.status, "ok")
+        self.assertEqual(core.status.current.flags, ("AIRTIME_HIGH", "RETRY_HIGH"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for the what-if replay engine (M16A): agreement with the live detector, Wl window
+judgement, classifier and episode manager, and config sweeps.
+"""
+
+import random
+import unittest
+from array import array
+from unittest import mock
+
+from dae_p1 import M16A_whatif_replay
+from dae_p1.M00_common import ChangeEventCard, MetricSample, VersionRefs, set_clock
+from dae_p1.M06A_event_index import IntervalIndex
+from dae_p1.M07E_window_aggregates import WindowAggregator
+from dae_p1.M07_incident_detector import DetectorThresholds, IncidentDetector
+from dae_p1.M08_verdict_classifier import ClassifierConfig, VerdictClassifier
+from dae_p1.M09_episode_manager import EpisodeManager
+from dae_p1.M16A_whatif_replay import ReplayHistory, WhatIfConfig, _bad_indices, evaluate, sweep, threshold_grid
+
+
+def history(n=3000, seed=5):
+    rnd = random.Random(seed)
+    ms, evs = [], []
+    for i in range(n):
+        t = 10.0 * i
+        hot = (i // 40) % 5 == 0 and rnd.random() < 0.8
+        ms.append(MetricSample(ts=t, window_ref="", airtime_busy_pct=rnd.uniform(70, 95) if hot else rnd.uniform(10, 60),
+                               retry_pct=rnd.uniform(10, 30) if hot else rnd.uniform(0, 10),
+                               latency_p95_ms=rnd.uniform(20, 90),
+                               wan_sinr_db=rnd.uniform(0, 8) if rnd.random() < 0.05 else 20.0))
+        if i % 97 == 0:
+            evs.append(ChangeEventCard(event_time=t, event_type="config_change", origin_hint="user",
+                                       change_ref=f"c{i}" if i % 2 else None, version_refs=VersionRefs(fw="1")))
+    return ms, evs
+
+
+def live(ms, evs, cfg):
+    """
+    Reference: detector + WindowAggregator, with the Wl context judged by quorum at the first
+    sample of each Ws window, classifier and EpisodeManager, as the live engine does.
+    """
+    det = IncidentDetector(cfg.thresholds)
+    clf = VerdictClassifier(cfg.classifier)
+    em = EpisodeManager(open_after=cfg.open_after, close_after=cfg.close_after, history_len=100000)
+    agg = WindowAggregator()
+    idx = IntervalIndex(len(evs) + 1, key=lambda e: e.event_time)
+    for e in evs:
+        idx.add(e)
+    from dae_p1.M06_observability_checker import ObservabilityChecker
+    obs = ObservabilityChecker()
+    bad = bad_windows = 0
+    last_ws = None
+    for m in ms:
+        is_bad, mask = det.judge(m)
+        bad += is_bad
+        agg.add(m, mask, is_bad)
+        ws = f"Ws:{int(m.ts // 10) * 10}"
+        if ws == last_ws:
+            continue
+        last_ws = ws
+        win_bad, flags = agg.context("Wl").judge(cfg.quorum)
+        near = idx.for_window(m.ts)
+        opaque = obs.check_event(near[-1]).opaque_risk if near else True
+        verdict, _ = clf.classify(flags, opaque_risk=opaque)
+        bad_windows += win_bad
+        em.observe(ws, win_bad, verdict, "e", "Wl:0")
+    em.clear()
+    return bad, bad_windows, len(em.history)
+
+
+class TestWhatIfReplay(unittest.TestCase):
+
+    def setUp(self):
+        set_clock(lambda: 0.0)
+        self.ms, self.evs = history()
+        self.h = ReplayHistory.from_samples(self.ms, self.evs)
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_matches_live_pipeline(self):
+        for cfg in (WhatIfConfig("base"),
+                    WhatIfConfig("strict", DetectorThresholds(retry_pct=25.0), close_after=1),
+                    WhatIfConfig("slow", open_after=2, close_after=6,
+                                 classifier=ClassifierConfig(opaque_overrides=False)),
+                    WhatIfConfig("lenient", quorum=0.25)):
+            res = evaluate(self.h, cfg)
+            self.assertEqual((res.bad_samples, res.bad_windows, res.episodes), live(self.ms, self.evs, cfg),
+                             cfg.name)
+            self.assertEqual(sum(res.verdicts.values()), res.bad_windows)
+
+    def test_thresholds_change_counts(self):
+        loose, tight = sweep(self.h, threshold_grid(retry_pct=[40.0, 12.0]), max_workers=1)
+        self.assertEqual(loose.name, "retry_pct=40.0")
+        self.assertLess(loose.flag_counts["RETRY_HIGH"], tight.flag_counts["RETRY_HIGH"])
+        self.assertLess(loose.bad_samples, tight.bad_samples)
+
+    def test_process_pool_same_as_inline(self):
+        cfgs = threshold_grid(retry_pct=[12.0, 18.0, 24.0], airtime_busy_pct=[70.0, 80.0])
+        self.assertEqual(sweep(self.h, cfgs, max_workers=2), sweep(self.h, cfgs, max_workers=1))
+
+    @unittest.skipUnless(M16A_whatif_replay.np, "NumPy not installed")
+    def test_numpy_and_pure_python_agree(self):
+        masks = array("B", (random.Random(9).randrange(256) for _ in range(2000)))
+        cfg = WhatIfConfig("strict", DetectorThresholds(retry_pct=15.0))
+        vectorized = [_bad_indices(masks, k) for k in (1, 2, 3)], evaluate(self.h, cfg)
+        with mock.patch.object(M16A_whatif_replay, "np", None):
+            pure = [_bad_indices(masks, k) for k in (1, 2, 3)], evaluate(self.h, cfg)
+        self.assertEqual(vectorized, pure)
+
+    def test_from_dict_partial_confidence(self):
+        cfg = WhatIfConfig.from_dict({"name": "x", "thresholds": {"retry_pct": 20},
+                                      "classifier": {"confidence": {"UNKNOWN": 0.1}}})
+        self.assertEqual(cfg.thresholds.retry_pct, 20)
+        clf = VerdictClassifier(cfg.classifier)
+        self.assertEqual(clf.classify([]), ("UNKNOWN", 0.1))
+        self.assertEqual(clf.classify(["WAN_LOW_SINR"]), ("WAN_UNSTABLE", 0.7))
+
+
+if __name__ == '__main__':
+    unittest.main()
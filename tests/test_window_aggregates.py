@@ -0,0 +1,81 @@
+"""
+Tests for incremental per-window aggregates (M07E) and recognition judged on them.
+"""
+
+import random
+import unittest
+
+from dae_p1.M00_common import MetricSample, set_clock
+from dae_p1.M07_incident_detector import IncidentDetector
+from dae_p1.M07E_window_aggregates import WindowAggregator
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+from dae_p1.adapters.demo_adapter import DemoAdapter
+
+BAD = dict(airtime_busy_pct=90.0, retry_pct=40.0)
+OK = dict(airtime_busy_pct=30.0, retry_pct=3.0)
+
+
+class TestWindowAggregator(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(1)
+        det, agg = IncidentDetector(), WindowAggregator()
+        ms = [MetricSample(ts=float(t), window_ref="", airtime_busy_pct=rnd.uniform(50, 95),
+                           retry_pct=rnd.uniform(0, 30), latency_p95_ms=None if t % 7 == 0 else rnd.uniform(10, 90))
+              for t in range(130)]
+        for m in ms:
+            mask = det.flag_mask(m)
+            agg.add(m, mask, det.is_bad_mask(mask))
+        w = agg.get("Wl:60")
+        window = [m for m in ms if 60 <= m.ts < 120]
+        lat = sorted(m.latency_p95_ms for m in window if m.latency_p95_ms is not None)
+        self.assertEqual(w.samples, 60)
+        self.assertAlmostEqual(w.mean["latency_p95_ms"], sum(lat) / len(lat))
+        self.assertEqual(w.p95["latency_p95_ms"], lat[int(0.95 * len(lat))])
+        bad = [m for m in window if det.is_bad_window(m)[0]]
+        self.assertEqual(w.bad, len(bad))
+        self.assertAlmostEqual(w.flag_frac["RETRY_HIGH"],
+                               sum("RETRY_HIGH" in det.badness_flags(m) for m in window) / 60)
+        self.assertEqual([x.window_ref for x in agg.closed("Wl")], ["Wl:0", "Wl:60"])
+        self.assertEqual(agg.current("Ws").window_ref, "Ws:120")
+
+    def test_context_merges_just_started_window(self):
+        agg = WindowAggregator()
+        for t in range(0, 60, 10):
+            agg.add(MetricSample(ts=float(t), window_ref=""), 0b11, True)
+        agg.add(MetricSample(ts=60.0, window_ref=""), 0, False)
+        ctx = agg.context("Wl", min_samples=3)
+        self.assertEqual((ctx.window_ref, ctx.samples, ctx.bad), ("Wl:60", 7, 6))
+        self.assertEqual(ctx.judge(), (True, ["AIRTIME_HIGH", "RETRY_HIGH"]))
+        self.assertEqual(agg.current("Wl").judge(), (False, []))
+
+
+class TestRecognitionOnAggregates(unittest.TestCase):
+
+    def setUp(self):
+        set_clock(lambda: 0.0)
+        self.core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True))
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_single_noisy_sample_does_not_flip_verdict(self):
+        for t in range(30):
+            self.core.ingest(MetricSample(ts=float(t), window_ref=f"Ws:{t // 10 * 10}", **OK), [], [])
+        self.core.ingest(MetricSample(ts=30.0, window_ref="Ws:30", **BAD), [], [])
+        rec = self.core.generate_recognition()
+        self.assertEqual(rec.window_stats["window_ref"], "Wl:0")
+        self.assertEqual(rec.window_stats["bad"], 1)
+        self.assertEqual(self.core.recognition.episodes.open, {})
+
+    def test_sustained_degradation_is_recognized(self):
+        for t in range(30):
+            self.core.ingest(MetricSample(ts=float(t), window_ref=f"Ws:{t // 10 * 10}", **BAD), [], [])
+        self.core.ingest(MetricSample(ts=30.0, window_ref="Ws:30", **OK), [], [])
+        rec = self.core.generate_recognition()
+        self.assertEqual(rec.primary_verdict, "OPAQUE_RISK")
+        self.assertEqual(len(self.core.recognition.episodes.open), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
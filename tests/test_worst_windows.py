@@ -0,0 +1,80 @@
+"""
+Tests for per-sample severity (M07) and the incremental worst-window top-K (M09).
+"""
+
+import unittest
+
+from dae_p1.M00_common import MetricSample, set_clock
+from dae_p1.M07_incident_detector import IncidentDetector
+from dae_p1.M09_episode_manager import WorstWindows
+from dae_p1.core_service import CoreRuntimeConfig, OBHCoreService
+from dae_p1.adapters.demo_adapter import DemoAdapter
+
+
+class TestSeverity(unittest.TestCase):
+
+    def test_weighted_flags_plus_exceedance(self):
+        d = IncidentDetector()
+        self.assertEqual(d.severity(MetricSample(ts=0, window_ref="", airtime_busy_pct=50.0)), 0.0)
+        # airtime 90 vs 75: 1 + 0.2; retry 36 vs 18: 1 + 1.0
+        s = d.severity(MetricSample(ts=0, window_ref="", airtime_busy_pct=90.0, retry_pct=36.0))
+        self.assertAlmostEqual(s, 3.2)
+        # SINR is a lower bound; exceedance capped at 2
+        self.assertAlmostEqual(d.severity(MetricSample(ts=0, window_ref="", wan_sinr_db=-40.0)), 3.0)
+
+
+class TestWorstWindows(unittest.TestCase):
+
+    def test_top_k_ranked(self):
+        w = WorstWindows(k=3)
+        scores = [1.0, 7.0, 0.0, 3.0, 9.0, 2.0, 5.0]
+        for i, sc in enumerate(scores):
+            w.add(f"Wl:{i}", float(i), sc / 2)
+            w.add(f"Wl:{i}", float(i) + 0.5, sc / 2)
+        self.assertEqual(w.ranked(), [("Wl:4", 9.0), ("Wl:1", 7.0), ("Wl:6", 5.0)])
+        self.assertEqual(len(w._heap), 3)
+        self.assertEqual(w.worst_ref(), "Wl:4")
+
+    def test_empty_and_zero(self):
+        w = WorstWindows()
+        self.assertIsNone(w.worst_ref())
+        w.add("Wl:0", 0.0, 0.0)
+        w.add("Wl:1", 1.0, 0.0)
+        self.assertEqual(w.ranked(), [])
+
+    def test_merge_from_since(self):
+        dev = WorstWindows()
+        for i, sc in enumerate([5.0, 1.0, 2.0]):
+            dev.add(f"Wl:{i}", 60.0 * i, sc)
+        ep = WorstWindows()
+        ep.merge_from(dev, since=60.0)
+        ep.add("Wl:2", 130.0, 4.0)
+        self.assertEqual(ep.ranked(), [("Wl:2", 6.0), ("Wl:1", 1.0)])
+
+
+class TestRecognitionWorstWindow(unittest.TestCase):
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_worst_window_is_not_current(self):
+        clock = [0.0]
+        set_clock(lambda: clock[0])
+        core = OBHCoreService(DemoAdapter(), CoreRuntimeConfig(sample_interval_sec=1, accelerate=True))
+        spikes = {1: 95.0, 2: 80.0}  # Wl index -> airtime
+
+        def feed(t):
+            clock[0] = t
+            airtime = spikes.get(int(t // 60), 85.0 if t >= 180 else 20.0)
+            core.ingest(MetricSample(ts=t, window_ref=core.windowing.window_ref(t, "Ws"),
+                                     airtime_busy_pct=airtime, retry_pct=40.0), [], [])
+
+        for t in range(0, 240, 10):
+            feed(float(t))
+        rec = core.generate_recognition()
+        self.assertEqual(rec.worst_window_ref, "Wl:60")
+        self.assertEqual([w["window_ref"] for w in rec.worst_windows][:2], ["Wl:60", "Wl:180"])
+
+
+if __name__ == '__main__':
+    unittest.main()